@@ -1,5 +1,8 @@
 # main.py
+import multiprocessing
 from src.app.gui import run_gui
 
 if __name__ == "__main__":
+    # Diperlukan agar process pool ekstraksi berjalan pada build executable Windows
+    multiprocessing.freeze_support()
     run_gui()
\ No newline at end of file
@@ -3,6 +3,7 @@ import tkinter as tk
 import threading
 from src.utils.styles import Theme
 from src.utils.settings_manager import SettingsManager
+from src.utils.utils import configure_logging, flush_logs
 from src.components.header import HeaderComponent
 from src.components.mode_selection import ModeSelectionComponent
 from src.components.file_input_output import FileInputOutputComponent
@@ -33,6 +34,7 @@ class RenamergedGUI:
         
         # Load user settings
         saved_settings = self.settings_manager.load_settings()
+        configure_logging(saved_settings.get("log_path", "log.txt"), saved_settings.get("log_level", "INFO"))
         
         self.current_theme = saved_settings.get("theme", "dark")
         self.colors = self.theme.get_colors(self.current_theme)
@@ -76,7 +78,23 @@ class RenamergedGUI:
             "use_reference": tk.BooleanVar(value=saved_settings.get("use_reference", True)),
             "use_faktur": tk.BooleanVar(value=saved_settings.get("use_faktur", True)),
             "wrap_reference": tk.BooleanVar(value=saved_settings.get("wrap_reference", False)),
-            "component_order": saved_settings.get("component_order", None)
+            "component_order": saved_settings.get("component_order", None),
+            "first_page_only": saved_settings.get("first_page_only", True),
+            "extraction_workers": saved_settings.get("extraction_workers", 0),
+            "use_extraction_cache": saved_settings.get("use_extraction_cache", True),
+            "extraction_backends": saved_settings.get("extraction_backends", ["pdfplumber"]),
+            "strict_validation": saved_settings.get("strict_validation", True),
+            "merge_memory_budget_mb": saved_settings.get("merge_memory_budget_mb", 256),
+            "merge_workers": saved_settings.get("merge_workers", 0),
+            "merge_append": saved_settings.get("merge_append", False),
+            "merge_optimize": saved_settings.get("merge_optimize", True),
+            "merge_max_pages": saved_settings.get("merge_max_pages", 0),
+            "merge_max_mb": saved_settings.get("merge_max_mb", 0),
+            "output_strategy": saved_settings.get("output_strategy", "copy"),
+            "log_path": saved_settings.get("log_path", "log.txt"),
+            "log_level": saved_settings.get("log_level", "INFO"),
+            "plan_mode": saved_settings.get("plan_mode", "off"),
+            "plan_path": saved_settings.get("plan_path", "")
         }
         
         for key, var in self.settings.items():
@@ -204,6 +222,22 @@ class RenamergedGUI:
             "use_faktur": self.settings["use_faktur"].get() if hasattr(self.settings["use_faktur"], 'get') else self.settings["use_faktur"],
             "wrap_reference": self.settings["wrap_reference"].get() if hasattr(self.settings["wrap_reference"], 'get') else self.settings["wrap_reference"],
             "component_order": self.mode_selection.get_component_order() if hasattr(self.mode_selection, 'get_component_order') else self.settings.get("component_order", None),
+            "first_page_only": self.settings.get("first_page_only", True),
+            "extraction_workers": self.settings.get("extraction_workers", 0),
+            "use_extraction_cache": self.settings.get("use_extraction_cache", True),
+            "extraction_backends": self.settings.get("extraction_backends", ["pdfplumber"]),
+            "strict_validation": self.settings.get("strict_validation", True),
+            "merge_memory_budget_mb": self.settings.get("merge_memory_budget_mb", 256),
+            "merge_workers": self.settings.get("merge_workers", 0),
+            "merge_append": self.settings.get("merge_append", False),
+            "merge_optimize": self.settings.get("merge_optimize", True),
+            "merge_max_pages": self.settings.get("merge_max_pages", 0),
+            "merge_max_mb": self.settings.get("merge_max_mb", 0),
+            "output_strategy": self.settings.get("output_strategy", "copy"),
+            "log_path": self.settings.get("log_path", "log.txt"),
+            "log_level": self.settings.get("log_level", "INFO"),
+            "plan_mode": self.settings.get("plan_mode", "off"),
+            "plan_path": self.settings.get("plan_path", ""),
             "settings_expanded": self.mode_selection.is_expanded if hasattr(self.mode_selection, 'is_expanded') else True
         }
         
@@ -250,6 +284,9 @@ class RenamergedGUI:
             # Close any open file handles in components
             if hasattr(self, 'pdf_counter') and self.pdf_counter:
                 self.pdf_counter.stop_monitoring()
+
+            # Pastikan pesan log yang masih di antrean tertulis sebelum aplikasi ditutup
+            flush_logs()
                 
         except Exception as e:
             # Use logging instead of print for GUI apps
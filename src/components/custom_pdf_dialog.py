@@ -3,6 +3,7 @@ import os
 import tkinter as tk
 import threading
 from src.utils.selection_handler import SelectionHandler
+from src.utils.input_manifest import is_pdf_filename
 
 class CustomPDFDialog:
     def __init__(self, parent, colors):
@@ -138,7 +139,7 @@ class CustomPDFDialog:
                             break
                         if entry.is_dir():
                             folders.append(entry.name)
-                        elif entry.name.endswith('.pdf'):
+                        elif is_pdf_filename(entry.name):
                             files.append(entry.name)
                 folders.sort()
                 files.sort()
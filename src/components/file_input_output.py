@@ -3,6 +3,7 @@ import tkinter as tk
 import os
 from tkinter import filedialog
 from src.pdf.pdf_utils import validate_pdf
+from src.utils.input_manifest import get_shared_manifest
 from src.components.custom_pdf_dialog import CustomPDFDialog
 
 class FileInputOutputComponent:
@@ -227,7 +228,7 @@ class FileInputOutputComponent:
         file_list.configure(state="normal")
         file_list.delete("1.0", tk.END)
         if folder and os.path.isdir(folder):
-            pdf_files = [f for f in os.listdir(folder) if f.endswith('.pdf') and validate_pdf(os.path.join(folder, f))]
+            pdf_files = [entry.name for entry in get_shared_manifest(folder) if validate_pdf(entry.path)]
             count = len(pdf_files)
             total_pdf_var.set(f"Total PDF Terdeteksi: {count}")
             for pdf_file in pdf_files:
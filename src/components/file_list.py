@@ -1,5 +1,6 @@
 import customtkinter as ctk
 import os
+from src.utils.input_manifest import get_shared_manifest
 
 class FileListComponent:
     def __init__(self, parent, colors, input_path_var):
@@ -19,8 +20,10 @@ class FileListComponent:
     def update_file_count(self, *args):
         folder = self.input_path_var.get()
         if folder and os.path.isdir(folder):
-            pdf_files = [f for f in os.listdir(folder) if f.endswith('.pdf')]
-            count = len(pdf_files)
+            try:
+                count = len(get_shared_manifest(folder))
+            except OSError:
+                count = 0
             self.total_pdf_var.set(f"Total PDF Terdeteksi: {count}")
         else:
             self.total_pdf_var.set("Total PDF Terdeteksi: 0")
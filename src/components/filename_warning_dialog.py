@@ -2,11 +2,18 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
 
+# Tinggi dialog dengan dan tanpa daftar file yang terdampak
+DIALOG_WIDTH = 520
+DIALOG_HEIGHT = 350
+DIALOG_HEIGHT_WITH_LIST = 520
+
 class FilenameWarningDialog:
-    def __init__(self, parent, colors, long_filenames_count):
+    def __init__(self, parent, colors, long_filenames_count, long_filenames=None):
         self.parent = parent
         self.colors = colors
         self.long_filenames_count = long_filenames_count
+        # Daftar lengkap dari preflight (dict original_file, length, ...); opsional
+        self.long_filenames = long_filenames or []
         self.user_choice = None
         
     def show_warning(self):
@@ -15,7 +22,8 @@ class FilenameWarningDialog:
         # Buat top-level window
         self.dialog = ctk.CTkToplevel(self.parent)
         self.dialog.title("Peringatan: Nama File Terlalu Panjang")
-        self.dialog.geometry("520x350")
+        height = DIALOG_HEIGHT_WITH_LIST if self.long_filenames else DIALOG_HEIGHT
+        self.dialog.geometry(f"{DIALOG_WIDTH}x{height}")
         self.dialog.resizable(False, False)
         
         # Center window
@@ -48,6 +56,20 @@ class FilenameWarningDialog:
         )
         problem_label.pack(pady=(0, 15))
         
+        # Daftar semua file yang terdampak (read-only, bisa di-scroll)
+        if self.long_filenames:
+            file_list = ctk.CTkTextbox(
+                main_frame,
+                height=140,
+                font=("Roboto", 11),
+                wrap="none"
+            )
+            file_list.pack(fill="x", pady=(0, 15))
+            file_list.insert("1.0", "\n".join(
+                f"{item['original_file']} → {item['length']} karakter" for item in self.long_filenames
+            ))
+            file_list.configure(state="disabled")
+        
         # Solution info
         frame_bg_color = self.colors.get("frame_bg", "#2d2d2d")  # Default fallback color
         info_frame = ctk.CTkFrame(main_frame, fg_color=frame_bg_color, corner_radius=10)
@@ -103,9 +125,9 @@ class FilenameWarningDialog:
         
         # Center the dialog
         self.dialog.update_idletasks()
-        x = (self.dialog.winfo_screenwidth() // 2) - (520 // 2)
-        y = (self.dialog.winfo_screenheight() // 2) - (350 // 2)
-        self.dialog.geometry(f"520x350+{x}+{y}")
+        x = (self.dialog.winfo_screenwidth() // 2) - (DIALOG_WIDTH // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (height // 2)
+        self.dialog.geometry(f"{DIALOG_WIDTH}x{height}+{x}+{y}")
         
         # Wait for user response
         self.dialog.wait_window()
@@ -4,6 +4,7 @@ import os
 import time
 import threading
 from threading import Thread
+from src.utils.input_manifest import get_shared_manifest
 
 class PDFCounterComponent:
     def __init__(self, parent, colors, input_path_var):
@@ -126,8 +127,7 @@ class PDFCounterComponent:
                 return
                 
             # Count PDF files
-            pdf_files = [f for f in os.listdir(current_path) if f.lower().endswith('.pdf')]
-            count = len(pdf_files)
+            count = len(get_shared_manifest(current_path))
             
             # Check for stop signal before updating display
             if self.stop_flag.is_set():
@@ -4,9 +4,17 @@ import os
 import time
 import threading
 from tkinter import messagebox
-from src.pdf.pdf_processor import process_pdfs as process_pdfs_merge
-from src.pdf.pdf_processor_rename import process_pdfs as process_pdfs_rename
-from src.utils.utils import log_message, Fore
+from src.pdf.pdf_processor import process_pdfs as process_pdfs_merge, plan_pdfs as plan_pdfs_merge, execute_plan as execute_plan_merge
+from src.pdf.pdf_processor_rename import process_pdfs as process_pdfs_rename, plan_pdfs as plan_pdfs_rename, execute_plan as execute_plan_rename
+from src.pdf.processing_plan import ProcessingPlan, MODE_MERGE, default_plan_path
+from src.utils.utils import log_message, Fore, DEBUG
+from src.utils.input_manifest import InputManifest
+from src.utils.run_config import RunConfig
+from src.pdf.filename_template import FilenameTemplate
+from src.utils.progress_tracker import ProgressTracker, format_progress_detail
+
+# Interval GUI membaca progress (ms), sekitar 10 frame per detik
+PROGRESS_REFRESH_MS = 100
 
 class ProcessButtonComponent:
     def __init__(self, parent, colors, input_path_var, output_path_var, mode_var, settings, progress_var, progress_percentage_var, statistics, output_location, mode_selection, gui):
@@ -27,6 +35,10 @@ class ProcessButtonComponent:
         self.processing_thread = None
         self.cancel_flag = threading.Event()
         self.processing_lock = threading.Lock()
+        # Progress dari thread pemrosesan dibaca GUI secara berkala, bukan dijadwalkan per file
+        self.progress_tracker = ProgressTracker()
+        self._progress_poll_id = None
+        self._progress_version = None
 
         # No UI creation - this component now only provides logic
         # The actual button is created in FileInputOutputComponent
@@ -68,16 +80,31 @@ class ProcessButtonComponent:
             messagebox.showerror("Error", "Tidak memiliki izin untuk membaca folder input!")
             return
             
-        # Check if directory is empty of PDF files
+        # Scan folder input sekali; manifest dipakai bersama oleh preflight dan pemrosesan
         try:
-            pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
-            if not pdf_files:
+            manifest = InputManifest.scan(input_dir)
+            if not manifest:
                 messagebox.showwarning("Warning", "Tidak ada file PDF ditemukan di folder input!")
                 return
         except (PermissionError, OSError) as e:
             messagebox.showerror("Error", f"Error mengakses folder input: {str(e)}")
             return
 
+        # Validate settings
+        required_keys = ["use_name", "use_date", "use_reference", "use_faktur"]
+        for key in required_keys:
+            if not hasattr(self.settings.get(key), 'get'):
+                messagebox.showerror("Error", f"Pengaturan {key} tidak valid!")
+                return
+
+        # Bekukan pengaturan di main thread; thread pemrosesan dan worker tidak membaca variabel Tk
+        run_config = RunConfig.from_settings(
+            self.settings,
+            component_order=self.mode_selection.get_component_order(),
+            separator=self.mode_selection.get_separator(),
+            slash_replacement=self.mode_selection.get_slash_replacement()
+        )
+
         # Reset cancel flag and update UI
         self.cancel_flag.clear()
         self.set_button_text("❌ Cancel")
@@ -91,7 +118,7 @@ class ProcessButtonComponent:
         # Start background processing thread
         self.processing_thread = threading.Thread(
             target=self._process_in_background,
-            args=(input_dir, output_dir, mode),
+            args=(input_dir, output_dir, mode, run_config, manifest),
             daemon=True
         )
         self.processing_thread.start()
@@ -100,75 +127,105 @@ class ProcessButtonComponent:
         if hasattr(self.gui, '_background_threads'):
             self.gui._background_threads.append(self.processing_thread)
     
-    def _process_in_background(self, input_dir, output_dir, mode):
-        """Background processing method"""
+    def _process_in_background(self, input_dir, output_dir, mode, run_config, manifest=None):
+        """Background processing method; run_config adalah RunConfig yang dibekukan di _start_processing"""
         try:
-            # Validate settings
-            required_keys = ["use_name", "use_date", "use_reference", "use_faktur"]
-            for key in required_keys:
-                if not hasattr(self.settings.get(key), 'get'):
-                    self._show_error_safe("Error", f"Pengaturan {key} tidak valid!")
-                    return
-
-            self.settings["component_order"] = self.mode_selection.get_component_order()
-            self.settings["separator"] = self.mode_selection.get_separator()
-            self.settings["slash_replacement"] = self.mode_selection.get_slash_replacement()
-
             # Check for long filenames before processing
             from src.utils.filename_checker import check_long_filenames
             from src.components.filename_warning_dialog import FilenameWarningDialog
         
-            has_long_filenames, long_filenames, sample_filenames = check_long_filenames(input_dir, self.settings, self.log_callback)
+            # Reset UI on main thread; preflight sudah melaporkan progress
+            self.progress_tracker.reset()
+            self.parent.after(0, self._reset_ui_for_processing)
+
+            # Template nama file dikompilasi sekali dan dipakai bersama oleh preflight dan pemrosesan.
+            # Preflight mengekstrak semua file; hasilnya dipakai ulang sehingga pemrosesan tidak mengekstrak lagi
+            filename_template = FilenameTemplate.from_config(run_config)
+            preflight_results = {}
+            # Mode "apply" menjalankan rencana yang sudah ditinjau tanpa membaca isi PDF lagi
+            plan_mode = run_config.get("plan_mode", "off")
+            # Cek panjang nama file hanya relevan untuk Rename Saja; nama file gabungan hanya memakai nama partner
+            if plan_mode != "apply" and mode != "Rename dan Merge":
+                has_long_filenames, long_filenames, sample_filenames = check_long_filenames(
+                    input_dir, run_config, self.log_callback, manifest, filename_template,
+                    preflight_results, self.cancel_flag, self._thread_safe_progress_callback
+                )
             
-            if has_long_filenames and not self.cancel_flag.is_set():
-                # Handle filename dialog on main thread
-                dialog_result = [None]
+                if has_long_filenames and not self.cancel_flag.is_set():
+                    # Handle filename dialog on main thread
+                    dialog_result = [None]
                 
-                def show_dialog():
-                    dialog = FilenameWarningDialog(self.parent, self.gui.colors, len(long_filenames))
-                    dialog_result[0] = dialog.show_warning()
+                    def show_dialog():
+                        dialog = FilenameWarningDialog(self.parent, self.gui.colors, len(long_filenames), long_filenames)
+                        dialog_result[0] = dialog.show_warning()
                 
-                self.parent.after(0, show_dialog)
+                    self.parent.after(0, show_dialog)
                 
-                # Wait for dialog result
-                while dialog_result[0] is None and not self.cancel_flag.is_set():
-                    time.sleep(0.1)
+                    # Wait for dialog result
+                    while dialog_result[0] is None and not self.cancel_flag.is_set():
+                        time.sleep(0.1)
                     
-                if self.cancel_flag.is_set():
-                    return
+                    if self.cancel_flag.is_set():
+                        return
                     
-                if dialog_result[0] == "cancel":
-                    log_message("Proses dibatalkan oleh user karena filename terlalu panjang", Fore.YELLOW, log_callback=self.log_callback)
-                    self._reset_button_safe()
-                    return
-                elif dialog_result[0] == "ok":
-                    self.settings["max_filename_length"] = 150
-                    log_message(f"User memilih melanjutkan dengan penyesuaian referensi otomatis (max 150 karakter, berlaku untuk semua file)", Fore.CYAN, log_callback=self.log_callback)
+                    if dialog_result[0] == "cancel":
+                        log_message("Proses dibatalkan oleh user karena filename terlalu panjang", Fore.YELLOW, log_callback=self.log_callback)
+                        self._reset_button_safe()
+                        return
+                    elif dialog_result[0] == "ok":
+                        run_config = run_config.replace(max_filename_length=150)
+                        filename_template = filename_template.with_max_length(150)
+                        log_message(f"User memilih melanjutkan dengan penyesuaian referensi otomatis (max 150 karakter, berlaku untuk semua file)", Fore.CYAN, log_callback=self.log_callback)
 
             # Check for cancellation
             if self.cancel_flag.is_set():
                 return
 
-            # Reset UI on main thread
-            self.parent.after(0, self._reset_ui_for_processing)
-
             # Actual PDF processing with cancellation support
             try:
                 if self.cancel_flag.is_set():
                     return
                     
-                if mode == "Rename dan Merge":
+                plan_path = run_config.get("plan_path", "") or default_plan_path(output_dir or os.path.join(input_dir, "ProcessedPDFs"))
+                if plan_mode == "apply":
+                    plan = ProcessingPlan.load(plan_path)
+                    log_message(f"🗒️ Rencana dibaca dari {plan_path}", Fore.CYAN, log_callback=self.log_callback)
+                    execute_plan = execute_plan_merge if plan.mode == MODE_MERGE else execute_plan_rename
+                    total, renamed, merged, errors = execute_plan(
+                        plan, self._thread_safe_progress_callback, self.log_callback, run_config, self.cancel_flag
+                    )
+                elif plan_mode == "plan":
+                    # Mode rencana: ekstraksi dan penamaan saja, tidak ada file output yang ditulis
+                    if mode == "Rename dan Merge":
+                        plan = plan_pdfs_merge(
+                            input_dir, output_dir, self._thread_safe_progress_callback,
+                            self.log_callback, run_config, self.cancel_flag, manifest, preflight_results
+                        )
+                    else:
+                        plan = plan_pdfs_rename(
+                            input_dir, output_dir, self._thread_safe_progress_callback,
+                            self.log_callback, run_config, self.cancel_flag, manifest, filename_template, preflight_results
+                        )
+                    if self.cancel_flag.is_set():
+                        return
+                    plan.save(plan_path)
+                    log_message(f"🗒️ Rencana disimpan ke {plan_path}; belum ada file yang diproses", Fore.GREEN, log_callback=self.log_callback)
+                    counts = plan.summary()
+                    total, renamed, merged, errors = len(plan.entries), counts["rename"], counts["merge"], counts["errors"]
+                elif mode == "Rename dan Merge":
                     total, renamed, merged, errors = process_pdfs_merge(
                         input_dir, output_dir, self._thread_safe_progress_callback, 
-                        self.log_callback, self.settings, self.cancel_flag
+                        self.log_callback, run_config, self.cancel_flag, manifest, preflight_results
                     )
                 else:
                     total, renamed, merged, errors = process_pdfs_rename(
                         input_dir, output_dir, self._thread_safe_progress_callback, 
-                        self.log_callback, self.settings, self.cancel_flag
+                        self.log_callback, run_config, self.cancel_flag, manifest, filename_template, preflight_results
                     )
 
                 if not self.cancel_flag.is_set():
+                    if plan_mode != "off":
+                        self.parent.after(0, lambda: self._advance_plan_mode(plan_mode, plan_path))
                     # Update UI on main thread
                     self.parent.after(0, lambda: self.statistics.update_statistics(total, renamed, merged, errors))
                     self.parent.after(0, lambda: self.output_location.set_output_path(output_dir))
@@ -225,9 +282,12 @@ class ProcessButtonComponent:
     def _reset_ui_for_processing(self):
         """Reset UI elements for processing start"""
         self.statistics.reset()
+        self._progress_version = None
         self.progress_var.set(0)
         self.progress_percentage_var.set("0%")
         self.gui.progress_bar.set_progress(0)
+        self.gui.progress_bar.set_detail("")
+        self._start_progress_polling()
     
     def _set_progress_complete(self):
         """Set progress to 100% completion"""
@@ -235,6 +295,20 @@ class ProcessButtonComponent:
         self.progress_var.set(100)
         self.progress_percentage_var.set("100%")
     
+    def _advance_plan_mode(self, plan_mode, plan_path):
+        """Majukan plan_mode setelah dipakai: "plan" menjadi "apply", "apply" kembali "off".
+
+        plan_mode tidak punya kontrol di GUI, sehingga tidak boleh tertinggal di settings tersimpan
+        dan diam-diam berlaku untuk proses berikutnya.
+        """
+        next_mode = "apply" if plan_mode == "plan" else "off"
+        self.settings["plan_mode"] = next_mode
+        self.gui.save_current_settings()
+        if next_mode == "apply":
+            log_message(f"🗒️ Proses berikutnya akan menjalankan rencana {plan_path}", Fore.CYAN, log_callback=self.log_callback)
+        else:
+            log_message("🗒️ Rencana selesai dijalankan, mode rencana dimatikan", Fore.CYAN, log_callback=self.log_callback)
+
     def _reset_button_safe(self):
         """Thread-safe button reset"""
         def reset_button():
@@ -249,37 +323,32 @@ class ProcessButtonComponent:
         self.parent.after(0, lambda: messagebox.showerror(title, message))
     
     def _thread_safe_progress_callback(self, stage, current, total_files, total_to_merge, total_to_finalize):
-        """Thread-safe progress callback"""
+        """Thread-safe progress callback: hanya mencatat angka terakhir, GUI membacanya lewat _poll_progress"""
         if self.cancel_flag.is_set():
             return  # Stop updating progress if cancelled
-            
-        # Debug logging
-        log_message(f"Progress Debug: stage={stage}, current={current}, total_files={total_files}, total_to_merge={total_to_merge}, total_to_finalize={total_to_finalize}", Fore.CYAN, log_callback=self.log_callback)
-            
-        # Calculate progress same as before
-        if stage == "reading":
-            percentage = (current / max(total_files, 1)) * 40
-        elif stage == "processing":
-            percentage = 40 + (current / max(total_to_merge, 1)) * 40
-        else:  # finalizing
-            if total_to_finalize > 0:
-                percentage = 80 + (current / max(total_to_finalize, 1)) * 20
-            else:
-                percentage = 100  # If no finalization needed, go to 100%
+        self.progress_tracker.update(stage, current, total_files, total_to_merge, total_to_finalize)
 
-        percentage = min(max(percentage, 0), 100)
-        normalized_progress = percentage / 100
-        
-        log_message(f"Progress calculated: {percentage:.1f}%", Fore.CYAN, log_callback=self.log_callback)
+    def _start_progress_polling(self):
+        """Mulai membaca progress tracker di main thread dengan frame rate tetap"""
+        if self._progress_poll_id is None:
+            self._progress_poll_id = self.parent.after(PROGRESS_REFRESH_MS, self._poll_progress)
 
-        # Update UI on main thread
-        def update_ui():
-            if not self.cancel_flag.is_set():
-                self.gui.progress_bar.set_progress(normalized_progress)
-                self.progress_var.set(percentage)
-                self.progress_percentage_var.set(f"{percentage:.1f}%")
-        
-        self.parent.after(0, update_ui)
+    def _poll_progress(self):
+        """Perbarui progress bar dari sampel terakhir; berhenti setelah thread pemrosesan selesai"""
+        self._progress_poll_id = None
+        running = self.processing_thread is not None and self.processing_thread.is_alive()
+        version = self.progress_tracker.version
+        if version != self._progress_version and not self.cancel_flag.is_set():
+            self._progress_version = version
+            sample = self.progress_tracker.sample()
+            if sample is not None:
+                self.gui.progress_bar.set_progress(sample.percentage / 100)
+                self.progress_var.set(sample.percentage)
+                self.progress_percentage_var.set(f"{sample.percentage:.1f}%")
+                self.gui.progress_bar.set_detail(format_progress_detail(sample))
+                log_message(f"Progress: {sample.stage} {sample.current}/{sample.total} ({sample.percentage:.1f}%)", Fore.CYAN, log_callback=self.log_callback, level=DEBUG)
+        if running:
+            self._progress_poll_id = self.parent.after(PROGRESS_REFRESH_MS, self._poll_progress)
 
     def log_callback(self, message):
         if self.statistics:
@@ -31,6 +31,11 @@ class ProgressBarComponent:
         ctk.CTkLabel(self.progress_frame, textvariable=self.progress_percentage_var, font=("Roboto", 12),
                      text_color=self.colors["fg"]).grid(row=1, column=1, padx=(10, 10))  # Tambah padding untuk ruang lebih
 
+        # Kecepatan dan perkiraan sisa waktu
+        self.progress_detail_var = ctk.StringVar(value="")
+        ctk.CTkLabel(self.progress_frame, textvariable=self.progress_detail_var, font=("Roboto", 11),
+                     text_color=self.colors["fg"]).grid(row=2, column=0, columnspan=2, sticky="w", padx=(5, 5), pady=(3, 0))
+
     def set_progress(self, value):
         """Mengatur nilai progress bar secara langsung (skala 0 hingga 1)."""
         # Clamp and sanitize value to avoid rendering issues
@@ -45,6 +50,11 @@ class ProgressBarComponent:
         # Only set; do not call update()/update_idletasks() to avoid re-entrant mainloop
         self.progress_bar.set(v)
 
+    def set_detail(self, text):
+        """Mengatur teks kecepatan/ETA di bawah progress bar."""
+        if self.progress_detail_var.get() != text:
+            self.progress_detail_var.set(text)
+
     def update_theme(self, colors):
         self.colors = colors
         for child in self.progress_frame.winfo_children():
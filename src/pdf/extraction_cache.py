@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import threading
+import time
+from src.pdf.text_backends import resolve_backends
+from src.utils.log_writer import resolve_application_path
+from src.utils.utils import log_message, Fore
+
+# Naikkan versi ini setiap kali logika ekstraksi berubah agar hasil lama tidak dipakai lagi
+EXTRACTION_VERSION = 2
+# Naikkan versi ini setiap kali struktur tabel berubah; tabel lama dibuang saat cache dibuka
+CACHE_SCHEMA_VERSION = 2
+
+# Lokasi default, relatif terhadap folder aplikasi (bukan working directory)
+DEFAULT_CACHE_FILE = "extraction_cache.db"
+# Jumlah penulisan sebelum commit ke database
+COMMIT_INTERVAL = 100
+# Batas jumlah entry; entry yang paling lama tidak dipakai dibuang saat cache dibuka
+DEFAULT_MAX_CACHE_ENTRIES = 50000
+
+
+def extraction_variant(first_page_only=True, backends=None):
+    """Kunci varian ekstraksi: hasil dengan pengaturan ekstraksi berbeda disimpan terpisah."""
+    backend_names = ",".join(backend.name for backend in resolve_backends(backends))
+    return f"v{EXTRACTION_VERSION}:{'first_page' if first_page_only else 'all_pages'}:{backend_names}"
+
+
+class ExtractionCache:
+    """Cache hasil extract_info_from_pdf di SQLite.
+
+    Satu entry per (path, varian); entry hanya dipakai jika size dan mtime file masih sama, dan
+    hasil baru untuk file yang berubah menggantikan entry lamanya. Saat dibuka, entry yang paling
+    lama tidak dipakai dibuang jika jumlahnya melebihi max_entries.
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, max_entries=DEFAULT_MAX_CACHE_ENTRIES):
+        self.cache_file = resolve_application_path(cache_file)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        # Entry yang dipakai di sesi ini; used_at diperbarui sekaligus saat cache ditutup
+        self._used = set()
+        self._connection = sqlite3.connect(self.cache_file, check_same_thread=False)
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_SCHEMA_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS extraction_cache")
+            self._connection.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS extraction_cache ("
+            " path TEXT NOT NULL, variant TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " used_at INTEGER NOT NULL, id_tku TEXT, partner_name TEXT, faktur_number TEXT, date TEXT, reference TEXT,"
+            " PRIMARY KEY (path, variant))"
+        )
+        self._connection.commit()
+        self.prune()
+
+    @staticmethod
+    def file_key(pdf_path, stat_result=None):
+        """Identitas file untuk cache; berubah jika file diganti atau dimodifikasi.
+
+        Hanya size dan mtime yang dipakai: st_ino dari os.scandir bernilai 0 di Windows sedangkan
+        os.stat mengisinya, sehingga key dari dua sumber stat itu tidak akan pernah sama.
+        """
+        if stat_result is None:
+            stat_result = os.stat(pdf_path)
+        return (os.path.normcase(os.path.abspath(pdf_path)), stat_result.st_size, stat_result.st_mtime_ns)
+
+    def get(self, pdf_path, variant, stat_result=None):
+        """Ambil hasil ekstraksi tersimpan, atau None jika belum ada / file sudah berubah."""
+        try:
+            path, size, mtime_ns = self.file_key(pdf_path, stat_result)
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT id_tku, partner_name, faktur_number, date, reference FROM extraction_cache"
+                    " WHERE path = ? AND variant = ? AND size = ? AND mtime_ns = ?",
+                    (path, variant, size, mtime_ns)
+                ).fetchone()
+                if row:
+                    self._used.add((path, variant))
+            return tuple(row) if row else None
+        except (OSError, sqlite3.Error):
+            return None
+
+    def put(self, pdf_path, variant, info, stat_result=None):
+        """Simpan hasil ekstraksi (id_tku, partner_name, faktur_number, date, reference)."""
+        try:
+            path, size, mtime_ns = self.file_key(pdf_path, stat_result)
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO extraction_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, variant, size, mtime_ns, int(time.time()), *info)
+                )
+                self._pending_writes += 1
+                if self._pending_writes >= COMMIT_INTERVAL:
+                    self._connection.commit()
+                    self._pending_writes = 0
+        except (OSError, sqlite3.Error):
+            pass
+
+    def prune(self):
+        """Buang entry yang paling lama tidak dipakai sampai jumlahnya tidak melebihi max_entries."""
+        if not self.max_entries:
+            return 0
+        try:
+            with self._lock:
+                count = self._connection.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+                excess = count - self.max_entries
+                if excess <= 0:
+                    return 0
+                self._connection.execute(
+                    "DELETE FROM extraction_cache WHERE rowid IN"
+                    " (SELECT rowid FROM extraction_cache ORDER BY used_at LIMIT ?)",
+                    (excess,)
+                )
+                self._connection.commit()
+            return excess
+        except sqlite3.Error:
+            return 0
+
+    def close(self):
+        with self._lock:
+            try:
+                if self._used:
+                    used_at = int(time.time())
+                    self._connection.executemany(
+                        "UPDATE extraction_cache SET used_at = ? WHERE path = ? AND variant = ?",
+                        ((used_at, path, variant) for path, variant in self._used)
+                    )
+                    self._used.clear()
+                self._connection.commit()
+                self._connection.close()
+            except sqlite3.Error:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def open_extraction_cache(settings, log_callback=None):
+    """Buka cache ekstraksi sesuai pengaturan; None jika cache dimatikan atau tidak bisa dibuka."""
+    if not settings.get("use_extraction_cache", True):
+        return None
+    cache_file = settings.get("extraction_cache_file", DEFAULT_CACHE_FILE)
+    try:
+        return ExtractionCache(cache_file, settings.get("extraction_cache_max_entries", DEFAULT_MAX_CACHE_ENTRIES))
+    except sqlite3.Error as e:
+        log_message(f"⚠️ Cache ekstraksi tidak dapat dibuka ({str(e)}), ekstraksi dijalankan tanpa cache", Fore.YELLOW, log_callback=log_callback)
+        return None
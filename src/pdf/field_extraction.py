@@ -0,0 +1,222 @@
+import re
+from src.pdf.sanitizer import sanitize_faktur_number, sanitize_reference
+
+MONTHS = {
+    "Januari": "01", "Februari": "02", "Maret": "03", "April": "04", "Mei": "05", "Juni": "06",
+    "Juli": "07", "Agustus": "08", "September": "09", "Oktober": "10", "November": "11", "Desember": "12"
+}
+
+
+class FieldSpec:
+    """Spesifikasi satu field: pola regex (dicoba berurutan), pengambil nilai, sanitizer, dan nilai default."""
+
+    def __init__(self, name, label, patterns, default, extract=None, sanitize=None, flags=0, finder=None, optional_marker=None):
+        self.name = name
+        self.label = label
+        self.patterns = [re.compile(pattern, flags) for pattern in patterns]
+        self.default = default
+        self.extract = extract or (lambda match: match.group(1).strip())
+        self.sanitize = sanitize
+        # finder(text) -> str/None menggantikan pola regex untuk field dengan pencarian khusus
+        self.finder = finder
+        # Field opsional: dianggap selesai begitu label ini terlihat walaupun nilainya kosong
+        self.optional_marker = optional_marker
+
+    def search(self, text):
+        """Cari nilai field di teks; None jika tidak ada pola yang menghasilkan nilai."""
+        if self.finder:
+            return self._finish(self.finder(text))
+        for pattern in self.patterns:
+            match = pattern.search(text)
+            if not match:
+                continue
+            value = self.extract(match)
+            if not value:
+                continue
+            return self._finish(value)
+        return None
+
+    def _finish(self, value):
+        if not value:
+            return None
+        if self.sanitize:
+            value = self.sanitize(value)
+        return value or self.default
+
+
+def _extract_date(match):
+    return f"{match.group(1)}-{MONTHS.get(match.group(2), '00')}-{match.group(3)}"
+
+
+REFERENCE_LABEL = "Referensi:"
+# Referensi hanya dicari di jendela sepanjang ini setelah label, bukan sampai akhir dokumen
+REFERENCE_WINDOW = 512
+# Jumlah karakter teks sebelumnya yang ikut dipindai ulang saat halaman baru ditambahkan
+SCAN_OVERLAP = 2048
+
+
+def find_reference(text):
+    """Ambil Referensi dari jendela terbatas setelah label "Referensi:".
+
+    Nilai adalah baris pertama yang tidak kosong setelah label. Baris yang mengandung '}'
+    hanya dipakai jika tidak ada label lain dengan nilai bersih; pada kasus itu baris
+    lanjutan ikut diambil dengan aturan pola fallback lama (lihat _reference_block).
+    Setiap label hanya memeriksa REFERENCE_WINDOW karakter, sehingga waktu proses linear
+    terhadap panjang teks tanpa risiko backtracking regex.
+    """
+    fallback = None
+    # Posisi ':' terakhir di teks; dipakai aturan berhenti baris lanjutan tanpa memindai ulang teks
+    last_colon = text.rfind(":")
+    label_start = text.find(REFERENCE_LABEL)
+    while label_start != -1:
+        value_start = label_start + len(REFERENCE_LABEL)
+        window = text[value_start:value_start + REFERENCE_WINDOW]
+        body = window.lstrip()
+        first_line = body.split("\n", 1)[0]
+        if first_line.strip():
+            if "}" not in first_line:
+                return first_line.strip()
+            if fallback is None:
+                fallback = _reference_block(text, value_start + len(window) - len(body), last_colon)
+        label_start = text.find(REFERENCE_LABEL, value_start)
+    return fallback
+
+
+def _reference_block(text, start, last_colon):
+    """Baris pertama mulai dari start beserta baris lanjutannya, sama dengan pola fallback lama
+    r'Referensi:\\s*(.*?)(?:\\n\\s*(?:[A-Z][^:]*:|$))' tetapi dibatasi REFERENCE_WINDOW.
+
+    Berhenti di baris kosong, atau di baris yang diawali huruf besar selama masih ada ':' di
+    mana pun setelahnya di teks (tidak harus di baris yang sama). Return None jika teks habis
+    sebelum batas ditemukan, seperti pola lama yang tidak cocok pada label tersebut.
+    """
+    window_end = min(start + REFERENCE_WINDOW, len(text))
+    newline = text.find("\n", start, window_end)
+    while newline != -1:
+        line_end = text.find("\n", newline + 1, window_end)
+        line = text[newline + 1:line_end if line_end != -1 else window_end]
+        stripped = line.lstrip()
+        if not stripped and (line_end != -1 or window_end == len(text)):
+            break
+        if stripped and "A" <= stripped[0] <= "Z" and last_colon > newline + 1 + len(line) - len(stripped):
+            break
+        newline = line_end
+    else:
+        if window_end == len(text):
+            return None
+        # Jendela habis: ambil isi sampai batas jendela
+        return text[start:window_end].strip()
+    return text[start:newline].strip()
+
+
+# Registry field sesuai urutan tuple hasil ekstraksi: (ID TKU, Nama Partner, Nomor Faktur, Tanggal, Referensi)
+FIELD_SPECS = (
+    FieldSpec(
+        "id_tku", "ID TKU",
+        [r'#?(\d{22})'],
+        "IDTKU_Tidak_Ditemukan",
+    ),
+    FieldSpec(
+        "partner_name", "Nama Partner",
+        [r'Pembeli Barang Kena Pajak\s*/\s*Penerima Jasa Kena Pajak:\s*Nama\s*:\s*(.+?)\s*Alamat'],
+        "Nama tidak ditemukan",
+        extract=lambda match: match.group(1).strip().title(),
+        flags=re.DOTALL,
+    ),
+    FieldSpec(
+        "faktur_number", "Nomor Faktur",
+        [r'Faktur Pajak:\s*([\w\d\-/.]{1,50}?)(?:\s|$|\n)'],
+        "NoFaktur",
+        sanitize=sanitize_faktur_number,
+        flags=re.IGNORECASE,
+    ),
+    FieldSpec(
+        "date", "Tanggal",
+        [r'(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})'],
+        "Tanggal tidak ditemukan",
+        extract=_extract_date,
+    ),
+    FieldSpec(
+        "reference", "Referensi",
+        [],
+        "",
+        sanitize=sanitize_reference,
+        finder=find_reference,
+        optional_marker=REFERENCE_LABEL,
+    ),
+)
+
+
+class FieldExtractor:
+    """Engine ekstraksi field: teks diberikan bertahap (per halaman), field yang sudah
+    ditemukan tidak dicari lagi, dan pencarian berhenti saat semua field ditemukan atau,
+    untuk field opsional (Referensi), labelnya sudah terlihat walaupun nilainya kosong.
+
+    Setiap update hanya memindai teks baru ditambah SCAN_OVERLAP karakter terakhir teks
+    sebelumnya (dimulai dari awal baris), agar field yang terpotong di batas halaman tetap
+    ditemukan tanpa memindai ulang seluruh teks gabungan.
+    """
+
+    def __init__(self, specs=FIELD_SPECS):
+        self.specs = specs
+        self.values = {}
+        self.markers_seen = set()
+        self._scanned_length = 0
+
+    @property
+    def is_complete(self):
+        return len(self.values) == len(self.specs)
+
+    @property
+    def is_settled(self):
+        """True jika semua field wajib ditemukan dan setiap field opsional sudah ditemukan atau labelnya sudah terlihat."""
+        return all(
+            spec.name in self.values or (spec.optional_marker and spec.optional_marker in self.markers_seen)
+            for spec in self.specs
+        )
+
+    def update(self, text):
+        """Cari field yang belum ditemukan di bagian baru text (teks gabungan sejauh ini).
+
+        Return True jika pembacaan halaman berikutnya bisa dihentikan (lihat is_settled).
+        """
+        if len(text) <= self._scanned_length:
+            return self.is_settled
+        start = 0
+        if self._scanned_length > SCAN_OVERLAP:
+            start = text.rfind("\n", 0, self._scanned_length - SCAN_OVERLAP) + 1
+        self._scanned_length = len(text)
+        new_text = text[start:]
+        for spec in self.specs:
+            if spec.optional_marker and spec.optional_marker in new_text:
+                self.markers_seen.add(spec.optional_marker)
+            if spec.name in self.values:
+                continue
+            value = spec.search(new_text)
+            if value is not None and value != spec.default:
+                self.values[spec.name] = value
+        return self.is_settled
+
+    def result(self):
+        return tuple(self.values.get(spec.name, spec.default) for spec in self.specs)
+
+
+class FieldStats:
+    """Penghitung hit/miss per field dari hasil ekstraksi, untuk memantau pola mana yang sering gagal."""
+
+    def __init__(self, specs=FIELD_SPECS):
+        self.specs = specs
+        self.hits = {spec.name: 0 for spec in specs}
+        self.total = 0
+
+    def record(self, info):
+        self.total += 1
+        for spec, value in zip(self.specs, info):
+            if value != spec.default:
+                self.hits[spec.name] += 1
+
+    def misses(self, name):
+        return self.total - self.hits[name]
+
+    def summary(self):
+        return ", ".join(f"{spec.label} {self.hits[spec.name]}/{self.total}" for spec in self.specs)
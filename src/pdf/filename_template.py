@@ -0,0 +1,113 @@
+from src.utils.utils import log_message, Fore
+from src.pdf.sanitizer import slash_table
+
+# Komponen nama file (nama yang sama dipakai di GUI dan di pengaturan component_order)
+NAME = "Nama Lawan Transaksi"
+DATE = "Tanggal Faktur Pajak"
+REFERENCE = "Referensi"
+FAKTUR = "Nomor Faktur Pajak"
+DEFAULT_COMPONENT_ORDER = (NAME, DATE, REFERENCE, FAKTUR)
+COMPONENT_SETTINGS = {NAME: "use_name", DATE: "use_date", REFERENCE: "use_reference", FAKTUR: "use_faktur"}
+
+INVALID_SEPARATOR_CHARS = '<>:"/\\|?*'
+# Batas panjang nama file default untuk kompatibilitas Windows
+DEFAULT_MAX_FILENAME_LENGTH = 130
+EXTENSION = ".pdf"
+
+
+class FilenameTemplate:
+    """Template nama file yang dikompilasi sekali per proses dari pengaturan.
+
+    Validasi pemisah, urutan komponen yang aktif, dan peran setiap komponen ditentukan saat
+    kompilasi, sehingga membuat nama untuk setiap file hanya beberapa operasi join string.
+    Dipakai bersama oleh preflight (check_long_filenames) dan mode Rename Saja.
+    """
+
+    def __init__(self, component_order=None, separator="-", slash_replacement="_", wrap_reference=False, enabled_components=None, max_length=None):
+        if any(char in separator for char in INVALID_SEPARATOR_CHARS) or any(char in slash_replacement for char in INVALID_SEPARATOR_CHARS):
+            log_message(f"Error: Pemisah '{separator}' atau pengganti garis miring '{slash_replacement}' mengandung karakter tidak valid!", Fore.RED)
+            raise ValueError("Pemisah atau pengganti garis miring mengandung karakter tidak valid!")
+        if enabled_components is None:
+            enabled_components = DEFAULT_COMPONENT_ORDER
+        self.separator = separator
+        self.slash_replacement = slash_replacement
+        self._slash_table = slash_table(slash_replacement)
+        self.wrap_reference = bool(wrap_reference)
+        self.max_length = DEFAULT_MAX_FILENAME_LENGTH if max_length is None else max_length
+        # Komponen aktif sesuai urutan; komponen yang tidak dikenal diabaikan
+        self.roles = tuple(
+            component for component in (component_order or DEFAULT_COMPONENT_ORDER)
+            if component in COMPONENT_SETTINGS and component in enabled_components
+        )
+
+    @classmethod
+    def from_config(cls, settings):
+        """Kompilasi template dari RunConfig (atau dict settings dengan nilai yang sudah dibekukan)."""
+        return cls(
+            settings.get("component_order", None),
+            settings.get("separator", "-"),
+            settings.get("slash_replacement", "_"),
+            bool(settings.get("wrap_reference", False)),
+            [component for component, key in COMPONENT_SETTINGS.items() if bool(settings.get(key, False))],
+            settings.get("max_filename_length", None)
+        )
+
+    def with_max_length(self, max_length):
+        """Salinan template dengan batas panjang lain."""
+        template = object.__new__(FilenameTemplate)
+        template.__dict__.update(self.__dict__)
+        template.max_length = DEFAULT_MAX_FILENAME_LENGTH if max_length is None else max_length
+        return template
+
+    def components(self, partner_name, faktur_number, date, reference):
+        """Return [(peran, nilai), ...] untuk komponen aktif; nomor faktur kosong (NoFaktur) dilewati."""
+        if not reference:
+            reference = "NoRef"
+        else:
+            reference = reference.translate(self._slash_table)
+            if self.wrap_reference and reference != "NoRef":
+                reference = f"({reference})"
+        values = {NAME: partner_name, DATE: date, REFERENCE: reference, FAKTUR: faktur_number}
+        return [(role, values[role]) for role in self.roles if not (role == FAKTUR and faktur_number == "NoFaktur")]
+
+    def full_name(self, partner_name, faktur_number, date, reference):
+        """Nama file lengkap tanpa pemotongan (dipakai preflight untuk mengecek panjang asli)."""
+        parts = [value for _, value in self.components(partner_name, faktur_number, date, reference)]
+        return self.separator.join(parts or ["unnamed"]) + EXTENSION
+
+    def __call__(self, partner_name, faktur_number, date, reference):
+        """Nama file final; referensi dipotong jika nama melebihi max_length."""
+        components = self.components(partner_name, faktur_number, date, reference)
+        filename = self.separator.join([value for _, value in components] or ["unnamed"]) + EXTENSION
+        if len(filename) <= self.max_length:
+            return filename
+        if len(components) < 2:
+            # Fallback: potong filename secara brutal
+            available_length = self.max_length - len(EXTENSION)
+            return filename[:-len(EXTENSION)][:available_length - 3] + "..." + EXTENSION
+        return self._truncate(dict(components))
+
+    def _truncate(self, values):
+        """Prioritaskan nama, tanggal, dan nomor faktur; potong referensi.
+
+        Format: {nama}-{tanggal}-{referensi...} {nomor_faktur}.pdf
+        """
+        separator = self.separator
+        available_length = self.max_length - len(EXTENSION)
+        fixed_parts = [values[role] for role in (NAME, DATE) if role in values]
+        referensi = values.get(REFERENCE, "")
+        nomor_faktur = values.get(FAKTUR, "")
+
+        faktur_suffix = f" {nomor_faktur}" if nomor_faktur else ""
+        fixed_length = len(separator.join(fixed_parts)) + len(faktur_suffix) + 4  # +4 for .pdf
+        if separator and len(fixed_parts) > 1:
+            fixed_length += len(separator)  # For separator before referensi
+
+        remaining_length = available_length - fixed_length
+        if remaining_length > 10 and referensi:  # Minimal 10 char untuk referensi
+            # Potong referensi jika terlalu panjang dengan visual delimiter {}
+            if len(referensi) > remaining_length - 5:  # -5 untuk {...}
+                referensi = f"{{{referensi[:remaining_length - 5]}...}}"
+            return separator.join(fixed_parts + [referensi]) + faktur_suffix + EXTENSION
+        # Hanya nama, tanggal, dan faktur
+        return separator.join(fixed_parts) + faktur_suffix + EXTENSION
@@ -0,0 +1,154 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from src.pdf.pdf_utils import merge_pdfs_in_volumes, copy_single_pdf
+from src.pdf.pdf_append import append_pdfs
+from src.pdf.pdf_document import PDFDocument
+from src.pdf.pdf_extractor import resolve_worker_count, PENDING_TASKS_PER_WORKER
+from src.utils.utils import log_message, Fore, init_worker_logging, logging_config
+
+
+class MergeJob:
+    """Satu grup partner yang akan ditulis ke output_path.
+
+    append=True berarti halaman ditambahkan ke file gabungan yang sudah ada (incremental update).
+    skipped adalah jumlah file grup yang dilewati karena nomor fakturnya sudah ada di file gabungan.
+    """
+
+    def __init__(self, output_path, documents, faktur_numbers=None, append=False, skipped=0):
+        self.output_path = output_path
+        self.documents = documents
+        self.faktur_numbers = faktur_numbers or []
+        self.append = append
+        self.skipped = skipped
+
+
+def merge_group_files(pdf_paths, output_path, log_callback=None, append=False, optimize=True, max_pages=0, max_bytes=0):
+    """Merge satu grup. Dengan append, halaman ditambahkan ke file yang sudah ada;
+    grup berisi satu file untuk file baru disalin langsung tanpa PdfWriter.
+    max_pages/max_bytes (0 = tanpa batas) membagi output menjadi beberapa volume."""
+    if append and os.path.exists(output_path):
+        append_pdfs(pdf_paths, output_path, log_callback, optimize)
+    elif len(pdf_paths) == 1:
+        copy_single_pdf(pdf_paths[0], output_path, log_callback)
+    else:
+        merge_pdfs_in_volumes(pdf_paths, output_path, log_callback, optimize, max_pages, max_bytes)
+
+
+def merge_source(document):
+    """Data dokumen untuk worker: (path, byte) jika byte sudah di memori, selain itu path saja.
+
+    Byte yang sudah dibaca saat ekstraksi dikirim lewat pipe ke worker (satu salinan memori)
+    agar file tidak dibaca ulang dari disk; dokumen yang byte-nya sudah dilepas (batas memori
+    merge_memory_budget_mb atau index di disk) dibaca oleh worker sendiri.
+    """
+    if document.loaded_size:
+        return document.pdf_path, document.data
+    return document.pdf_path
+
+
+def merge_group(sources, output_path, append=False, merge_options=None):
+    """Merge satu grup partner di worker process. sources berisi hasil merge_source.
+
+    Pesan log dikumpulkan dan dikembalikan ke proses utama agar bisa ditampilkan di GUI
+    sesuai urutan grup. Return: (messages, error) dengan error None jika berhasil.
+    """
+    messages = []
+    documents = [PDFDocument(*source) if isinstance(source, tuple) else PDFDocument(source) for source in sources]
+    try:
+        merge_group_files(documents, output_path, messages.append, append, **(merge_options or {}))
+        return messages, None
+    except Exception as e:
+        return messages, e
+    finally:
+        for document in documents:
+            document.close()
+
+
+def iter_merged_groups(jobs, max_workers=1, cancel_flag=None, log_callback=None, total_groups=None, merge_options=None):
+    """Merge setiap MergeJob dan menghasilkan (job, error) sesuai urutan job.
+
+    Dengan max_workers > 1 grup di-merge paralel di process pool dengan jumlah grup yang
+    berjalan/menunggu dibatasi; byte dokumen yang sudah dibaca saat ekstraksi dikirim ke
+    worker sehingga file tidak dibaca dua kali (lihat merge_source). Kegagalan satu grup dikembalikan sebagai error tanpa
+    menghentikan grup lainnya. Dokumen sudah ditutup saat hasilnya dikembalikan.
+    Job tanpa dokumen (semua file dilewati) langsung dikembalikan tanpa menulis file.
+    merge_options (optimize, max_pages, max_bytes) diteruskan ke merge_group_files.
+    """
+    max_workers = resolve_worker_count(max_workers, total_groups)
+    if max_workers > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker_logging, initargs=(logging_config(),))
+        except (OSError, ImportError, NotImplementedError) as e:
+            log_message(f"⚠️ Process pool tidak tersedia ({str(e)}), merge dijalankan berurutan", Fore.YELLOW, log_callback=log_callback)
+            max_workers = 1
+    if max_workers <= 1:
+        yield from _iter_merged_groups_sequential(jobs, cancel_flag, log_callback, merge_options)
+        return
+
+    log_message(f"⚙️ Merge paralel dengan {max_workers} worker", Fore.CYAN, log_callback=log_callback)
+    pending = deque()
+    remaining_jobs = iter(jobs)
+    try:
+        while True:
+            while len(pending) < max_workers * PENDING_TASKS_PER_WORKER:
+                job = next(remaining_jobs, None)
+                if job is None:
+                    break
+                future = None
+                if job.documents:
+                    future = executor.submit(
+                        merge_group, [merge_source(document) for document in job.documents], job.output_path, job.append, merge_options
+                    )
+                # Byte sudah diserahkan ke worker (atau dibaca worker sendiri); salinan di proses utama dilepas
+                for document in job.documents:
+                    document.close()
+                pending.append((job, future))
+            if not pending:
+                break
+
+            # Hasil dilaporkan sesuai urutan grup
+            job, future = pending.popleft()
+            if future is None:
+                yield job, None
+                continue
+            while not wait([future], timeout=0.1).done:
+                if cancel_flag and cancel_flag.is_set():
+                    return
+            try:
+                messages, error = future.result()
+            except Exception as e:
+                messages, error = [], e
+            if log_callback:
+                for message in messages:
+                    log_callback(message)
+
+            yield job, error
+
+            if cancel_flag and cancel_flag.is_set():
+                return
+    finally:
+        # Grup yang belum berjalan dibatalkan; grup yang sedang ditulis ditunggu selesai agar tidak
+        # ada file gabungan setengah jadi dan worker yatim setelah proses dibatalkan
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _iter_merged_groups_sequential(jobs, cancel_flag, log_callback, merge_options):
+    """Merge berurutan di thread saat ini; byte dokumen yang sudah di memori dipakai langsung."""
+    for job in jobs:
+        if cancel_flag and cancel_flag.is_set():
+            for document in job.documents:
+                document.close()
+            return
+        if not job.documents:
+            yield job, None
+            continue
+        error = None
+        try:
+            merge_group_files(job.documents, job.output_path, log_callback, job.append, **(merge_options or {}))
+        except Exception as e:
+            error = e
+        finally:
+            for document in job.documents:
+                document.close()
+        yield job, error
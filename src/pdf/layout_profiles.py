@@ -0,0 +1,76 @@
+from src.pdf.field_extraction import FIELD_SPECS
+
+FIELD_SPECS_BY_NAME = {spec.name: spec for spec in FIELD_SPECS}
+
+
+class LayoutRegion:
+    """Satu area di halaman pertama. bbox relatif terhadap ukuran halaman: (x0, top, x1, bottom) dalam 0..1.
+    anchor adalah teks yang wajib ada di area tersebut agar profil dianggap cocok. Pada area optional,
+    nilai hanya dicari di baris anchor dan nilai kosong berarti field memang kosong (nilai default),
+    sehingga baris lain di area (mis. tanggal di blok tanda tangan) tidak terbaca sebagai nilai."""
+
+    def __init__(self, field_name, bbox, anchor=None, optional=False):
+        self.field_name = field_name
+        self.bbox = bbox
+        self.anchor = anchor
+        self.optional = optional
+
+    def anchor_line(self, text):
+        """Baris text yang memuat anchor, mulai dari anchor."""
+        start = text.index(self.anchor)
+        end = text.find("\n", start)
+        return text[start:end if end != -1 else len(text)]
+
+    def absolute_bbox(self, page):
+        x0, top, x1, bottom = self.bbox
+        page_x0, page_top = page.bbox[0], page.bbox[1]
+        return (
+            page_x0 + x0 * page.width, page_top + top * page.height,
+            page_x0 + x1 * page.width, page_top + bottom * page.height
+        )
+
+
+class LayoutProfile:
+    """Profil layout: daftar area per field. Field yang tidak punya area tetap bernilai default."""
+
+    def __init__(self, name, regions):
+        self.name = name
+        self.regions = regions
+
+    def extract(self, page):
+        """Ekstrak field dari area-area profil di page (pdfplumber). None jika profil tidak cocok."""
+        values = {}
+        for region in self.regions:
+            try:
+                text = page.crop(region.absolute_bbox(page)).extract_text() or ""
+            except ValueError:
+                # Area di luar batas halaman: profil tidak cocok dengan ukuran halaman ini
+                return None
+            if region.anchor and region.anchor not in text:
+                return None
+            if region.optional and region.anchor:
+                text = region.anchor_line(text)
+            value = FIELD_SPECS_BY_NAME[region.field_name].search(text)
+            if value is None:
+                # Baris anchor yang berisi teks tetapi tidak menghasilkan nilai (mis. referensi
+                # multi-baris) diserahkan ke ekstraksi teks penuh
+                if region.optional and not (region.anchor and text[len(region.anchor):].strip()):
+                    continue
+                return None
+            values[region.field_name] = value
+        return tuple(values.get(spec.name, spec.default) for spec in FIELD_SPECS)
+
+
+# Profil Faktur Pajak Coretax (A4 potret): kepala faktur, blok penjual, blok pembeli, lalu
+# tanggal di blok tanda tangan kanan bawah dan Referensi di bawah tabel. Setiap area punya anchor
+# sehingga area yang bergeser membuat profil tidak cocok dan ekstraksi kembali ke teks penuh,
+# bukan mengambil angka acak (mis. tanggal dari baris barang). Referensi boleh kosong.
+CORETAX_PROFILE = LayoutProfile("coretax", [
+    LayoutRegion("faktur_number", (0.0, 0.02, 1.0, 0.12), "Faktur Pajak:"),
+    LayoutRegion("id_tku", (0.0, 0.08, 1.0, 0.22), "Pengusaha Kena Pajak"),
+    LayoutRegion("partner_name", (0.0, 0.18, 1.0, 0.36), "Pembeli Barang Kena Pajak"),
+    LayoutRegion("date", (0.45, 0.62, 1.0, 0.95), "Ditandatangani secara elektronik"),
+    LayoutRegion("reference", (0.0, 0.62, 1.0, 0.95), "Referensi:", optional=True),
+])
+
+LAYOUT_PROFILES = [CORETAX_PROFILE]
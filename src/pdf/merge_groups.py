@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import tempfile
+from src.pdf.pdf_document import PDFDocument
+
+# Jumlah record grup yang disimpan di memori sebelum dipindahkan ke index di disk
+MAX_GROUP_RECORDS_IN_MEMORY = 5000
+
+# Batas default total byte dokumen yang disimpan di memori sampai tahap merge
+DEFAULT_MERGE_MEMORY_BUDGET_MB = 256
+
+
+class MergeGroupIndex:
+    """Pengelompokan file per (ID TKU, Nama Partner) untuk mode merge dengan memori terbatas.
+
+    Setiap record berisi (PDFDocument, nomor faktur). Dokumen disimpan di memori (beserta byte-nya selama masih di bawah max_cached_bytes).
+    Jika jumlah record melebihi max_records_in_memory, semua record dipindahkan ke index
+    SQLite sementara dan hanya path file yang disimpan; dokumen dibuka ulang saat grupnya di-merge.
+    Setelah itu daftar grup juga hanya ada di index tersebut, di memori hanya tersisa record
+    yang ditambahkan sejak pemindahan terakhir.
+    Urutan grup dan urutan file di dalam grup sama dengan urutan saat record ditambahkan.
+    """
+
+    def __init__(self, max_cached_bytes=DEFAULT_MERGE_MEMORY_BUDGET_MB * 1024 * 1024, max_records_in_memory=MAX_GROUP_RECORDS_IN_MEMORY):
+        self.max_cached_bytes = max_cached_bytes
+        self.max_records_in_memory = max_records_in_memory
+        self.cached_bytes = 0
+        self.total_records = 0
+        # {id_tku: {partner_name: [(PDFDocument, faktur_number), ...]}}; dict menjaga urutan kemunculan pertama
+        self._groups = {}
+        self._records_in_memory = 0
+        self._spill_path = None
+        self._spill = None
+        self._sequence = 0
+        # {seq: PDFDocument} record terakhir yang dipindahkan ke index saat grup mulai dibaca,
+        # agar byte yang masih di memori tetap dipakai saat grupnya di-merge
+        self._kept_documents = {}
+
+    def add(self, id_tku, partner_name, document, faktur_number=None):
+        """Tambahkan dokumen ke grupnya."""
+        partners = self._groups.setdefault(id_tku, {})
+        records = partners.setdefault(partner_name, [])
+        if self.cached_bytes + document.loaded_size <= self.max_cached_bytes:
+            self.cached_bytes += document.loaded_size
+        else:
+            document.close()
+        records.append((document, faktur_number))
+        self.total_records += 1
+        self._records_in_memory += 1
+        if self._records_in_memory > self.max_records_in_memory:
+            self._spill_to_disk()
+
+    @property
+    def group_count(self):
+        if self._spill is not None:
+            self._spill_to_disk(keep_documents=True)
+            return self._spill.execute(
+                "SELECT COUNT(*) FROM (SELECT DISTINCT id_tku, partner_name FROM merge_groups)"
+            ).fetchone()[0]
+        return sum(len(partners) for partners in self._groups.values())
+
+    @property
+    def is_spilled(self):
+        return self._spill is not None
+
+    def _spill_to_disk(self, keep_documents=False):
+        """Pindahkan semua record dan grup di memori ke index SQLite dan lepaskan byte dokumennya.
+
+        Dengan keep_documents (grup mulai dibaca), dokumen disimpan per seq dan dipakai lagi
+        oleh _spilled_records sehingga byte yang sudah dibaca tidak dibaca ulang.
+        """
+        if self._spill is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix="merge_groups_", suffix=".db")
+            os.close(fd)
+            self._spill = sqlite3.connect(self._spill_path)
+            self._spill.execute("PRAGMA journal_mode = OFF")
+            self._spill.execute("PRAGMA synchronous = OFF")
+            self._spill.execute(
+                "CREATE TABLE merge_groups (id_tku TEXT NOT NULL, partner_name TEXT NOT NULL, seq INTEGER NOT NULL, path TEXT NOT NULL, faktur_number TEXT)"
+            )
+            self._spill.execute("CREATE INDEX merge_groups_key ON merge_groups (id_tku, partner_name, seq)")
+        rows = []
+        for id_tku, partners in self._groups.items():
+            for partner_name, records in partners.items():
+                for document, faktur_number in records:
+                    self._sequence += 1
+                    rows.append((id_tku, partner_name, self._sequence, document.pdf_path, faktur_number))
+                    if keep_documents:
+                        self._kept_documents[self._sequence] = document
+                    else:
+                        document.close()
+        # Grup yang muncul lagi setelah ini mendapat seq lebih besar; urutan grup diambil dari seq terkecil
+        self._groups.clear()
+        if rows:
+            self._spill.executemany("INSERT INTO merge_groups VALUES (?, ?, ?, ?, ?)", rows)
+            self._spill.commit()
+        self._records_in_memory = 0
+        if not keep_documents:
+            self.cached_bytes = 0
+
+    def _spilled_records(self, id_tku, partner_name):
+        rows = self._spill.execute(
+            "SELECT seq, path, faktur_number FROM merge_groups WHERE id_tku = ? AND partner_name = ? ORDER BY seq",
+            (id_tku, partner_name)
+        )
+        records = []
+        for seq, path, faktur_number in rows:
+            document = self._kept_documents.pop(seq, None)
+            if document is None:
+                document = PDFDocument(path)
+            else:
+                self.cached_bytes -= document.loaded_size
+            records.append((document, faktur_number))
+        return records
+
+    def iter_groups(self):
+        """Menghasilkan (id_tku, partner_name, records) per grup. Grup dilepas dari index
+        begitu diambil; pemanggil menutup dokumen setelah grup selesai di-merge."""
+        if self._spill is not None:
+            yield from self._iter_spilled_groups()
+            return
+        while self._groups:
+            id_tku = next(iter(self._groups))
+            partners = self._groups[id_tku]
+            while partners:
+                partner_name = next(iter(partners))
+                records = partners.pop(partner_name)
+                self._records_in_memory -= len(records)
+                self.cached_bytes -= sum(document.loaded_size for document, _ in records)
+                yield id_tku, partner_name, records
+            del self._groups[id_tku]
+
+    def _iter_spilled_groups(self):
+        """Grup dari index SQLite: ID TKU sesuai kemunculan pertama, lalu partner sesuai kemunculan pertama."""
+        self._spill_to_disk(keep_documents=True)
+        keys = self._spill.execute(
+            "SELECT g.id_tku, g.partner_name FROM"
+            " (SELECT id_tku, partner_name, MIN(seq) AS first_seq FROM merge_groups GROUP BY id_tku, partner_name) AS g"
+            " JOIN (SELECT id_tku, MIN(seq) AS first_seq FROM merge_groups GROUP BY id_tku) AS t ON t.id_tku = g.id_tku"
+            " ORDER BY t.first_seq, g.first_seq"
+        )
+        for id_tku, partner_name in keys:
+            yield id_tku, partner_name, self._spilled_records(id_tku, partner_name)
+
+    def close(self):
+        """Tutup semua dokumen yang tersisa dan hapus index sementara."""
+        for partners in self._groups.values():
+            for records in partners.values():
+                for document, _ in records:
+                    document.close()
+        self._groups.clear()
+        for document in self._kept_documents.values():
+            document.close()
+        self._kept_documents.clear()
+        self._records_in_memory = 0
+        self.cached_bytes = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if self._spill_path:
+            try:
+                os.remove(self._spill_path)
+            except OSError:
+                pass
+            self._spill_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
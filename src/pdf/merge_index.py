@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import pdfplumber
+from src.pdf.field_extraction import FIELD_SPECS
+
+MERGE_INDEX_FILE = "merged_faktur_index.db"
+
+FAKTUR_NUMBER_SPEC = next(spec for spec in FIELD_SPECS if spec.name == "faktur_number")
+
+
+def read_archive_fakturs(output_path):
+    """Nomor faktur di file gabungan yang belum tercatat di index, dibaca halaman demi halaman.
+
+    Dipakai sekali untuk mengisi index (file dari proses non-append, diubah di luar aplikasi,
+    atau index yang terhapus); cache setiap halaman dilepas agar memori tetap kecil.
+    """
+    fakturs = set()
+    with pdfplumber.open(output_path) as pdf:
+        for page in pdf.pages:
+            faktur_number = FAKTUR_NUMBER_SPEC.search(page.extract_text() or "")
+            if faktur_number:
+                fakturs.add(faktur_number)
+            page.close()
+    return fakturs
+
+
+class MergeIndex:
+    """Index nomor faktur yang sudah ada di setiap file gabungan di folder output (mode append).
+
+    Ukuran dan mtime file gabungan dicatat setiap kali index diperbarui; jika file berubah
+    di luar aplikasi atau dihapus, isi index untuk file tersebut dianggap tidak berlaku.
+    """
+
+    def __init__(self, output_directory, index_file=MERGE_INDEX_FILE):
+        self.output_directory = output_directory
+        self.index_path = os.path.join(output_directory, index_file)
+        self._connection = sqlite3.connect(self.index_path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS merged_files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS merged_fakturs (path TEXT NOT NULL, faktur_number TEXT NOT NULL,"
+            " PRIMARY KEY (path, faktur_number))"
+        )
+        self._connection.commit()
+
+    def _key(self, output_path):
+        # Path relatif agar index tetap berlaku jika folder output dipindahkan
+        return os.path.normcase(os.path.relpath(output_path, self.output_directory))
+
+    def known_fakturs(self, output_path):
+        """Nomor faktur yang sudah ada di file gabungan.
+
+        Return set kosong jika file belum ada, dan None jika file ada tetapi tidak tercatat
+        atau berubah di luar aplikasi (catatan lamanya dihapus); isi file tersebut tidak
+        diketahui sehingga pemanggil harus membacanya (read_archive_fakturs) atau menulis ulang.
+        """
+        key = self._key(output_path)
+        try:
+            stat_result = os.stat(output_path)
+        except OSError:
+            self._forget(key)
+            return set()
+        row = self._connection.execute("SELECT size, mtime_ns FROM merged_files WHERE path = ?", (key,)).fetchone()
+        if row is None or tuple(row) != (stat_result.st_size, stat_result.st_mtime_ns):
+            self._forget(key)
+            return None
+        rows = self._connection.execute("SELECT faktur_number FROM merged_fakturs WHERE path = ?", (key,))
+        return {faktur_number for (faktur_number,) in rows}
+
+    def record(self, output_path, faktur_numbers, replace=False):
+        """Catat nomor faktur yang baru ditulis ke file gabungan; replace=True jika file dibuat ulang."""
+        key = self._key(output_path)
+        if replace:
+            self._connection.execute("DELETE FROM merged_fakturs WHERE path = ?", (key,))
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO merged_fakturs VALUES (?, ?)",
+            [(key, faktur_number) for faktur_number in faktur_numbers if faktur_number and faktur_number != "NoFaktur"]
+        )
+        stat_result = os.stat(output_path)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO merged_files VALUES (?, ?, ?)",
+            (key, stat_result.st_size, stat_result.st_mtime_ns)
+        )
+        self._connection.commit()
+
+    def _forget(self, key):
+        self._connection.execute("DELETE FROM merged_fakturs WHERE path = ?", (key,))
+        self._connection.execute("DELETE FROM merged_files WHERE path = ?", (key,))
+        self._connection.commit()
+
+    def close(self):
+        try:
+            self._connection.commit()
+            self._connection.close()
+        except sqlite3.Error:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
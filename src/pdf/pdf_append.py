@@ -0,0 +1,165 @@
+import io
+import os
+from pypdf import PdfWriter, PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject, NumberObject
+from src.pdf.pdf_document import PDF_TRAILER_WINDOW, find_startxref
+from src.pdf.pdf_utils import compress_page_content
+from src.utils.utils import log_message, Fore
+
+
+def build_incremental_update(writer, base_reader, base_size, base_startxref, first_new_idnum, base_ends_with_newline=True):
+    """Serialisasi incremental update (halaman baru, node Pages yang diperbarui, tabel xref, trailer).
+
+    writer berisi halaman baru dengan nomor objek mulai dari first_new_idnum (lihat
+    _reserve_object_numbers); objek katalog/Pages/Info milik writer sendiri tidak ditulis.
+    Dari file lama hanya trailer dan node Pages yang dibaca, sehingga memori tidak
+    bergantung pada jumlah halaman file gabungan.
+    Tabel xref klasik dipakai agar hasilnya tetap terbaca oleh pdfminer/pdfplumber
+    (xref stream dari pypdf 5.0 tidak ditutup endobj dan ditolak pdfminer).
+    """
+    output = io.BytesIO()
+    if not base_ends_with_newline:
+        output.write(b"\n")
+
+    base_trailer = base_reader.trailer
+    pages_reference = base_trailer["/Root"].raw_get("/Pages")
+    base_pages = pages_reference.get_object()
+    new_page_references = []
+    for page in writer.pages:
+        page[NameObject("/Parent")] = IndirectObject(pages_reference.idnum, pages_reference.generation, writer)
+        new_page_references.append(page.indirect_reference)
+
+    # {idnum: (offset, generation)}; None untuk entri bebas
+    offsets = {}
+    for index in range(first_new_idnum - 1, len(writer._objects)):
+        obj = writer._objects[index]
+        if obj is None or isinstance(obj, NullObject):
+            continue
+        offsets[index + 1] = (base_size + output.tell(), 0)
+        output.write(f"{index + 1} 0 obj\n".encode())
+        obj.write_to_stream(output)
+        output.write(b"\nendobj\n")
+
+    # Node Pages lama ditulis ulang dengan halaman baru di akhir Kids
+    pages = DictionaryObject({key: value for key, value in base_pages.items()})
+    pages[NameObject("/Kids")] = ArrayObject(list(base_pages["/Kids"]) + new_page_references)
+    pages[NameObject("/Count")] = NumberObject(int(base_pages["/Count"]) + len(new_page_references))
+    offsets[pages_reference.idnum] = (base_size + output.tell(), pages_reference.generation)
+    output.write(f"{pages_reference.idnum} {pages_reference.generation} obj\n".encode())
+    pages.write_to_stream(output)
+    output.write(b"\nendobj\n")
+
+    size = max([int(base_trailer.get("/Size", 0))] + [idnum + 1 for idnum in offsets])
+    # Nomor objek yang tidak ditulis dicatat sebagai entri bebas
+    for idnum in range(int(base_trailer.get("/Size", 0)), size):
+        offsets.setdefault(idnum, None)
+    # Subsection pertama dimulai dari objek 0 (kepala daftar bebas) agar tabel tidak dianggap salah indeks
+    offsets[0] = None
+
+    # Tabel xref: satu subsection per rentang nomor objek yang berurutan
+    xref_offset = base_size + output.tell()
+    output.write(b"xref\n")
+    subsection = []
+    for idnum in sorted(offsets):
+        if subsection and idnum != subsection[-1] + 1:
+            _write_xref_subsection(output, subsection, offsets)
+            subsection = []
+        subsection.append(idnum)
+    if subsection:
+        _write_xref_subsection(output, subsection, offsets)
+
+    output.write(b"trailer\n<<")
+    output.write(f" /Size {size} /Prev {base_startxref} /Root ".encode())
+    base_trailer.raw_get("/Root").write_to_stream(output)
+    for key in ("/Info", "/ID"):
+        if key in base_trailer:
+            output.write(f" {key} ".encode())
+            base_trailer.raw_get(key).write_to_stream(output)
+    output.write(f" >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+    return output.getvalue()
+
+
+def _reserve_object_numbers(writer, first_new_idnum):
+    """Geser nomor objek berikutnya di writer agar tidak bentrok dengan objek file lama."""
+    while len(writer._objects) < first_new_idnum - 1:
+        writer._objects.append(NullObject())
+
+
+def _write_xref_subsection(output, subsection, offsets):
+    output.write(f"{subsection[0]} {len(subsection)}\n".encode())
+    for idnum in subsection:
+        if offsets[idnum] is None:
+            output.write(b"0000000000 65535 f \n")
+        else:
+            offset, generation = offsets[idnum]
+            output.write(f"{offset:010d} {generation:05d} n \n".encode())
+
+
+def append_pdfs(pdf_paths, output_path, log_callback=None, optimize=True):
+    """Menambahkan halaman ke file PDF gabungan yang sudah ada dengan incremental update.
+
+    Isi file lama tidak ditulis ulang maupun dibaca seluruhnya: hanya trailer, tabel xref,
+    dan node Pages yang dibaca (seek), lalu objek baru, tabel xref, dan trailer ditambahkan
+    di akhir file. Elemen pdf_paths boleh berupa path atau PDFDocument.
+    Dengan optimize, content stream halaman baru dikompresi. Deduplikasi objek tidak
+    dilakukan karena akan mengubah objek lama yang sudah ada di file.
+    Return jumlah halaman yang ditambahkan.
+    """
+    output_name = os.path.basename(output_path)
+    pdf_readers = []
+    try:
+        with open(output_path, 'rb') as existing_file:
+            base_size = os.fstat(existing_file.fileno()).st_size
+            existing_file.seek(max(base_size - PDF_TRAILER_WINDOW, 0))
+            tail = existing_file.read()
+            base_startxref = find_startxref(tail)
+            if base_startxref is None:
+                raise ValueError(f"trailer PDF {output_name} tidak ditemukan, tidak bisa menambahkan halaman")
+            existing_file.seek(0)
+            base_reader = PdfReader(existing_file)
+            if base_reader.is_encrypted:
+                raise ValueError(f"{output_name} terenkripsi, tidak bisa menambahkan halaman")
+            writer = PdfWriter()
+            # Objek baru dimulai setelah objek file lama dan setelah objek bawaan writer (katalog, Pages, Info)
+            first_new_idnum = max(int(base_reader.trailer.get("/Size", 0)), len(writer._objects) + 1)
+            _reserve_object_numbers(writer, first_new_idnum)
+
+            added_pages = 0
+            for pdf_path in pdf_paths:
+                try:
+                    reader = pdf_path.get_reader() if hasattr(pdf_path, 'get_reader') else PdfReader(pdf_path)
+                    pdf_readers.append(reader)
+                    for page in reader.pages:
+                        added_page = writer.add_page(page)
+                        if optimize:
+                            compress_page_content(added_page)
+                        added_pages += 1
+                except (FileNotFoundError, PermissionError) as e:
+                    log_message(f"⚠️ File access error {os.path.basename(getattr(pdf_path, 'pdf_path', pdf_path))}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
+                    continue
+                except Exception as e:
+                    log_message(f"⚠️ Unexpected error reading {os.path.basename(getattr(pdf_path, 'pdf_path', pdf_path))}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
+                    continue
+
+            increment = None
+            if added_pages:
+                increment = build_incremental_update(
+                    writer, base_reader, base_size, base_startxref, first_new_idnum, tail.endswith(b"\n")
+                )
+        if increment:
+            with open(output_path, 'ab') as output_file:
+                output_file.write(increment)
+        log_message(f"✅ {added_pages} halaman ditambahkan ke {output_path}", Fore.GREEN, log_callback=log_callback)
+        return added_pages
+
+    except (FileNotFoundError, PermissionError) as e:
+        log_message(f"❌ File access error during append {output_name}: {str(e)}", Fore.RED, log_callback=log_callback)
+        raise
+    except (IOError, OSError) as e:
+        log_message(f"❌ I/O error during append {output_name}: {str(e)}", Fore.RED, log_callback=log_callback)
+        raise
+    except Exception as e:
+        log_message(f"❌ Unexpected error during append {output_name}: {str(e)}", Fore.RED, log_callback=log_callback)
+        raise
+    finally:
+        pdf_readers.clear()
@@ -0,0 +1,190 @@
+import io
+import os
+import re
+import shutil
+import pdfplumber
+from pypdf import PdfReader
+from src.pdf.pdf_utils import count_found_fields, has_required_fields
+from src.pdf.text_backends import resolve_backends
+
+# Hasil pemeriksaan struktur PDF
+STRUCTURE_OK = "ok"
+STRUCTURE_SUSPICIOUS = "suspicious"
+STRUCTURE_INVALID = "invalid"
+
+# Header %PDF- harus ada di awal file, trailer startxref/%%EOF di akhir file
+PDF_HEADER_WINDOW = 1024
+PDF_TRAILER_WINDOW = 2048
+# Byte yang dibaca di offset startxref untuk mengenali tabel xref/objek
+XREF_TARGET_WINDOW = 256
+STARTXREF_PATTERN = re.compile(rb'startxref\s+(\d+)\s+%%EOF')
+XREF_TARGET_PATTERN = re.compile(rb'\s*(?:xref|\d+\s+\d+\s+obj)')
+
+
+def find_startxref(data):
+    """Offset xref dari startxref terakhir di akhir file, atau None jika trailer tidak ditemukan."""
+    trailer_matches = list(STARTXREF_PATTERN.finditer(data[-PDF_TRAILER_WINDOW:]))
+    if not trailer_matches:
+        return None
+    return int(trailer_matches[-1].group(1))
+
+
+def check_pdf_structure(data):
+    """Pemeriksaan struktur ringan tanpa parse dokumen: header, trailer, dan offset xref.
+
+    Return STRUCTURE_OK, STRUCTURE_SUSPICIOUS (perlu parse penuh untuk memastikan),
+    atau STRUCTURE_INVALID (pasti bukan PDF).
+    """
+    if b'%PDF-' not in data[:PDF_HEADER_WINDOW]:
+        return STRUCTURE_INVALID
+    xref_offset = find_startxref(data)
+    if xref_offset is None:
+        return STRUCTURE_SUSPICIOUS
+    # startxref terakhir harus menunjuk ke tabel xref atau xref stream (objek)
+    if xref_offset >= len(data) or not XREF_TARGET_PATTERN.match(data, xref_offset):
+        return STRUCTURE_SUSPICIOUS
+    return STRUCTURE_OK
+
+
+def check_pdf_file_structure(pdf_path):
+    """Sama dengan check_pdf_structure, tetapi langsung dari file tanpa membaca seluruh isinya.
+
+    Hanya header, trailer, dan beberapa byte di offset startxref yang dibaca (lewat seek).
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        size = os.fstat(pdf_file.fileno()).st_size
+        if b'%PDF-' not in pdf_file.read(PDF_HEADER_WINDOW):
+            return STRUCTURE_INVALID
+        pdf_file.seek(max(size - PDF_TRAILER_WINDOW, 0))
+        xref_offset = find_startxref(pdf_file.read(PDF_TRAILER_WINDOW))
+        if xref_offset is None or xref_offset >= size:
+            return STRUCTURE_SUSPICIOUS
+        pdf_file.seek(xref_offset)
+        if not XREF_TARGET_PATTERN.match(pdf_file.read(XREF_TARGET_WINDOW)):
+            return STRUCTURE_SUSPICIOUS
+    return STRUCTURE_OK
+
+
+class PDFDocument:
+    """Sesi dokumen PDF per file: byte file dibaca sekali lalu dipakai bersama
+    untuk validasi, ekstraksi teks, dan penyerahan halaman ke merger/copier."""
+
+    def __init__(self, pdf_path, data=None):
+        self.pdf_path = pdf_path
+        self.filename = os.path.basename(pdf_path)
+        # data: byte file yang sudah dibaca proses lain (mis. dikirim ke worker merge)
+        self._data = data
+        self._plumber = None
+        self._reader = None
+
+    @property
+    def data(self):
+        """Isi file PDF (dibaca dari disk hanya sekali)."""
+        if self._data is None:
+            with open(self.pdf_path, 'rb') as pdf_file:
+                self._data = pdf_file.read()
+        return self._data
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def loaded_size(self):
+        """Ukuran byte yang sedang disimpan di memori (0 jika belum/tidak lagi dibaca)."""
+        return len(self._data) if self._data is not None else 0
+
+    def get_plumber(self):
+        """Objek pdfplumber untuk dokumen ini, dibuat dari byte yang sudah ada di memori."""
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(io.BytesIO(self.data))
+        return self._plumber
+
+    def validate(self, strict=True):
+        """Memvalidasi apakah file PDF dapat dibaca (tidak korup).
+
+        Pemeriksaan struktur ringan dilakukan lebih dulu, dari byte di memori bila sudah dibaca
+        atau langsung dari file tanpa membaca seluruh isinya. Pada mode strict, file yang
+        mencurigakan diperiksa ulang dengan parse penuh pdfplumber.
+        """
+        try:
+            if self._data is not None:
+                structure = check_pdf_structure(self._data)
+            else:
+                structure = check_pdf_file_structure(self.pdf_path)
+        except (IOError, OSError):
+            return False
+        if structure == STRUCTURE_OK:
+            return True
+        if structure == STRUCTURE_INVALID or not strict:
+            return False
+        try:
+            return bool(self.get_plumber().pages)
+        except Exception:
+            # File tidak bisa dibaca atau diparse, anggap tidak valid
+            return False
+
+    def extract_info(self, log_callback=None, first_page_only=True, backends=None):
+        """Mengambil ID TKU, Nama Partner, Nomor Faktur, Tanggal, dan Referensi dari dokumen ini.
+
+        Backend dicoba sesuai urutan; backend berikutnya hanya dipakai jika field wajib
+        belum ditemukan. Jika semua gagal, hasil dengan field terbanyak yang dipakai.
+        """
+        try:
+            info = None
+            for backend in resolve_backends(backends):
+                candidate = backend.extract_info(self, first_page_only)
+                if info is None or count_found_fields(candidate) >= count_found_fields(info):
+                    info = candidate
+                if has_required_fields(candidate):
+                    break
+            return info
+        except (FileNotFoundError, PermissionError) as e:
+            if log_callback:
+                log_callback(f"❌ File access error {self.filename}: {str(e)}")
+            raise
+        except (ImportError, AttributeError) as e:
+            if log_callback:
+                log_callback(f"❌ PDF library error {self.filename}: {str(e)}")
+            raise
+        except Exception as e:
+            if log_callback:
+                log_callback(f"❌ Unexpected error reading {self.filename}: {str(e)}")
+            raise
+
+    def get_reader(self):
+        """PdfReader untuk merger, dibuat dari byte yang sudah ada di memori."""
+        if self._reader is None:
+            self._reader = PdfReader(io.BytesIO(self.data))
+        return self._reader
+
+    def write_to(self, destination_path, exclusive=False):
+        """Menulis isi dokumen ke destination_path dan menyalin metadata file seperti shutil.copy2.
+
+        Dengan exclusive, FileExistsError dilempar jika destination_path sudah ada (tidak ditimpa).
+        """
+        with open(destination_path, 'xb' if exclusive else 'wb') as output_file:
+            output_file.write(self.data)
+        shutil.copystat(self.pdf_path, destination_path)
+
+    def release(self, keep_data=True):
+        """Melepas objek pdfplumber/pypdf; byte file tetap disimpan jika keep_data aktif."""
+        if self._plumber is not None:
+            try:
+                self._plumber.close()
+            except Exception:
+                pass
+            self._plumber = None
+        self._reader = None
+        if not keep_data:
+            self._data = None
+
+    def close(self):
+        self.release(keep_data=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,171 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from src.pdf.pdf_document import PDFDocument
+from src.pdf.extraction_cache import extraction_variant
+from src.utils.utils import log_message, Fore, init_worker_logging, logging_config
+
+# Jumlah maksimal tugas yang menunggu per worker, agar pembatalan tetap cepat
+PENDING_TASKS_PER_WORKER = 4
+
+
+def resolve_worker_count(workers, total_files=None):
+    """Menentukan jumlah worker ekstraksi. 0/None berarti otomatis (jumlah CPU dikurangi satu untuk GUI)."""
+    try:
+        workers = int(workers or 0)
+    except (TypeError, ValueError):
+        workers = 0
+    if workers <= 0:
+        workers = max((os.cpu_count() or 1) - 1, 1)
+    if total_files is not None:
+        workers = min(workers, max(total_files, 1))
+    return workers
+
+
+def extract_document_info(pdf_path, first_page_only=True, backends=None, strict_validation=True):
+    """Validasi dan ekstraksi satu file PDF. Dipanggil di worker process, jadi hanya mengembalikan data yang bisa di-pickle.
+
+    Return: (status, info, error) dengan status "ok", "inaccessible", "invalid", atau "error".
+    """
+    if not os.path.isfile(pdf_path) or not os.access(pdf_path, os.R_OK):
+        return "inaccessible", None, None
+    with PDFDocument(pdf_path) as document:
+        if not document.validate(strict_validation):
+            return "invalid", None, None
+        try:
+            return "ok", document.extract_info(first_page_only=first_page_only, backends=backends), None
+        except Exception as e:
+            return "error", None, e
+
+
+def iter_extracted_info(pdf_paths, first_page_only=True, max_workers=1, cancel_flag=None, log_callback=None, cache=None, backends=None, strict_validation=True, file_stats=None, prefetched=None):
+    """Mengekstrak informasi semua file dan menghasilkan (pdf_path, document, status, info, error) sesuai urutan input.
+
+    Dengan max_workers > 1 ekstraksi dijalankan paralel di process pool. document selalu berupa
+    PDFDocument untuk tahap output; pada mode berurutan byte file sudah ada di memori. Pada mode
+    paralel byte tidak dikirim balik dari worker: document dibaca lagi dari disk saat output
+    ditulis. Mengirim byte lewat pipe berarti pickle dan salinan tambahan untuk setiap file
+    (termasuk file yang akhirnya dilewati) dan menahan semuanya di proses utama, sedangkan
+    membaca ulang file yang baru dibaca umumnya dilayani dari cache OS.
+    Jika cache (ExtractionCache) diberikan, file yang belum berubah tidak diekstrak ulang.
+    file_stats (path -> stat_result, dari InputManifest) dipakai sebagai kunci cache agar file tidak di-stat ulang.
+    prefetched (path -> (status, info, error), hasil preflight) dipakai langsung tanpa ekstraksi;
+    hanya file yang tidak ada di prefetched yang diekstrak.
+    """
+    if prefetched:
+        missing = [pdf_path for pdf_path in pdf_paths if pdf_path not in prefetched]
+        extracted = iter_extracted_info(
+            missing, first_page_only, max_workers, cancel_flag, log_callback, cache, backends, strict_validation, file_stats
+        ) if missing else None
+        yield from _iter_prefetched_info(pdf_paths, prefetched, extracted, cancel_flag)
+        return
+
+    variant = extraction_variant(first_page_only, backends)
+    file_stats = file_stats or {}
+    max_workers = resolve_worker_count(max_workers, len(pdf_paths))
+    if max_workers > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker_logging, initargs=(logging_config(),))
+        except (OSError, ImportError, NotImplementedError) as e:
+            log_message(f"⚠️ Process pool tidak tersedia ({str(e)}), ekstraksi dijalankan berurutan", Fore.YELLOW, log_callback=log_callback)
+            max_workers = 1
+    if max_workers <= 1:
+        yield from _iter_extracted_info_sequential(pdf_paths, first_page_only, cancel_flag, log_callback, cache, variant, backends, strict_validation, file_stats)
+        return
+
+    log_message(f"⚙️ Ekstraksi paralel dengan {max_workers} worker", Fore.CYAN, log_callback=log_callback)
+    pending = deque()
+    remaining_paths = iter(pdf_paths)
+    try:
+        while True:
+            # Isi antrean sampai batas agar worker selalu punya tugas tanpa men-submit semua file sekaligus
+            while len(pending) < max_workers * PENDING_TASKS_PER_WORKER:
+                pdf_path = next(remaining_paths, None)
+                if pdf_path is None:
+                    break
+                cached_info = cache.get(pdf_path, variant, file_stats.get(pdf_path)) if cache else None
+                if cached_info is not None:
+                    pending.append((pdf_path, None, cached_info))
+                else:
+                    pending.append((pdf_path, executor.submit(extract_document_info, pdf_path, first_page_only, backends, strict_validation), None))
+            if not pending:
+                break
+
+            # Tunggu hasil paling depan agar urutan output tetap deterministik
+            pdf_path, future, cached_info = pending.popleft()
+            if future is None:
+                yield pdf_path, PDFDocument(pdf_path), "ok", cached_info, None
+                continue
+            while not wait([future], timeout=0.1).done:
+                if cancel_flag and cancel_flag.is_set():
+                    future.cancel()
+                    return
+            try:
+                status, info, error = future.result()
+            except Exception as e:
+                status, info, error = "error", None, e
+            if status == "error" and log_callback:
+                log_callback(f"❌ Unexpected error reading {os.path.basename(pdf_path)}: {str(error)}")
+            if status == "ok" and cache:
+                cache.put(pdf_path, variant, info, file_stats.get(pdf_path))
+
+            yield pdf_path, PDFDocument(pdf_path), status, info, error
+
+            if cancel_flag and cancel_flag.is_set():
+                return
+    finally:
+        # Tugas yang belum berjalan dibatalkan; worker ditunggu berhenti (paling lama satu file per worker)
+        # agar tidak ada proses yatim yang masih membaca file setelah proses dibatalkan
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _iter_extracted_info_sequential(pdf_paths, first_page_only, cancel_flag, log_callback, cache, variant, backends, strict_validation, file_stats):
+    """Ekstraksi berurutan di thread saat ini; sesi dokumen dipakai ulang untuk tahap output."""
+    for pdf_path in pdf_paths:
+        if cancel_flag and cancel_flag.is_set():
+            return
+        cached_info = cache.get(pdf_path, variant, file_stats.get(pdf_path)) if cache else None
+        if cached_info is not None:
+            yield pdf_path, PDFDocument(pdf_path), "ok", cached_info, None
+            continue
+        if not os.path.isfile(pdf_path) or not os.access(pdf_path, os.R_OK):
+            yield pdf_path, PDFDocument(pdf_path), "inaccessible", None, None
+            continue
+
+        document = PDFDocument(pdf_path)
+        if not document.validate(strict_validation):
+            document.close()
+            yield pdf_path, document, "invalid", None, None
+            continue
+        try:
+            info = document.extract_info(log_callback, first_page_only, backends)
+        except Exception as e:
+            document.close()
+            yield pdf_path, document, "error", None, e
+            continue
+
+        if cache:
+            cache.put(pdf_path, variant, info, file_stats.get(pdf_path))
+        # Model halaman pdfplumber tidak dibutuhkan lagi; byte file tetap disimpan untuk output
+        document.release()
+        yield pdf_path, document, "ok", info, None
+
+
+def _iter_prefetched_info(pdf_paths, prefetched, extracted, cancel_flag):
+    """Gabungkan hasil preflight dengan hasil ekstraksi file yang belum diperiksa, sesuai urutan input."""
+    try:
+        for pdf_path in pdf_paths:
+            if cancel_flag and cancel_flag.is_set():
+                return
+            result = prefetched.get(pdf_path)
+            if result is None:
+                item = next(extracted, None)
+                if item is None:
+                    return
+                yield item
+                continue
+            status, info, error = result
+            yield pdf_path, PDFDocument(pdf_path), status, info, error
+    finally:
+        if extracted is not None:
+            extracted.close()
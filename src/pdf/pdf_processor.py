@@ -1,29 +1,45 @@
 import os
 import shutil
 from src.utils.utils import log_message, Fore
-from src.pdf.pdf_utils import validate_pdf, extract_info_from_pdf, merge_pdfs
+from src.pdf.group_merger import iter_merged_groups, MergeJob
+from src.pdf.merge_index import MergeIndex, MERGE_INDEX_FILE, read_archive_fakturs
+from src.pdf.pdf_document import PDFDocument
+from src.pdf.processing_plan import (
+    ProcessingPlan, PlanEntry, MODE_MERGE, ACTION_MERGE, ACTION_SKIP, REASON_NAME_NOT_FOUND, REASON_KNOWN_FAKTUR, SKIP_REASONS,
+    plan_output_folder
+)
+from src.pdf.pdf_extractor import iter_extracted_info
+from src.pdf.extraction_cache import open_extraction_cache
+from src.pdf.field_extraction import FieldStats
+from src.utils.input_manifest import InputManifest
+from src.utils.run_config import RunConfig
+from src.pdf.merge_groups import MergeGroupIndex, DEFAULT_MERGE_MEMORY_BUDGET_MB
+from src.pdf.pdf_utils import assign_volumes, volume_path
 
 
-def process_pdfs(input_directory, output_directory=None, progress_callback=None, log_callback=None, settings=None, cancel_flag=None):
-    """Memproses file PDF dengan mode Rename dan Merge."""
+def process_pdfs(input_directory, output_directory=None, progress_callback=None, log_callback=None, settings=None, cancel_flag=None, manifest=None, prefetched=None):
+    """Memproses file PDF dengan mode Rename dan Merge.
+
+    manifest (InputManifest) adalah hasil scan folder input yang dibuat sekali per proses;
+    jika tidak diberikan, folder di-scan di sini. settings adalah RunConfig yang dibekukan saat
+    proses dimulai; dict settings GUI dibekukan di sini. prefetched (path -> (status, info, error))
+    adalah hasil ekstraksi preflight; file yang ada di dalamnya tidak diekstrak ulang.
+    """
+    settings = RunConfig.from_settings(settings)
     if output_directory is None or output_directory.strip() == "":
         output_directory = os.path.join(input_directory, "ProcessedPDFs")  # Kembali ke ProcessedPDFs
     os.makedirs(output_directory, exist_ok=True)
 
     # Tahap 1: Perhitungan file PDF dengan memory management
-    try:
-        pdf_files = [f for f in os.listdir(input_directory) if f.lower().endswith('.pdf')]
-    except (PermissionError, FileNotFoundError) as e:
-        log_message(f"❌ Error accessing input directory: {str(e)}", Fore.RED, log_callback=log_callback)
-        return {"processed": 0, "renamed": 0, "merged": 0, "errors": 1}
+    if manifest is None:
+        try:
+            manifest = InputManifest.scan(input_directory)
+        except (PermissionError, FileNotFoundError) as e:
+            log_message(f"❌ Error accessing input directory: {str(e)}", Fore.RED, log_callback=log_callback)
+            return {"processed": 0, "renamed": 0, "merged": 0, "errors": 1}
     
-    total_files = len(pdf_files)
+    total_files = len(manifest)
     log_message(f"Total file ditemukan: {total_files}", Fore.CYAN, log_callback=log_callback)
-    
-    # Memory management: Process in batches if too many files
-    max_batch_size = 50  # Process max 50 files at once
-    if total_files > max_batch_size:
-        log_message(f"⚠️ Memproses {total_files} file dalam batch ({max_batch_size} file per batch)", Fore.YELLOW, log_callback=log_callback)
 
     # Inisialisasi variabel statistik
     processed_files = 0
@@ -34,56 +50,68 @@ def process_pdfs(input_directory, output_directory=None, progress_callback=None,
     # Ambil urutan komponen dari pengaturan
     component_order = settings.get("component_order", None)
 
-    # Process files in batches to manage memory
-    files_by_idtku = {}
-    batch_count = 0
+    # Ekstraksi berjalan paralel bila extraction_workers > 1; hasil tetap diproses sesuai urutan file
+
+    # Byte dokumen disimpan sampai tahap merge agar file tidak dibaca ulang selama masih di bawah
+    # anggaran memori; jika record terlalu banyak, index grup dipindahkan ke disk
+    memory_budget_mb = settings.get("merge_memory_budget_mb", DEFAULT_MERGE_MEMORY_BUDGET_MB)
+    groups = MergeGroupIndex(memory_budget_mb * 1024 * 1024)
     
-    for i in range(0, total_files, max_batch_size):
-        batch_files = pdf_files[i:i + max_batch_size]
-        batch_count += 1
-        
-        if total_files > max_batch_size:
-            log_message(f"📦 Memproses batch {batch_count}: {len(batch_files)} file", Fore.CYAN, log_callback=log_callback)
-        
-        for filename in batch_files:
+    pdf_paths = manifest.pdf_paths
+    cache = open_extraction_cache(settings, log_callback)
+    field_stats = FieldStats()
+    extracted = iter_extracted_info(
+        pdf_paths, settings.get("first_page_only", True), settings.get("extraction_workers", 0),
+        cancel_flag, log_callback, cache, settings.get("extraction_backends", None),
+        settings.get("strict_validation", True), manifest.stats_by_path, prefetched
+    )
+
+    try:
+        for pdf_path, document, status, info, error in extracted:
+            filename = os.path.basename(pdf_path)
+
             # Check for cancellation
             if cancel_flag and cancel_flag.is_set():
+                document.close()
+                groups.close()
                 log_message("🛑 Proses dibatalkan oleh user", Fore.YELLOW, log_callback=log_callback)
                 return processed_files, renamed_files, merged_files, error_files
-                
-            pdf_path = os.path.join(input_directory, filename)
-            
+
             # Check file accessibility
-            if not os.path.isfile(pdf_path) or not os.access(pdf_path, os.R_OK):
+            if status == "inaccessible":
                 error_files += 1
                 renamed_files += 1
                 log_message(f"⚠️ File {filename} tidak dapat diakses, dilewati.", Fore.YELLOW, log_callback=log_callback)
                 continue
-                
-            if not validate_pdf(pdf_path):
+
+            if status == "invalid":
                 error_files += 1
                 renamed_files += 1
                 log_message(f"⚠️ File {filename} korup atau tidak valid, dilewati.", Fore.YELLOW, log_callback=log_callback)
                 continue
 
             try:
-                id_tku_seller, partner_name, faktur_number, date, reference = extract_info_from_pdf(pdf_path, log_callback)
+                if status == "error":
+                    raise error
+                id_tku_seller, partner_name, faktur_number, date, reference = info
+                field_stats.record(info)
 
                 if partner_name == "Nama tidak ditemukan":
+                    document.close()
                     log_message(f"⚠️ Nama tidak ditemukan di {filename}, dilewati.", Fore.YELLOW, log_callback=log_callback)
                     renamed_files += 1
                     continue
 
-                if id_tku_seller not in files_by_idtku:
-                    files_by_idtku[id_tku_seller] = []
-                files_by_idtku[id_tku_seller].append((pdf_path, partner_name, faktur_number, date, reference))
-                
+                groups.add(id_tku_seller, partner_name, document, faktur_number)
+
             except MemoryError:
+                document.close()
                 log_message(f"⚠️ Memory error processing {filename}, skipping...", Fore.YELLOW, log_callback=log_callback)
                 error_files += 1
                 renamed_files += 1
                 continue
             except Exception as e:
+                document.close()
                 error_files += 1
                 renamed_files += 1
                 log_message(f"❌ Error membaca {filename}: {str(e)}", Fore.RED, log_callback=log_callback)
@@ -91,59 +119,287 @@ def process_pdfs(input_directory, output_directory=None, progress_callback=None,
             processed_files += 1
             if progress_callback:
                 progress_callback("reading", processed_files, total_files, 0, 0)
+    finally:
+        # Generator ekstraksi ditutup juga saat dibatalkan, agar worker pool dihentikan
+        extracted.close()
+        if cache:
+            cache.close()
+
+    if field_stats.total:
+        log_message(f"🔎 Field ditemukan: {field_stats.summary()}", Fore.CYAN, log_callback=log_callback)
+
+    if groups.is_spilled:
+        log_message(f"💾 Index grup dipindahkan ke disk ({groups.total_records} file) untuk menghemat memori", Fore.CYAN, log_callback=log_callback)
 
     # Hitung total file yang akan digabungkan
-    total_to_merge = sum(len(files) for id_tku, files in files_by_idtku.items())
-    total_to_finalize = total_to_merge  # Jumlah file yang akan difinalisasi sama dengan yang digabungkan
-    processed_files_for_merging = 0
-    processed_files_for_finalizing = 0
+    total_to_merge = groups.total_records
 
-    # Tahap 2: Pemrosesan (merging)
-    processed_files = 0
-    total_to_process = len(files_by_idtku)
-    for id_tku_seller, files in files_by_idtku.items():
-        # Check for cancellation
-        if cancel_flag and cancel_flag.is_set():
-            log_message("🛑 Proses dibatalkan oleh user", Fore.YELLOW, log_callback=log_callback)
-            break
-        # Buat folder berdasarkan ID TKU dengan race condition protection
-        idtku_folder = os.path.join(output_directory, id_tku_seller)
+    # Tahap 2: Pemrosesan (merging); grup partner di-merge paralel bila merge_workers > 1,
+    # hasil tetap dilaporkan sesuai urutan grup dan memori grup dilepas setelah selesai
+    # Mode append: halaman baru ditambahkan ke file gabungan yang sudah ada, faktur yang sudah ada dilewati
+    merge_index = MergeIndex(output_directory) if settings.get("merge_append", False) else None
+    try:
+        jobs = _iter_merge_jobs(groups, output_directory, log_callback, merge_index)
+        merged, failed = _run_merge_stage(
+            jobs, groups.group_count, total_files, total_to_merge, progress_callback, log_callback, settings, cancel_flag, merge_index
+        )
+    finally:
+        groups.close()
+    merged_files += merged
+    error_files += failed
+
+    # Tahap 3: Finalisasi
+    return _finalize_and_report(
+        total_files, renamed_files, merged_files, error_files, total_to_merge, progress_callback, log_callback, cancel_flag
+    )
+
+
+def plan_pdfs(input_directory, output_directory=None, progress_callback=None, log_callback=None, settings=None, cancel_flag=None, manifest=None, prefetched=None):
+    """Mode rencana untuk Rename dan Merge: ekstraksi dan pengelompokan tanpa menulis file output.
+
+    Return ProcessingPlan berisi file gabungan tujuan setiap file, urutan merge di dalam grup,
+    file gabungan yang sudah ada (collision), dan file yang dilewati. Rencana dijalankan dengan
+    execute_plan tanpa membaca ulang isi PDF.
+
+    Dengan merge_max_pages/merge_max_mb (bukan mode append), destination adalah file volume
+    "(part N)" tempat file tersebut akan ditulis. Folder "{ID TKU}_alt" dipakai jika nama folder
+    ID TKU sudah dipakai oleh file, sama seperti saat merge dijalankan.
+    """
+    settings = RunConfig.from_settings(settings)
+    if output_directory is None or output_directory.strip() == "":
+        output_directory = os.path.join(input_directory, "ProcessedPDFs")
+    if manifest is None:
+        manifest = InputManifest.scan(input_directory)
+    total_files = len(manifest)
+    log_message(f"Total file ditemukan: {total_files}", Fore.CYAN, log_callback=log_callback)
+
+    plan = ProcessingPlan(MODE_MERGE, input_directory, output_directory)
+    file_stats = manifest.stats_by_path
+    merge_append = settings.get("merge_append", False)
+    # Batas volume tidak dipakai pada mode append (lihat _run_merge_stage)
+    max_pages = 0 if merge_append else settings.get("merge_max_pages", 0)
+    max_bytes = 0 if merge_append else settings.get("merge_max_mb", 0) * 1024 * 1024
+    # {(id_tku, partner_name): [(pdf_path, nomor faktur, stat, jumlah halaman), ...]}; dict menjaga urutan grup
+    groups = {}
+    skipped_entries = []
+    cache = open_extraction_cache(settings, log_callback)
+    extracted = iter_extracted_info(
+        manifest.pdf_paths, settings.get("first_page_only", True), settings.get("extraction_workers", 0),
+        cancel_flag, log_callback, cache, settings.get("extraction_backends", None),
+        settings.get("strict_validation", True), file_stats, prefetched
+    )
+    try:
+        for index, (pdf_path, document, status, info, error) in enumerate(extracted, start=1):
+            # Jumlah halaman hanya dibutuhkan untuk membagi volume berdasarkan halaman
+            page_count = _page_count(document) if max_pages and status == "ok" else 0
+            document.close()
+            if cancel_flag and cancel_flag.is_set():
+                log_message("🛑 Proses dibatalkan oleh user", Fore.YELLOW, log_callback=log_callback)
+                break
+            filename = os.path.basename(pdf_path)
+            stat_result = file_stats.get(pdf_path)
+            file_stat = {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns} if stat_result else {}
+
+            if status == "ok" and info[1] == "Nama tidak ditemukan":
+                log_message(f"⚠️ Nama tidak ditemukan di {filename}, dilewati.", Fore.YELLOW, log_callback=log_callback)
+                skipped_entries.append(PlanEntry(ACTION_SKIP, pdf_path, id_tku=info[0], reason=REASON_NAME_NOT_FOUND, **file_stat))
+            elif status == "ok":
+                id_tku_seller, partner_name, faktur_number, date, reference = info
+                groups.setdefault((id_tku_seller, partner_name), []).append((pdf_path, faktur_number, file_stat, page_count))
+            else:
+                if status == "error":
+                    reason = str(error)
+                    log_message(f"❌ Error membaca {filename}: {reason}", Fore.RED, log_callback=log_callback)
+                else:
+                    reason = SKIP_REASONS.get(status, status)
+                    log_message(f"⚠️ File {filename} {reason}, dilewati.", Fore.YELLOW, log_callback=log_callback)
+                skipped_entries.append(PlanEntry(ACTION_SKIP, pdf_path, status=status, reason=reason, **file_stat))
+
+            if progress_callback:
+                progress_callback("reading", index, total_files, 0, 0)
+    finally:
+        extracted.close()
+        if cache:
+            cache.close()
+
+    # Index append hanya dibaca jika sudah ada; mode rencana tidak membuat file di folder output
+    merge_index = None
+    if merge_append and os.path.exists(os.path.join(output_directory, MERGE_INDEX_FILE)):
+        merge_index = MergeIndex(output_directory)
+    seen_outputs = set()
+    try:
+        for (id_tku_seller, partner_name), records in groups.items():
+            output_path = os.path.join(plan_output_folder(output_directory, id_tku_seller), f"{partner_name}.pdf")
+            known_fakturs, append = _plan_known_fakturs(output_path, merge_append, merge_index)
+            volumes = assign_volumes(
+                [(page_count, file_stat.get("size", 0)) for _, faktur_number, file_stat, page_count in records if faktur_number not in known_fakturs],
+                max_pages, max_bytes
+            )
+            split = bool(volumes) and volumes[-1] > 1
+            destinations = [volume_path(output_path, volume) if split else output_path for volume in volumes]
+            # Dua partner dengan nama yang sama di filesystem tidak peka huruf besar/kecil juga bentrok
+            group_outputs = {os.path.normcase(destination) for destination in destinations}
+            duplicates = group_outputs & seen_outputs
+            seen_outputs |= group_outputs
+            existing = {destination for destination in set(destinations) if os.path.exists(destination)}
+            remaining_destinations = iter(destinations)
+            merge_order = 0
+            for pdf_path, faktur_number, file_stat, _ in records:
+                if faktur_number in known_fakturs:
+                    plan.add(PlanEntry(
+                        ACTION_SKIP, pdf_path, output_path, id_tku_seller, partner_name, 0, faktur_number,
+                        reason=REASON_KNOWN_FAKTUR, **file_stat
+                    ))
+                    continue
+                destination = next(remaining_destinations)
+                exists = destination in existing
+                collision = exists or os.path.normcase(destination) in duplicates
+                reason = ("ditambahkan ke file gabungan yang sudah ada" if append else "menimpa file yang sudah ada") if exists else ""
+                merge_order += 1
+                plan.add(PlanEntry(
+                    ACTION_MERGE, pdf_path, destination, id_tku_seller, partner_name, merge_order, faktur_number,
+                    collision, reason=reason, **file_stat
+                ))
+    finally:
+        if merge_index:
+            merge_index.close()
+
+    for entry in skipped_entries:
+        plan.add(entry)
+    plan.log_summary(log_callback)
+    return plan
+
+
+def _plan_known_fakturs(output_path, merge_append, merge_index=None):
+    """(nomor faktur yang sudah ada, append) untuk rencana, sama dengan _build_merge_job tetapi tanpa menulis index."""
+    if not merge_append or not os.path.exists(output_path):
+        return set(), False
+    known_fakturs = merge_index.known_fakturs(output_path) if merge_index else None
+    if known_fakturs is None:
         try:
-            os.makedirs(idtku_folder, exist_ok=True)
-        except (OSError, FileExistsError) as e:
-            # Handle race condition where folder is created by another process
-            if not os.path.isdir(idtku_folder):
-                log_message(f"⚠️ Error creating folder {idtku_folder}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
-                # Try alternative path
-                idtku_folder = os.path.join(output_directory, f"{id_tku_seller}_alt")
-                os.makedirs(idtku_folder, exist_ok=True)
+            known_fakturs = read_archive_fakturs(output_path)
+        except Exception:
+            # File yang tidak bisa dibaca ditulis ulang saat rencana dijalankan
+            return set(), False
+    return known_fakturs, True
+
+
+def _page_count(document):
+    """Jumlah halaman dokumen; 0 jika tidak bisa dibaca (sama seperti merge_pdfs_in_volumes)."""
+    try:
+        return len(document.get_reader().pages)
+    except Exception:
+        return 0
+
+
+def execute_plan(plan, progress_callback=None, log_callback=None, settings=None, cancel_flag=None):
+    """Jalankan ProcessingPlan mode Rename dan Merge tanpa membaca ulang isi PDF untuk ekstraksi.
+
+    File dikelompokkan per destination sesuai merge_order. File sumber yang hilang atau berubah
+    sejak rencana dibuat dilewati sebagai error. Return sama dengan process_pdfs.
+    """
+    settings = RunConfig.from_settings(settings)
+    total_files = len(plan.entries)
+    log_message(f"🗒️ Menjalankan rencana: {total_files} file", Fore.CYAN, log_callback=log_callback)
+
+    error_files = 0
+    renamed_files = 0
+    # {destination: [PlanEntry, ...]}; urutan grup mengikuti kemunculan pertama di rencana
+    groups = {}
+    for entry in plan.entries:
+        if entry.action != ACTION_MERGE:
+            # Faktur yang sudah ada di file gabungan dicek ulang oleh merge index saat merge
+            if entry.reason != REASON_KNOWN_FAKTUR:
+                renamed_files += 1
+                error_files += entry.status != "ok"
+            continue
+        if entry.source_changed():
+            log_message(f"⚠️ File {os.path.basename(entry.source)} hilang atau berubah sejak rencana dibuat, dilewati.", Fore.YELLOW, log_callback=log_callback)
+            error_files += 1
+            renamed_files += 1
+            continue
+        groups.setdefault(entry.destination, []).append(entry)
+    total_to_merge = sum(len(entries) for entries in groups.values())
+
+    merge_index = None
+    if groups and settings.get("merge_append", False):
+        # Rencana CSV tidak menyimpan folder output; destination selalu {output}/{ID TKU}/{partner}.pdf
+        output_directory = plan.output_directory or os.path.dirname(os.path.dirname(next(iter(groups))))
+        merge_index = MergeIndex(output_directory)
+    jobs = _iter_plan_merge_jobs(groups, log_callback, merge_index)
+    merged_files, failed = _run_merge_stage(
+        jobs, len(groups), total_files, total_to_merge, progress_callback, log_callback, settings, cancel_flag, merge_index
+    )
+    error_files += failed
+
+    return _finalize_and_report(
+        total_files, renamed_files, merged_files, error_files, total_to_merge, progress_callback, log_callback, cancel_flag
+    )
+
 
-        # Kelompokkan file berdasarkan Nama Partner
-        files_by_partner = {}
-        for pdf_path, partner_name, faktur_number, date, reference in files:
-            if partner_name not in files_by_partner:
-                files_by_partner[partner_name] = []
-            files_by_partner[partner_name].append((pdf_path, partner_name, faktur_number, date, reference))
-
-        # Proses setiap file secara individual
-        for partner_name, partner_files in files_by_partner.items():
-            for file in partner_files:
-                pdf_path, _, _, _, _ = file
+def _iter_plan_merge_jobs(groups, log_callback=None, merge_index=None):
+    """MergeJob per destination dari rencana; folder tujuan dibuat saat grupnya diproses."""
+    for output_path, entries in groups.items():
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        except OSError as e:
+            log_message(f"⚠️ Error creating folder {os.path.dirname(output_path)}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
+        entries = sorted(entries, key=lambda entry: entry.merge_order)
+        yield _build_merge_job(output_path, [(PDFDocument(entry.source), entry.faktur_number) for entry in entries], merge_index, log_callback)
+
+
+def _run_merge_stage(jobs, group_count, total_files, total_to_merge, progress_callback=None, log_callback=None, settings=None, cancel_flag=None, merge_index=None):
+    """Merge semua MergeJob dan laporkan progress per file. merge_index ditutup setelah selesai.
+
+    Return: (merged_files, error_files) untuk tahap ini.
+    """
+    merged_files = 0
+    error_files = 0
+    skipped_files = 0
+    processed_files_for_merging = 0
+    merge_options = {
+        "optimize": settings.get("merge_optimize", True),
+        "max_pages": settings.get("merge_max_pages", 0),
+        "max_bytes": settings.get("merge_max_mb", 0) * 1024 * 1024,
+    }
+    if merge_index and (merge_options["max_pages"] or merge_options["max_bytes"]):
+        # File gabungan di mode append selalu satu file per partner
+        log_message("ℹ️ Batas halaman/ukuran per volume tidak dipakai pada mode append", Fore.CYAN, log_callback=log_callback)
+        merge_options["max_pages"] = merge_options["max_bytes"] = 0
+    merged = iter_merged_groups(
+        jobs, settings.get("merge_workers", 0), cancel_flag, log_callback, group_count, merge_options
+    )
+    try:
+        for job, error in merged:
+            for i in range(len(job.documents) + job.skipped):
                 processed_files_for_merging += 1
                 if progress_callback:
-                    progress_callback("processing", processed_files_for_merging, total_files, total_to_merge, total_to_finalize)
-
-            # Buat nama file output (hanya menggunakan Nama Partner)
-            output_filename = f"{partner_name}.pdf"
-            output_path = os.path.join(idtku_folder, output_filename)
+                    progress_callback("processing", processed_files_for_merging, total_files, total_to_merge, total_to_merge)
+            skipped_files += job.skipped
 
-            # Merge file PDF
-            merged_files += len(partner_files)  # Hitung jumlah file individual yang digabungkan
-            merge_pdfs([file[0] for file in partner_files], output_path, log_callback)
+            if error is not None:
+                # Kegagalan satu grup tidak menghentikan grup lainnya
+                error_files += len(job.documents)
+                log_message(f"❌ Gagal menggabungkan {os.path.basename(job.output_path)}: {str(error)}", Fore.RED, log_callback=log_callback)
+                continue
+            merged_files += len(job.documents)  # Hitung jumlah file individual yang digabungkan
+            if merge_index and job.documents:
+                merge_index.record(job.output_path, job.faktur_numbers, replace=not job.append)
+    finally:
+        merged.close()
+        if merge_index:
+            merge_index.close()
+    if skipped_files:
+        log_message(f"⏭️ {skipped_files} file dilewati karena nomor fakturnya sudah ada di file gabungan", Fore.CYAN, log_callback=log_callback)
+    if cancel_flag and cancel_flag.is_set():
+        log_message("🛑 Proses dibatalkan oleh user", Fore.YELLOW, log_callback=log_callback)
+    return merged_files, error_files
 
-        processed_files += 1
 
-    # Tahap 3: Finalisasi
+def _finalize_and_report(total_files, renamed_files, merged_files, error_files, total_to_merge, progress_callback=None, log_callback=None, cancel_flag=None):
+    """Tahap finalisasi dan log hasil akhir. Return: (total, renamed, merged, errors)."""
+    total_to_finalize = total_to_merge  # Jumlah file yang akan difinalisasi sama dengan yang digabungkan
+    processed_files_for_finalizing = 0
     if progress_callback:
         progress_callback("finalizing", 0, total_files, total_to_merge, total_to_finalize)
 
@@ -169,4 +425,71 @@ def process_pdfs(input_directory, output_directory=None, progress_callback=None,
     log_message(f"❌ Total error           : {error_files}\n", Fore.RED, log_callback=log_callback)
     log_message("✨ Selesai", Fore.GREEN, log_callback=log_callback)
 
-    return total_files, renamed_files, merged_files, error_files
\ No newline at end of file
+    return total_files, renamed_files, merged_files, error_files
+
+
+def _iter_merge_jobs(groups, output_directory, log_callback=None, merge_index=None):
+    """Menghasilkan MergeJob per grup partner dan membuat folder ID TKU bila perlu.
+
+    Dengan merge_index (mode append), file yang nomor fakturnya sudah tercatat di file
+    gabungan tidak dimasukkan ke job.
+    """
+    current_id_tku = None
+    idtku_folder = None
+    for id_tku_seller, partner_name, records in groups.iter_groups():
+        if id_tku_seller != current_id_tku:
+            current_id_tku = id_tku_seller
+            # Buat folder berdasarkan ID TKU dengan race condition protection
+            idtku_folder = os.path.join(output_directory, id_tku_seller)
+            try:
+                os.makedirs(idtku_folder, exist_ok=True)
+            except (OSError, FileExistsError) as e:
+                # Handle race condition where folder is created by another process
+                if not os.path.isdir(idtku_folder):
+                    log_message(f"⚠️ Error creating folder {idtku_folder}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
+                    # Try alternative path
+                    idtku_folder = os.path.join(output_directory, f"{id_tku_seller}_alt")
+                    os.makedirs(idtku_folder, exist_ok=True)
+
+        # Buat nama file output (hanya menggunakan Nama Partner)
+        output_filename = f"{partner_name}.pdf"
+        output_path = os.path.join(idtku_folder, output_filename)
+        yield _build_merge_job(output_path, records, merge_index, log_callback)
+
+
+def _build_merge_job(output_path, records, merge_index=None, log_callback=None):
+    """MergeJob untuk satu file gabungan dari records [(PDFDocument, nomor faktur), ...].
+
+    Dengan merge_index (mode append), file yang nomor fakturnya sudah tercatat dilewati.
+    File gabungan yang ada tetapi belum tercatat di index dibaca dulu untuk mengisi index;
+    jika tidak bisa dibaca, file ditulis ulang (bukan ditambah) agar tidak ada halaman ganda.
+    """
+    if merge_index is None:
+        return MergeJob(output_path, [document for document, _ in records])
+
+    known_fakturs = merge_index.known_fakturs(output_path)
+    append = os.path.exists(output_path)
+    if known_fakturs is None:
+        known_fakturs, append = _seed_merge_index(output_path, merge_index, log_callback)
+    documents = []
+    faktur_numbers = []
+    for document, faktur_number in records:
+        if faktur_number in known_fakturs:
+            document.close()
+            continue
+        documents.append(document)
+        faktur_numbers.append(faktur_number)
+    return MergeJob(output_path, documents, faktur_numbers, append, len(records) - len(documents))
+
+
+def _seed_merge_index(output_path, merge_index, log_callback=None):
+    """Isi index dari file gabungan yang belum tercatat. Return (nomor faktur, append)."""
+    output_name = os.path.basename(output_path)
+    try:
+        fakturs = read_archive_fakturs(output_path)
+    except Exception as e:
+        log_message(f"⚠️ {output_name} tidak tercatat di index dan tidak bisa dibaca ({str(e)}), file gabungan ditulis ulang", Fore.YELLOW, log_callback=log_callback)
+        return set(), False
+    merge_index.record(output_path, fakturs, replace=True)
+    log_message(f"ℹ️ {output_name} belum tercatat di index, {len(fakturs)} nomor faktur dibaca dari file gabungan", Fore.CYAN, log_callback=log_callback)
+    return fakturs, True
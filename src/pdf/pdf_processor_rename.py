@@ -1,16 +1,39 @@
 import os
 from src.utils.utils import log_message, Fore
-from src.pdf.pdf_utils import validate_pdf, extract_info_from_pdf, generate_filename, copy_file_with_unique_name
+from src.pdf.pdf_utils import copy_file_with_unique_name
+from src.pdf.filename_template import FilenameTemplate
+from src.pdf.pdf_extractor import iter_extracted_info
+from src.pdf.extraction_cache import open_extraction_cache
+from src.pdf.field_extraction import FieldStats
+from src.utils.input_manifest import InputManifest
+from src.utils.run_config import RunConfig
+from src.utils.name_reservations import NameReservations
+from src.pdf.processing_plan import (
+    ProcessingPlan, PlanEntry, MODE_RENAME, ACTION_RENAME, ACTION_SKIP, REASON_NAME_NOT_FOUND, SKIP_REASONS,
+    plan_output_folder
+)
 
-def process_pdfs(input_directory, output_directory=None, progress_callback=None, log_callback=None, settings=None, cancel_flag=None):
-    """Memproses file PDF dengan mode Rename Saja."""
+def process_pdfs(input_directory, output_directory=None, progress_callback=None, log_callback=None, settings=None, cancel_flag=None, manifest=None, filename_template=None, prefetched=None):
+    """Memproses file PDF dengan mode Rename Saja.
+
+    manifest (InputManifest) adalah hasil scan folder input yang dibuat sekali per proses;
+    jika tidak diberikan, folder di-scan di sini. settings adalah RunConfig yang dibekukan saat
+    proses dimulai; dict settings GUI dibekukan di sini. filename_template (FilenameTemplate)
+    dikompilasi sekali per proses dan dipakai bersama dengan preflight; jika None dikompilasi di sini.
+    prefetched (path -> (status, info, error)) adalah hasil ekstraksi preflight; file yang ada di
+    dalamnya tidak diekstrak ulang.
+    """
+    settings = RunConfig.from_settings(settings)
+    if filename_template is None:
+        filename_template = FilenameTemplate.from_config(settings)
     if output_directory is None or output_directory.strip() == "":
         output_directory = os.path.join(input_directory, "ProcessedPDFs")
     os.makedirs(output_directory, exist_ok=True)
 
     # Tahap 1: Perhitungan file PDF
-    pdf_files = [f for f in os.listdir(input_directory) if f.endswith('.pdf')]
-    total_files = len(pdf_files)
+    if manifest is None:
+        manifest = InputManifest.scan(input_directory)
+    total_files = len(manifest)
     log_message(f"Total file ditemukan: {total_files}", Fore.CYAN, log_callback=log_callback)
 
     # Inisialisasi variabel statistik
@@ -19,26 +42,40 @@ def process_pdfs(input_directory, output_directory=None, progress_callback=None,
     renamed_files = 0
     merged_files = 0
 
-    # Ambil urutan komponen dan opsi pemisah dari pengaturan
-    component_order = settings.get("component_order", None)
-    separator = settings.get("separator", "-")
-    slash_replacement = settings.get("slash_replacement", "_")
+    # Cara file output ditulis: copy, move, hardlink, atau reflink
+    output_strategy = settings.get("output_strategy", "copy")
+
+    # Ekstraksi berjalan paralel bila extraction_workers > 1; hasil tetap diproses sesuai urutan file
+    pdf_paths = manifest.pdf_paths
+    cache = open_extraction_cache(settings, log_callback)
+    field_stats = FieldStats()
+    # Nama file yang sudah ada di setiap folder output di-scan sekali, bukan dicek per file
+    reservations = NameReservations()
+    extracted = iter_extracted_info(
+        pdf_paths, settings.get("first_page_only", True), settings.get("extraction_workers", 0),
+        cancel_flag, log_callback, cache, settings.get("extraction_backends", None),
+        settings.get("strict_validation", True), manifest.stats_by_path, prefetched
+    )
 
     # Proses setiap file secara independen
-    for filename in pdf_files:
+    for pdf_path, document, status, info, error in extracted:
+        filename = os.path.basename(pdf_path)
         # Check for cancellation
         if cancel_flag and cancel_flag.is_set():
+            document.close()
             log_message("🛑 Proses dibatalkan oleh user", Fore.YELLOW, log_callback=log_callback)
             break
             
-        pdf_path = os.path.join(input_directory, filename)
-        if not validate_pdf(pdf_path):
+        if status in ("inaccessible", "invalid"):
             error_files += 1
             log_message(f"⚠️ File {filename} korup atau tidak valid, dilewati.", Fore.YELLOW, log_callback=log_callback)
             continue
 
         try:
-            id_tku_seller, partner_name, faktur_number, date, reference = extract_info_from_pdf(pdf_path, log_callback)
+            if status == "error":
+                raise error
+            id_tku_seller, partner_name, faktur_number, date, reference = info
+            field_stats.record(info)
 
             if partner_name == "Nama tidak ditemukan":
                 log_message(f"⚠️ Nama tidak ditemukan di {filename}, dilewati.", Fore.YELLOW, log_callback=log_callback)
@@ -57,26 +94,156 @@ def process_pdfs(input_directory, output_directory=None, progress_callback=None,
                     os.makedirs(idtku_folder, exist_ok=True)
 
             # Buat nama file berdasarkan pengaturan
-            max_length = settings.get("max_filename_length", None)
-            new_filename = generate_filename(partner_name, faktur_number, date, reference, settings, component_order, separator, slash_replacement, max_length)
+            new_filename = filename_template(partner_name, faktur_number, date, reference)
             destination_path = os.path.join(idtku_folder, new_filename)
 
             # Salin file dengan nama unik
-            renamed_files += copy_file_with_unique_name(pdf_path, destination_path, log_callback)
+            renamed_files += copy_file_with_unique_name(
+                pdf_path, destination_path, log_callback, document, reservations, output_strategy
+            )
 
         except Exception as e:
             error_files += 1
             log_message(f"❌ Error membaca {filename}: {str(e)}", Fore.RED, log_callback=log_callback)
+        finally:
+            document.close()
+
+        processed_files += 1
+        if progress_callback:
+            progress_callback("reading", processed_files, total_files, 0, 0)
+
+    if cache:
+        cache.close()
+    if field_stats.total:
+        log_message(f"🔎 Field ditemukan: {field_stats.summary()}", Fore.CYAN, log_callback=log_callback)
+
+    # Tahap 2: Finalisasi
+    return _finalize_and_report(total_files, renamed_files, merged_files, error_files, progress_callback, log_callback, cancel_flag)
+
+
+def plan_pdfs(input_directory, output_directory=None, progress_callback=None, log_callback=None, settings=None, cancel_flag=None, manifest=None, filename_template=None, prefetched=None):
+    """Mode rencana untuk Rename Saja: ekstraksi dan penamaan tanpa menulis file output.
+
+    Return ProcessingPlan berisi tujuan setiap file, nama yang bentrok (diberi akhiran " (N)"
+    seperti saat proses sebenarnya) dan nama yang dipotong. Rencana dijalankan dengan
+    execute_plan tanpa membaca ulang isi PDF.
+    """
+    settings = RunConfig.from_settings(settings)
+    if filename_template is None:
+        filename_template = FilenameTemplate.from_config(settings)
+    if output_directory is None or output_directory.strip() == "":
+        output_directory = os.path.join(input_directory, "ProcessedPDFs")
+    if manifest is None:
+        manifest = InputManifest.scan(input_directory)
+    total_files = len(manifest)
+    log_message(f"Total file ditemukan: {total_files}", Fore.CYAN, log_callback=log_callback)
+
+    plan = ProcessingPlan(MODE_RENAME, input_directory, output_directory)
+    file_stats = manifest.stats_by_path
+    # Nama yang sudah ada di folder output ikut diperhitungkan agar bentrok nama terlihat di rencana
+    reservations = NameReservations()
+    cache = open_extraction_cache(settings, log_callback)
+    extracted = iter_extracted_info(
+        manifest.pdf_paths, settings.get("first_page_only", True), settings.get("extraction_workers", 0),
+        cancel_flag, log_callback, cache, settings.get("extraction_backends", None),
+        settings.get("strict_validation", True), file_stats, prefetched
+    )
+    try:
+        for index, (pdf_path, document, status, info, error) in enumerate(extracted, start=1):
+            document.close()
+            if cancel_flag and cancel_flag.is_set():
+                log_message("🛑 Proses dibatalkan oleh user", Fore.YELLOW, log_callback=log_callback)
+                break
+            filename = os.path.basename(pdf_path)
+            stat_result = file_stats.get(pdf_path)
+            file_stat = {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns} if stat_result else {}
+
+            if status == "ok" and info[1] == "Nama tidak ditemukan":
+                log_message(f"⚠️ Nama tidak ditemukan di {filename}, dilewati.", Fore.YELLOW, log_callback=log_callback)
+                plan.add(PlanEntry(ACTION_SKIP, pdf_path, id_tku=info[0], reason=REASON_NAME_NOT_FOUND, **file_stat))
+            elif status == "ok":
+                id_tku_seller, partner_name, faktur_number, date, reference = info
+                new_filename = filename_template(partner_name, faktur_number, date, reference)
+                full_name = filename_template.full_name(partner_name, faktur_number, date, reference)
+                requested_path = os.path.join(plan_output_folder(output_directory, id_tku_seller), new_filename)
+                destination_path = reservations.reserve(requested_path)
+                plan.add(PlanEntry(
+                    ACTION_RENAME, pdf_path, destination_path, id_tku_seller, partner_name, 0, faktur_number,
+                    destination_path != requested_path, new_filename != full_name, full_name, **file_stat
+                ))
+            else:
+                if status == "error":
+                    reason = str(error)
+                    log_message(f"❌ Error membaca {filename}: {reason}", Fore.RED, log_callback=log_callback)
+                else:
+                    reason = SKIP_REASONS.get(status, status)
+                    log_message(f"⚠️ File {filename} {reason}, dilewati.", Fore.YELLOW, log_callback=log_callback)
+                plan.add(PlanEntry(ACTION_SKIP, pdf_path, status=status, reason=reason, **file_stat))
+
+            if progress_callback:
+                progress_callback("reading", index, total_files, 0, 0)
+    finally:
+        extracted.close()
+        if cache:
+            cache.close()
+
+    plan.log_summary(log_callback)
+    return plan
+
+
+def execute_plan(plan, progress_callback=None, log_callback=None, settings=None, cancel_flag=None):
+    """Jalankan ProcessingPlan mode Rename Saja tanpa membaca ulang isi PDF untuk ekstraksi.
+
+    File ditulis tepat ke tujuan di rencana (nama unik sudah dipilih saat rencana dibuat). Tujuan
+    yang sudah ada saat rencana dijalankan tidak ditimpa dan tidak diberi akhiran baru, tetapi
+    file tersebut dilewati sebagai error; begitu juga file sumber yang hilang atau berubah sejak
+    rencana dibuat. Return sama dengan process_pdfs.
+    """
+    settings = RunConfig.from_settings(settings)
+    total_files = len(plan.entries)
+    log_message(f"🗒️ Menjalankan rencana: {total_files} file", Fore.CYAN, log_callback=log_callback)
+
+    processed_files = 0
+    error_files = 0
+    renamed_files = 0
+    output_strategy = settings.get("output_strategy", "copy")
+
+    for entry in plan.entries:
+        if cancel_flag and cancel_flag.is_set():
+            log_message("🛑 Proses dibatalkan oleh user", Fore.YELLOW, log_callback=log_callback)
+            break
+        filename = os.path.basename(entry.source)
+        if entry.action != ACTION_RENAME:
+            error_files += entry.status != "ok"
+        elif entry.source_changed():
+            error_files += 1
+            log_message(f"⚠️ File {filename} hilang atau berubah sejak rencana dibuat, dilewati.", Fore.YELLOW, log_callback=log_callback)
+        else:
+            try:
+                os.makedirs(os.path.dirname(entry.destination), exist_ok=True)
+                renamed_files += copy_file_with_unique_name(
+                    entry.source, entry.destination, log_callback, None, None, output_strategy, exact=True
+                )
+            except FileExistsError:
+                error_files += 1
+                log_message(f"⚠️ Tujuan {os.path.basename(entry.destination)} sudah ada sejak rencana dibuat, {filename} dilewati.", Fore.YELLOW, log_callback=log_callback)
+            except Exception as e:
+                error_files += 1
+                log_message(f"❌ Error menyalin {filename}: {str(e)}", Fore.RED, log_callback=log_callback)
 
         processed_files += 1
         if progress_callback:
             progress_callback("reading", processed_files, total_files, 0, 0)
 
+    return _finalize_and_report(total_files, renamed_files, 0, error_files, progress_callback, log_callback, cancel_flag)
+
+
+def _finalize_and_report(total_files, renamed_files, merged_files, error_files, progress_callback=None, log_callback=None, cancel_flag=None):
+    """Tahap finalisasi dan log hasil akhir. Return: (total, renamed, merged, errors)."""
     # Hitung total file yang akan difinalisasi
     total_to_finalize = renamed_files
     processed_files_for_finalizing = 0
 
-    # Tahap 2: Finalisasi
     if progress_callback:
         progress_callback("finalizing", 0, total_files, 0, total_to_finalize)
 
@@ -1,261 +1,228 @@
-import pdfplumber
-import re
 import os
+import errno
 import shutil
+try:
+    import fcntl
+except ImportError:
+    # Windows: reflink lewat ioctl tidak tersedia, clone_file memakai salinan biasa
+    fcntl = None
 from pypdf import PdfWriter, PdfReader
 from src.utils.utils import log_message, Fore
+from src.utils.run_config import RunConfig
+from src.pdf.filename_template import FilenameTemplate, COMPONENT_SETTINGS
+from src.pdf.field_extraction import FIELD_SPECS, FieldExtractor
 
-def validate_pdf(pdf_path):
+def validate_pdf(pdf_path, strict=True):
     """Memvalidasi apakah file PDF dapat dibaca (tidak korup)."""
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if pdf.pages:
-                return True
-        return False
-    except (IOError, OSError, ImportError, AttributeError) as e:
-        return False
-    except Exception:
-        # Unknown error, PDF is likely invalid
-        return False
+    from src.pdf.pdf_document import PDFDocument
+    with PDFDocument(pdf_path) as document:
+        return document.validate(strict)
 
-def extract_info_from_pdf(pdf_path, log_callback=None):
-    """Mengambil informasi dari PDF: ID TKU, Nama Partner, Nomor Faktur, Tanggal, dan Referensi."""
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = "".join(page.extract_text() + "\n" for page in pdf.pages if page.extract_text())
+# ioctl Linux untuk reflink (copy-on-write) di filesystem yang mendukung (Btrfs, XFS)
+FICLONE = 0x40049409
 
-        partner_match = re.search(r'Pembeli Barang Kena Pajak\s*/\s*Penerima Jasa Kena Pajak:\s*Nama\s*:\s*(.+?)\s*Alamat', text, re.DOTALL)
-        partner_name = partner_match.group(1).strip().title() if partner_match else "Nama tidak ditemukan"
+# Nilai default ketika sebuah field tidak ditemukan di teks PDF
+MISSING_FIELD_VALUES = tuple(spec.default for spec in FIELD_SPECS)
 
-        id_tku_seller_match = re.search(r'#?(\d{22})', text)
-        id_tku_seller = id_tku_seller_match.group(1).strip() if id_tku_seller_match else "IDTKU_Tidak_Ditemukan"
+# Field wajib (ID TKU, Nama Partner, Nomor Faktur, Tanggal); Referensi boleh kosong
+REQUIRED_FIELD_COUNT = 4
 
-        date_match = re.search(r'(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})', text)
-        month_dict = {
-            "Januari": "01", "Februari": "02", "Maret": "03", "April": "04", "Mei": "05", "Juni": "06",
-            "Juli": "07", "Agustus": "08", "September": "09", "Oktober": "10", "November": "11", "Desember": "12"
-        }
-        date = f"{date_match.group(1)}-{month_dict.get(date_match.group(2), '00')}-{date_match.group(3)}" if date_match else "Tanggal tidak ditemukan"
+def count_found_fields(info):
+    """Jumlah field hasil ekstraksi yang ditemukan (tidak bernilai default)."""
+    return sum(1 for value, missing in zip(info, MISSING_FIELD_VALUES) if value != missing)
 
-        # Perbaiki regex untuk nomor faktur dengan batasan panjang dan format yang lebih spesifik
-        faktur_match = re.search(r'Faktur Pajak:\s*([\w\d\-/.]{1,50}?)(?:\s|$|\n)', text, re.IGNORECASE)
-        faktur_number = faktur_match.group(1).strip() if faktur_match else "NoFaktur"
-        
-        # Tambahan validasi untuk nomor faktur
-        if faktur_number and faktur_number != "NoFaktur":
-            # Hapus karakter kontrol dan whitespace berlebih
-            faktur_number = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', faktur_number)
-            faktur_number = re.sub(r'\s+', ' ', faktur_number).strip()
-            # Batasi panjang maksimal 50 karakter
-            if len(faktur_number) > 50:
-                faktur_number = faktur_number[:50].strip()
-        
-        if faktur_number == "" or not faktur_number:
-            faktur_number = "NoFaktur"
-
-        # Perbaikan regex referensi: menangani multi-line dan posisi tidak stabil
-        # Pattern yang lebih fleksibel untuk menangkap referensi yang bisa multi-line
-        ref_patterns = [
-            r'Referensi:\s*([^}]*?)(?:\n\s*\n|\n\s*[A-Z][^:]*:|$)',  # Pattern utama
-            r'Referensi:\s*([^}]*?)(?:\n\s*Pembeli|$)',              # Alternative pattern
-            r'Referensi:\s*(.*?)(?:\n\s*(?:[A-Z][^:]*:|$))',         # Fallback pattern
-        ]
-        
-        reference = ""
-        for pattern in ref_patterns:
-            ref_match = re.search(pattern, text, re.MULTILINE | re.DOTALL)
-            if ref_match and ref_match.group(1).strip():
-                reference = ref_match.group(1).strip()
-                break
-        
-        # Tambahan validasi dan sanitasi untuk referensi
-        if reference:
-            # Hapus karakter kontrol
-            reference = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', reference)
-            # Ganti newline dan tab dengan spasi
-            reference = re.sub(r'[\n\r\t]+', ' ', reference)
-            # Normalisasi whitespace berlebih
-            reference = re.sub(r'\s+', ' ', reference).strip()
-            # Ganti karakter yang tidak bisa digunakan untuk nama file dengan spasi
-            # Biarkan '/' tetap ada agar bisa diganti sesuai pilihan user (slash_replacement) di generate_filename
-            invalid_chars = r'[<>:"\\|?*()]'  # Tanpa '/'
-            reference = re.sub(invalid_chars, ' ', reference)
-            # Hapus karakter trailing yang tidak diinginkan
-            reference = re.sub(r'[)\]\}]+$', '', reference).strip()
-            # Normalisasi spasi lagi setelah penggantian
-            reference = re.sub(r'\s+', ' ', reference).strip()
-            # Batasi panjang maksimal 200 karakter (diperbesar untuk referensi panjang)
-            if len(reference) > 200:
-                reference = reference[:200].strip()
-        
+def is_info_complete(info):
+    """Cek apakah semua field hasil ekstraksi sudah ditemukan (tidak ada yang bernilai default)."""
+    return count_found_fields(info) == len(MISSING_FIELD_VALUES)
 
-        return id_tku_seller, partner_name, faktur_number, date, reference
-    except (FileNotFoundError, PermissionError) as e:
-        if log_callback:
-            log_callback(f"❌ File access error {os.path.basename(pdf_path)}: {str(e)}")
-        raise
-    except (ImportError, AttributeError) as e:
-        if log_callback:
-            log_callback(f"❌ PDF library error {os.path.basename(pdf_path)}: {str(e)}")
+def has_required_fields(info):
+    """Cek apakah semua field wajib sudah ditemukan."""
+    return count_found_fields(info[:REQUIRED_FIELD_COUNT]) == REQUIRED_FIELD_COUNT
+
+def extract_info_from_pdf(pdf_path, log_callback=None, first_page_only=True, backends=None):
+    """Mengambil informasi dari PDF: ID TKU, Nama Partner, Nomor Faktur, Tanggal, dan Referensi.
+
+    Jika first_page_only aktif, hanya halaman pertama yang dibaca. Halaman berikutnya
+    baru dibaca jika field wajib belum ditemukan atau label Referensi belum terlihat. backends menentukan urutan
+    backend teks (lihat src.pdf.text_backends).
+    """
+    from src.pdf.pdf_document import PDFDocument
+    with PDFDocument(pdf_path) as document:
+        return document.extract_info(log_callback, first_page_only, backends)
+
+def extract_info_from_page_texts(page_texts, first_page_only=True):
+    """Menggabungkan teks halaman demi halaman (iterable string) lalu mem-parse field-nya."""
+    extractor = FieldExtractor()
+    text = ""
+    for page_text in page_texts:
+        if page_text:
+            text += page_text + "\n"
+        # Berhenti membaca halaman berikutnya jika field wajib sudah ditemukan dan label Referensi
+        # sudah terlihat (Referensi boleh kosong)
+        if first_page_only and extractor.update(text):
+            break
+
+    extractor.update(text)
+    return extractor.result()
+
+def parse_info_from_text(text):
+    """Mengambil ID TKU, Nama Partner, Nomor Faktur, Tanggal, dan Referensi dari teks PDF."""
+    extractor = FieldExtractor()
+    extractor.update(text)
+    return extractor.result()
+
+def generate_filename(partner_name, faktur_number, date, reference, settings, component_order=None, separator="-", slash_replacement="_", max_length=None):
+    """Membuat nama file berdasarkan urutan komponen dari GUI dengan pemisah dan pengganti garis miring.
+
+    Template dikompilasi setiap panggilan; untuk banyak file gunakan FilenameTemplate.from_config sekali per proses.
+    """
+    settings = RunConfig.from_settings(settings)
+    template = FilenameTemplate(
+        component_order, separator, slash_replacement, settings.enabled("wrap_reference"),
+        [component for component, key in COMPONENT_SETTINGS.items() if settings.enabled(key)], max_length
+    )
+    return template(partner_name, faktur_number, date, reference)
+
+def copy_file_with_unique_name(source_path, destination_path, log_callback=None, document=None, reservations=None, strategy="copy", exact=False):
+    """Menyalin file ke lokasi tujuan dengan menambahkan nomor unik jika file sudah ada.
+
+    strategy menentukan cara file ditulis (lihat transfer_file): "copy", "move", "hardlink",
+    atau "reflink". Untuk "copy", jika byte document (PDFDocument) sudah ada di memori, isi file
+    ditulis dari byte tersebut sehingga file sumber tidak perlu dibuka lagi. Jika reservations
+    (NameReservations) diberikan, nama unik dipilih dari index nama per folder tanpa memeriksa
+    file satu per satu. File tujuan selalu dibuat eksklusif: nama yang dibuat penulis lain di
+    antara pemilihan nama dan penulisan tidak ditimpa, tetapi diganti akhiran berikutnya.
+    Dengan exact (tujuan dari rencana yang nama uniknya sudah dipilih), file ditulis tepat ke
+    destination_path; jika sudah ada, FileExistsError dilempar tanpa mencari akhiran lain.
+    """
+    def create(path):
+        # Retry hanya untuk file yang sedang dikunci aplikasi lain (Windows)
+        max_retries = 3
+        retry_delay = 0.5
+
+        for attempt in range(max_retries):
+            try:
+                return transfer_file(source_path, path, strategy, document)
+            except PermissionError as e:
+                if attempt < max_retries - 1:
+                    import time
+                    log_message(f"⚠️ Copy attempt {attempt + 1} failed, retrying in {retry_delay}s...", Fore.YELLOW, log_callback=log_callback)
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                raise
+
+    try:
+        if exact:
+            method = create(destination_path)
+        elif reservations is not None:
+            destination_path, method = reservations.claim(destination_path, create)
+        else:
+            destination_path, method = _claim_unique_name(destination_path, create, log_callback)
+
+        if method != strategy and strategy != "copy":
+            log_message(f"ℹ️ {strategy} tidak didukung untuk {os.path.basename(source_path)}, file disalin", Fore.CYAN, log_callback=log_callback)
+        log_message(f"📂 {os.path.basename(destination_path)} dipindahkan ke {os.path.dirname(destination_path)}", Fore.BLUE, log_callback=log_callback)
+        return 1
+
+    except PermissionError as e:
+        log_message(f"❌ Permission error copying {os.path.basename(source_path)}: {str(e)}", Fore.RED, log_callback=log_callback)
         raise
-    except Exception as e:
-        if log_callback:
-            log_callback(f"❌ Unexpected error reading {os.path.basename(pdf_path)}: {str(e)}")
+    except (IOError, OSError, shutil.Error) as e:
+        # Pada mode exact, tujuan yang sudah ada dilaporkan oleh pemanggil
+        if not (exact and isinstance(e, FileExistsError)):
+            log_message(f"❌ Error copying file {os.path.basename(source_path)}: {str(e)}", Fore.RED, log_callback=log_callback)
         raise
 
-def generate_filename(partner_name, faktur_number, date, reference, settings, component_order=None, separator="-", slash_replacement="_", max_length=None):
-    """Membuat nama file berdasarkan urutan komponen dari GUI dengan pemisah dan pengganti garis miring."""
-    invalid_chars = '<>:"/\\|?*'
-    if any(char in separator for char in invalid_chars) or any(char in slash_replacement for char in invalid_chars):
-        log_message(f"Error: Pemisah '{separator}' atau pengganti garis miring '{slash_replacement}' mengandung karakter tidak valid!", Fore.RED)
-        raise ValueError("Pemisah atau pengganti garis miring mengandung karakter tidak valid!")
-
-    # Penanganan karakter invalid untuk referensi sudah dilakukan di extract_info_from_pdf
-    # Tambahan penanganan slash jika masih ada
-    if reference and "/" in reference:
-        reference = reference.replace("/", slash_replacement)
-
-    parts = []
-    # Opsi bungkus referensi dalam kurung
-    wrap_ref_var = settings.get("wrap_reference") if isinstance(settings, dict) else None
-    wrap_reference = False
-    if wrap_ref_var is not None:
+def transfer_file(source_path, destination_path, strategy="copy", document=None):
+    """Menulis source_path ke destination_path sesuai strategy output, tanpa pernah menimpa file.
+
+    - "copy": salinan penuh (dari byte document jika sudah di memori, selain itu salinan file)
+    - "move": rename, hanya operasi metadata; file sumber hilang dari folder input
+    - "hardlink": os.link, file output berbagi isi dengan file sumber
+    - "reflink": salinan copy-on-write (FICLONE) lewat clone_file
+    Jika strategy tidak didukung (beda filesystem/drive, filesystem tanpa hardlink/reflink),
+    file disalin biasa. Jika destination_path sudah ada, FileExistsError dilempar.
+    Return metode yang dipakai ("copy" juga untuk reflink yang jatuh ke salinan byte).
+    """
+    if strategy == "move":
         try:
-            wrap_reference = bool(wrap_ref_var.get()) if hasattr(wrap_ref_var, 'get') else bool(wrap_ref_var)
-        except Exception:
-            wrap_reference = False
-
-    # Siapkan nilai referensi untuk ditampilkan (setelah penggantian slash)
-    display_reference = reference if reference else "NoRef"
-    if display_reference and display_reference != "NoRef" and wrap_reference:
-        display_reference = f"({display_reference})"
-    component_values = {
-        "Nama Lawan Transaksi": (partner_name, settings.get("use_name")),
-        "Tanggal Faktur Pajak": (date, settings.get("use_date")),
-        "Referensi": (display_reference, settings.get("use_reference")),
-        "Nomor Faktur Pajak": (faktur_number, settings.get("use_faktur"))
-    }
-
-
-    if component_order:
-        for component_name in component_order:
-            value, var = component_values.get(component_name, ("", None))
-            if var and hasattr(var, 'get') and var.get():
-                # Validasi nilai untuk Nomor Faktur Pajak
-                if component_name == "Nomor Faktur Pajak" and value == "NoFaktur":
-                    continue
-                parts.append(value)
+            _move_exclusive(source_path, destination_path)
+            return "move"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    elif strategy == "hardlink":
+        try:
+            os.link(source_path, destination_path)
+            return "hardlink"
+        except OSError as e:
+            if isinstance(e, (FileNotFoundError, FileExistsError)):
+                raise
+    elif strategy == "reflink":
+        return "reflink" if clone_file(source_path, destination_path, exclusive=True) == "reflink" else "copy"
+
+    if document is not None and document.loaded_size:
+        try:
+            document.write_to(destination_path, exclusive=True)
+        except FileExistsError:
+            raise
+        except BaseException:
+            _remove_partial(destination_path)
+            raise
     else:
-        for key, (value, var) in component_values.items():
-            if var and hasattr(var, 'get') and var.get():
-                # Validasi nilai untuk Nomor Faktur Pajak
-                if key == "Nomor Faktur Pajak" and value == "NoFaktur":
-                    continue
-                parts.append(value)
+        clone_file(source_path, destination_path, exclusive=True, reflink=False)
+        shutil.copystat(source_path, destination_path)  # metadata seperti shutil.copy2
+    return "copy"
 
-    if not parts:
-        parts.append("unnamed")
+def _move_exclusive(source_path, destination_path):
+    """Pindahkan file tanpa menimpa destination_path (FileExistsError jika sudah ada)."""
+    if os.name == "nt":
+        # Di Windows os.rename sudah gagal jika tujuan ada
+        os.rename(source_path, destination_path)
+        return
+    try:
+        # link gagal dengan EEXIST secara atomik; setelah itu nama sumber dihapus
+        os.link(source_path, destination_path)
+    except OSError as e:
+        if isinstance(e, (FileExistsError, FileNotFoundError)) or e.errno == errno.EXDEV:
+            raise
+        # Filesystem tanpa hardlink: cek keberadaan tepat sebelum rename (nama sudah dipesan)
+        if os.path.lexists(destination_path):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination_path)
+        os.rename(source_path, destination_path)
+        return
+    os.remove(source_path)
 
-    filename = separator.join(parts) + ".pdf"
-    
-    # Gunakan max_length yang dipilih user, atau default conservative
-    if max_length is not None:
-        max_filename_length = max_length
-    else:
-        # VERY AGGRESSIVE filename length limiting untuk Windows compatibility
-        max_filename_length = 130  # Default conservative untuk semua separator
-    
-    if len(filename) > max_filename_length:
-        
-        extension = ".pdf"
-        available_length = max_filename_length - len(extension)
-        
-        # Strategy BARU: Prioritaskan nama, tanggal, dan nomor faktur - potong referensi
-        if len(parts) >= 2:  # Minimal ada nama dan komponen lain
-            nama = parts[0]
-            tanggal = ""
-            referensi = ""
-            nomor_faktur = ""
-            
-            # Identifikasi komponen berdasarkan urutan (bisa berbeda karena component_order)
-            # Cari tanggal (format DD-MM-YYYY)
-            # Cari nomor faktur (biasanya angka panjang atau format khusus)
-            # Sisanya adalah referensi
-            
-            tanggal_found = False
-            faktur_found = False
-            
-            for i, part in enumerate(parts[1:], 1):  # Skip nama (index 0)
-                # Deteksi tanggal (format DD-MM-YYYY atau DD-MM-YY)
-                if not tanggal_found and re.match(r'\d{1,2}-\d{1,2}-\d{2,4}', part):
-                    tanggal = part
-                    tanggal_found = True
-                    continue
-                    
-                # Deteksi nomor faktur (biasanya angka panjang atau alphanumeric dengan pola tertentu)
-                # Nomor faktur biasanya di akhir dan berupa angka panjang
-                if not faktur_found and (part.isdigit() or re.match(r'^[\d\w\-/]{8,}$', part)) and i == len(parts) - 1:
-                    nomor_faktur = part
-                    faktur_found = True
-                    continue
-                    
-                # Sisanya dianggap referensi
-                if referensi:
-                    referensi += separator + part
-                else:
-                    referensi = part
-            
-            # Jika tidak ada nomor faktur terdeteksi, ambil komponen terakhir sebagai faktur
-            if not nomor_faktur and len(parts) > 1:
-                nomor_faktur = parts[-1]
-                # Hapus dari referensi jika sudah diambil sebagai faktur
-                referensi_parts = referensi.split(separator) if referensi else []
-                if referensi_parts and referensi_parts[-1] == nomor_faktur:
-                    referensi = separator.join(referensi_parts[:-1])
-            
-            # Hitung ruang yang tersedia untuk referensi
-            # Format target: {nama}-{tanggal}-{referensi...} {nomor_faktur}.pdf
-            fixed_parts = [nama]
-            if tanggal:
-                fixed_parts.append(tanggal)
-            
-            faktur_suffix = f" {nomor_faktur}" if nomor_faktur else ""
-            fixed_length = len(separator.join(fixed_parts)) + len(faktur_suffix) + 4  # +4 for .pdf
-            
-            if separator and len(fixed_parts) > 1:
-                fixed_length += len(separator)  # For separator before referensi
-            
-            remaining_length = available_length - fixed_length
-            
-            if remaining_length > 10 and referensi:  # Minimal 10 char untuk referensi
-                # Potong referensi jika terlalu panjang dengan visual delimiter {}
-                if len(referensi) > remaining_length - 5:  # -5 untuk {...}
-                    referensi_dipotong = referensi[:remaining_length-5] + "..."
-                    referensi_final = f"{{{referensi_dipotong}}}"  # Wrap dengan kurung kurawal
-                else:
-                    referensi_final = referensi  # Tidak dipotong, tidak perlu kurung kurawal
-                
-                # Build filename
-                base_parts = fixed_parts + [referensi_final]
-                filename = separator.join(base_parts) + faktur_suffix + ".pdf"
-            else:
-                # Hanya nama, tanggal, dan faktur
-                filename = separator.join(fixed_parts) + faktur_suffix + ".pdf"
-        else:
-            # Fallback: potong filename secara brutal
-            filename_without_ext = filename[:-4]  # Remove .pdf
-            filename = filename_without_ext[:available_length-3] + "....pdf"
-        
-    
-    return filename
+def _remove_partial(destination_path):
+    """Hapus file tujuan yang baru dibuat sebagian setelah penulisan gagal."""
+    try:
+        os.remove(destination_path)
+    except OSError:
+        pass
+
+def _claim_unique_name(destination_path, create, log_callback=None):
+    """Seperti NameReservations.claim tanpa index: cari nama unik dengan probe lalu buat file eksklusif."""
+    taken = set()
+    while True:
+        path = _find_unique_name(destination_path, log_callback, taken)
+        try:
+            return path, create(path)
+        except FileExistsError:
+            if path in taken:
+                raise
+            taken.add(path)
 
-def copy_file_with_unique_name(source_path, destination_path, log_callback=None):
-    """Menyalin file ke lokasi tujuan dengan menambahkan nomor unik jika file sudah ada."""
+def _find_unique_name(destination_path, log_callback=None, taken=()):
+    """Cari nama unik dengan memeriksa file satu per satu (tanpa index nama).
+
+    taken berisi nama yang sudah terbukti dipakai walaupun probe belum melihatnya.
+    """
     counter = 1
     original_destination = destination_path
     max_attempts = 1000  # Safety limit to prevent infinite loop
     
-    while os.path.exists(destination_path) and counter <= max_attempts:
+    while (destination_path in taken or os.path.exists(destination_path)) and counter <= max_attempts:
         base, ext = os.path.splitext(original_destination)
         destination_path = f"{base} ({counter}){ext}"
         counter += 1
@@ -267,56 +234,180 @@ def copy_file_with_unique_name(source_path, destination_path, log_callback=None)
         base, ext = os.path.splitext(original_destination)
         destination_path = f"{base}__{timestamp}{ext}"
         log_message(f"⚠️ Hit max naming attempts, using timestamp for {os.path.basename(destination_path)}", Fore.YELLOW, log_callback=log_callback)
+    return destination_path
 
-    try:
-        # Check if source file is accessible and not locked
-        if not os.access(source_path, os.R_OK):
-            raise PermissionError(f"Cannot read source file: {source_path}")
-            
-        # Check if destination directory is writable
-        dest_dir = os.path.dirname(destination_path)
-        if not os.access(dest_dir, os.W_OK):
-            raise PermissionError(f"Cannot write to destination directory: {dest_dir}")
-        
-        # Try to detect if file is locked by attempting to open it
+def clone_file(source_path, destination_path, allow_hardlink=False, exclusive=False, reflink=True):
+    """Menyalin file tanpa membaca/menulis ulang isinya bila memungkinkan.
+
+    Urutan: hardlink (hanya jika allow_hardlink), reflink copy-on-write, copy_file_range, lalu salinan byte biasa.
+    Dengan exclusive, file tujuan yang sudah ada tidak ditimpa (FileExistsError) dan file yang
+    baru dibuat dihapus lagi jika penyalinan gagal. reflink=False melewati percobaan reflink.
+    Return metode yang dipakai: "hardlink", "reflink", "copy_file_range", atau "copy".
+    """
+    if allow_hardlink:
+        try:
+            if not exclusive and os.path.lexists(destination_path):
+                os.remove(destination_path)
+            os.link(source_path, destination_path)
+            return "hardlink"
+        except FileExistsError:
+            if exclusive:
+                raise
+        except OSError:
+            pass
+    with open(source_path, 'rb') as source_file:
+        destination_file = open(destination_path, 'xb' if exclusive else 'wb')
         try:
-            with open(source_path, 'rb') as test_file:
-                # Try to read first few bytes to ensure file is not locked
-                test_file.read(1024)
-        except (PermissionError, IOError) as e:
-            if "being used by another process" in str(e) or "access denied" in str(e).lower():
-                raise IOError(f"File {os.path.basename(source_path)} is currently open in another application. Please close it and try again.")
+            with destination_file:
+                return _clone_into(source_file, destination_file, reflink)
+        except BaseException:
+            if exclusive:
+                _remove_partial(destination_path)
             raise
-        
-        # Perform the actual copy with retry mechanism
-        max_retries = 3
-        retry_delay = 0.5
-        
-        for attempt in range(max_retries):
-            try:
-                shutil.copy2(source_path, destination_path)  # copy2 preserves metadata
-                log_message(f"📂 {os.path.basename(destination_path)} dipindahkan ke {os.path.dirname(destination_path)}", Fore.BLUE, log_callback=log_callback)
-                return 1
-                
-            except (PermissionError, IOError) as e:
-                if attempt < max_retries - 1:
-                    import time
-                    log_message(f"⚠️ Copy attempt {attempt + 1} failed, retrying in {retry_delay}s...", Fore.YELLOW, log_callback=log_callback)
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
-                else:
-                    raise
-                    
-    except PermissionError as e:
-        log_message(f"❌ Permission error copying {os.path.basename(source_path)}: {str(e)}", Fore.RED, log_callback=log_callback)
+
+
+def _clone_into(source_file, destination_file, reflink=True):
+    """Isi destination_file yang sudah terbuka dengan isi source_file; return metode yang dipakai."""
+    if reflink and fcntl is not None:
+        try:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+            return "reflink"
+        except OSError:
+            # Filesystem tidak mendukung reflink, lanjut ke copy_file_range/salinan biasa
+            pass
+    if hasattr(os, "copy_file_range"):
+        try:
+            _copy_file_range(source_file, destination_file)
+            return "copy_file_range"
+        except OSError:
+            source_file.seek(0)
+            destination_file.seek(0)
+            destination_file.truncate()
+    shutil.copyfileobj(source_file, destination_file, 1024 * 1024)
+    return "copy"
+
+
+def _copy_file_range(source_file, destination_file):
+    """Salin isi file di dalam kernel; filesystem yang mendukung (NFS, Btrfs, XFS) bisa berbagi blok."""
+    remaining = os.fstat(source_file.fileno()).st_size
+    while remaining > 0:
+        copied = os.copy_file_range(source_file.fileno(), destination_file.fileno(), remaining)
+        if copied == 0:
+            break
+        remaining -= copied
+
+def copy_single_pdf(pdf_path, output_path, log_callback=None):
+    """Fast path merge untuk grup berisi satu file: isi file disalin apa adanya tanpa membangun ulang PDF.
+
+    pdf_path boleh berupa path atau PDFDocument; byte yang sudah ada di memori langsung ditulis.
+    """
+    try:
+        if getattr(pdf_path, 'loaded_size', 0):
+            with open(output_path, 'wb') as output_file:
+                output_file.write(pdf_path.data)
+        else:
+            clone_file(getattr(pdf_path, 'pdf_path', pdf_path), output_path)
+        log_message(f"✅ File digabungkan ke {output_path}", Fore.GREEN, log_callback=log_callback)
+    except (FileNotFoundError, PermissionError) as e:
+        log_message(f"❌ File access error during merge {os.path.basename(output_path)}: {str(e)}", Fore.RED, log_callback=log_callback)
         raise
-    except (IOError, OSError, shutil.Error) as e:
-        log_message(f"❌ Error copying file {os.path.basename(source_path)}: {str(e)}", Fore.RED, log_callback=log_callback)
+    except (IOError, OSError) as e:
+        log_message(f"❌ I/O error during merge {os.path.basename(output_path)}: {str(e)}", Fore.RED, log_callback=log_callback)
         raise
 
-def merge_pdfs(pdf_paths, output_path, log_callback=None):
-    """Menggabungkan beberapa file PDF menjadi satu file."""
+def volume_path(output_path, part_number):
+    """Nama file volume ke-N: "{nama} (part N).pdf"."""
+    base, extension = os.path.splitext(output_path)
+    return f"{base} (part {part_number}){extension}"
+
+def exceeds_volume_limit(volume_pages, volume_bytes, page_count, file_size, max_pages=0, max_bytes=0):
+    """True jika file berikutnya membuat volume melewati max_pages/max_bytes (0 = tanpa batas)."""
+    return bool((max_pages and volume_pages + page_count > max_pages) or (max_bytes and volume_bytes + file_size > max_bytes))
+
+def assign_volumes(file_sizes, max_pages=0, max_bytes=0):
+    """Nomor volume (mulai 1) untuk setiap file dari [(jumlah halaman, ukuran byte), ...].
+
+    Aturannya sama dengan merge_pdfs_in_volumes, sehingga mode rencana bisa menentukan file
+    "(part N)" tanpa menulis output.
+    """
+    volumes = []
+    volume_number = 1
+    volume_pages = 0
+    volume_bytes = 0
+    for page_count, file_size in file_sizes:
+        if volumes and exceeds_volume_limit(volume_pages, volume_bytes, page_count, file_size, max_pages, max_bytes):
+            volume_number += 1
+            volume_pages, volume_bytes = 0, 0
+        volumes.append(volume_number)
+        volume_pages += page_count
+        volume_bytes += file_size
+    return volumes
+
+def merge_pdfs_in_volumes(pdf_paths, output_path, log_callback=None, optimize=True, max_pages=0, max_bytes=0):
+    """Menggabungkan file PDF dengan batas halaman/byte per file output.
+
+    Jika batas terlampaui, output dibagi menjadi "{nama} (part 1).pdf", "(part 2)", dst.
+    Setiap volume ditulis dan dilepas dari memori sebelum volume berikutnya dimulai;
+    satu faktur tidak pernah dipecah ke dua volume. Return daftar path yang ditulis.
+    """
+    if not max_pages and not max_bytes:
+        merge_pdfs(pdf_paths, output_path, log_callback, optimize)
+        return [output_path]
+
+    from src.pdf.pdf_document import PDFDocument
+    written_paths = []
+    volume = []
+    volume_pages = 0
+    volume_bytes = 0
+
+    def flush(last):
+        # Volume terakhir tanpa volume sebelumnya berarti grup tidak perlu dibagi
+        if last and not written_paths:
+            path = output_path
+        else:
+            path = volume_path(output_path, len(written_paths) + 1)
+        try:
+            merge_pdfs(volume, path, log_callback, optimize)
+        finally:
+            for document in volume:
+                document.close()
+        written_paths.append(path)
+
+    for pdf_path in pdf_paths:
+        document = pdf_path if hasattr(pdf_path, 'get_reader') else PDFDocument(pdf_path)
+        try:
+            page_count = len(document.get_reader().pages)
+            file_size = document.size
+        except Exception:
+            # Error dicatat oleh merge_pdfs saat file ditambahkan ke volume
+            page_count, file_size = 0, 0
+        if volume and exceeds_volume_limit(volume_pages, volume_bytes, page_count, file_size, max_pages, max_bytes):
+            flush(last=False)
+            volume, volume_pages, volume_bytes = [], 0, 0
+        volume.append(document)
+        volume_pages += page_count
+        volume_bytes += file_size
+    if volume:
+        flush(last=True)
+
+    if len(written_paths) > 1:
+        log_message(f"📚 {os.path.basename(output_path)} dibagi menjadi {len(written_paths)} volume", Fore.CYAN, log_callback=log_callback)
+    return written_paths
+
+def compress_page_content(page):
+    """Kompresi content stream halaman (Flate); halaman yang stream-nya tidak bisa didekode dibiarkan apa adanya."""
+    try:
+        page.compress_content_streams()
+    except Exception:
+        pass
+
+def merge_pdfs(pdf_paths, output_path, log_callback=None, optimize=True):
+    """Menggabungkan beberapa file PDF menjadi satu file.
+
+    Elemen pdf_paths boleh berupa path atau PDFDocument yang sudah dibuka.
+    Dengan optimize, content stream halaman dikompresi dan objek identik antar faktur
+    (font, logo, XObject QR) disimpan satu kali saja sebelum file ditulis.
+    """
     merger = None
     pdf_readers = []
     
@@ -326,20 +417,27 @@ def merge_pdfs(pdf_paths, output_path, log_callback=None):
         # Open each PDF file and keep track of readers
         for pdf_path in pdf_paths:
             try:
-                reader = PdfReader(pdf_path)
+                # PDFDocument memakai byte yang sudah dibaca, path biasa dibuka langsung
+                reader = pdf_path.get_reader() if hasattr(pdf_path, 'get_reader') else PdfReader(pdf_path)
                 pdf_readers.append(reader)
                 for page in reader.pages:
-                    merger.add_page(page)
+                    added_page = merger.add_page(page)
+                    if optimize:
+                        compress_page_content(added_page)
             except (FileNotFoundError, PermissionError) as e:
-                log_message(f"⚠️ File access error {os.path.basename(pdf_path)}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
+                log_message(f"⚠️ File access error {os.path.basename(getattr(pdf_path, 'pdf_path', pdf_path))}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
                 continue
             except (ImportError, AttributeError) as e:
-                log_message(f"⚠️ PDF library error {os.path.basename(pdf_path)}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
+                log_message(f"⚠️ PDF library error {os.path.basename(getattr(pdf_path, 'pdf_path', pdf_path))}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
                 continue
             except Exception as e:
-                log_message(f"⚠️ Unexpected error reading {os.path.basename(pdf_path)}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
+                log_message(f"⚠️ Unexpected error reading {os.path.basename(getattr(pdf_path, 'pdf_path', pdf_path))}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
                 continue
                 
+        if optimize:
+            # Objek dengan hash sama digabung menjadi satu salinan, objek yang tidak dirujuk dibuang
+            merger.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+
         # Write merged PDF
         with open(output_path, 'wb') as output_file:
             merger.write(output_file)
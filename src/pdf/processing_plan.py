@@ -0,0 +1,189 @@
+import csv
+import json
+import os
+import time
+from src.utils.utils import log_message, Fore
+
+# Naikkan versi ini jika format file rencana berubah
+PLAN_VERSION = 1
+DEFAULT_PLAN_FILENAME = "processing_plan"
+
+MODE_RENAME = "Rename Saja"
+MODE_MERGE = "Rename dan Merge"
+
+ACTION_RENAME = "rename"
+ACTION_MERGE = "merge"
+ACTION_SKIP = "skip"
+
+# Alasan file dilewati (kolom reason)
+REASON_NAME_NOT_FOUND = "Nama tidak ditemukan"
+REASON_KNOWN_FAKTUR = "Nomor faktur sudah ada di file gabungan"
+SKIP_REASONS = {"inaccessible": "tidak dapat diakses", "invalid": "korup atau tidak valid"}
+
+# Kolom setiap baris rencana; urutan ini juga urutan kolom CSV
+PLAN_FIELDS = (
+    "action", "source", "destination", "id_tku", "partner_name", "merge_order", "faktur_number",
+    "collision", "truncated", "full_name", "status", "reason", "size", "mtime_ns",
+)
+_INT_FIELDS = ("merge_order", "size", "mtime_ns")
+_BOOL_FIELDS = ("collision", "truncated")
+
+
+def default_plan_path(output_directory):
+    """Lokasi file rencana default (JSON) di folder output; plan_path dengan akhiran .csv menyimpan CSV."""
+    return os.path.join(output_directory, f"{DEFAULT_PLAN_FILENAME}.json")
+
+
+def plan_output_folder(output_directory, id_tku_seller):
+    """Folder output ID TKU untuk rencana, mengikuti fallback "_alt" saat proses sebenarnya
+    (folder ID TKU tidak bisa dibuat karena sudah ada file dengan nama yang sama)."""
+    folder = os.path.join(output_directory, id_tku_seller)
+    if os.path.exists(folder) and not os.path.isdir(folder):
+        return os.path.join(output_directory, f"{id_tku_seller}_alt")
+    return folder
+
+
+class PlanEntry:
+    """Satu baris rencana: file sumber dan apa yang akan dilakukan terhadapnya.
+
+    action "rename" menyalin source ke destination, "merge" menggabungkan source ke destination
+    sesuai merge_order, dan "skip" berarti file tidak diproses (alasan di reason, status
+    ekstraksi di status). collision berarti nama tujuan bentrok dengan file lain (nama diberi
+    akhiran atau file gabungan sudah ada); truncated berarti nama dipotong dari full_name.
+    size dan mtime_ns dipakai untuk mendeteksi file sumber yang berubah sebelum rencana dijalankan.
+    """
+
+    def __init__(self, action, source, destination="", id_tku="", partner_name="", merge_order=0, faktur_number="",
+                 collision=False, truncated=False, full_name="", status="ok", reason="", size=0, mtime_ns=0):
+        self.action = action
+        self.source = source
+        self.destination = destination
+        self.id_tku = id_tku
+        self.partner_name = partner_name
+        self.merge_order = merge_order
+        self.faktur_number = faktur_number
+        self.collision = collision
+        self.truncated = truncated
+        self.full_name = full_name
+        self.status = status
+        self.reason = reason
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in PLAN_FIELDS}
+
+    @classmethod
+    def from_dict(cls, row):
+        """Buat entry dari dict JSON atau baris CSV (semua nilai string); kolom yang tidak dikenal diabaikan."""
+        values = {}
+        for field in PLAN_FIELDS:
+            value = row.get(field)
+            if value is None:
+                continue
+            if field in _INT_FIELDS:
+                value = int(value or 0)
+            elif field in _BOOL_FIELDS and isinstance(value, str):
+                value = value.strip().lower() in ("1", "true", "yes")
+            values[field] = value
+        if not values.get("action") or not values.get("source"):
+            raise ValueError("Baris rencana harus memiliki action dan source")
+        return cls(**values)
+
+    def source_changed(self):
+        """True jika file sumber hilang atau berubah sejak rencana dibuat."""
+        try:
+            stat_result = os.stat(self.source)
+        except OSError:
+            return True
+        if not self.size and not self.mtime_ns:
+            return False
+        return (stat_result.st_size, stat_result.st_mtime_ns) != (self.size, self.mtime_ns)
+
+
+class ProcessingPlan:
+    """Rencana pemrosesan hasil ekstraksi dan penamaan tanpa menulis file.
+
+    Dibuat oleh plan_pdfs di modul processor, disimpan sebagai JSON atau CSV untuk ditinjau,
+    lalu dijalankan oleh execute_plan tanpa membaca ulang isi PDF. Baris bisa dihapus dari
+    file rencana untuk mengecualikan file sebelum rencana dijalankan.
+    """
+
+    def __init__(self, mode, input_directory="", output_directory="", entries=None, created_at=None):
+        self.mode = mode
+        self.input_directory = input_directory
+        self.output_directory = output_directory
+        self.entries = entries if entries is not None else []
+        self.created_at = created_at or time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def add(self, entry):
+        self.entries.append(entry)
+
+    def summary(self):
+        """Jumlah baris per jenis untuk log dan statistik."""
+        counts = {ACTION_RENAME: 0, ACTION_MERGE: 0, ACTION_SKIP: 0, "errors": 0, "collisions": 0, "truncated": 0}
+        destinations = set()
+        for entry in self.entries:
+            counts[entry.action] = counts.get(entry.action, 0) + 1
+            if entry.action == ACTION_SKIP and entry.status != "ok":
+                counts["errors"] += 1
+            counts["collisions"] += bool(entry.collision)
+            counts["truncated"] += bool(entry.truncated)
+            if entry.action == ACTION_MERGE:
+                destinations.add(entry.destination)
+        counts["groups"] = len(destinations)
+        return counts
+
+    def log_summary(self, log_callback=None):
+        counts = self.summary()
+        log_message(
+            f"🗒️ Rencana {self.mode}: {counts[ACTION_RENAME]} rename, {counts[ACTION_MERGE]} file ke {counts['groups']} file gabungan, "
+            f"{counts[ACTION_SKIP]} dilewati, {counts['collisions']} bentrok nama, {counts['truncated']} nama dipotong",
+            Fore.CYAN, log_callback=log_callback
+        )
+
+    def save(self, path):
+        """Simpan rencana; format ditentukan dari ekstensi (.csv, selain itu JSON). Ditulis atomik."""
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        if path.lower().endswith(".csv"):
+            # CSV hanya berisi baris; mode ditentukan dari action saat dibaca
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=PLAN_FIELDS)
+                writer.writeheader()
+                for entry in self.entries:
+                    writer.writerow(entry.to_dict())
+        else:
+            data = {
+                "version": PLAN_VERSION,
+                "mode": self.mode,
+                "input_directory": self.input_directory,
+                "output_directory": self.output_directory,
+                "created_at": self.created_at,
+                "entries": [entry.to_dict() for entry in self.entries],
+            }
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Baca rencana dari JSON atau CSV. Raise ValueError jika format atau isinya tidak valid."""
+        if path.lower().endswith(".csv"):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                entries = [PlanEntry.from_dict(row) for row in csv.DictReader(f)]
+            actions = {entry.action for entry in entries}
+            mode = MODE_MERGE if ACTION_MERGE in actions else MODE_RENAME
+            return cls(mode, entries=entries)
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("version") != PLAN_VERSION:
+            raise ValueError(f"Versi file rencana tidak didukung: {path}")
+        if data.get("mode") not in (MODE_RENAME, MODE_MERGE):
+            raise ValueError(f"Mode rencana tidak dikenal: {data.get('mode')}")
+        return cls(
+            data["mode"], data.get("input_directory", ""), data.get("output_directory", ""),
+            [PlanEntry.from_dict(row) for row in data.get("entries", [])], data.get("created_at")
+        )
@@ -0,0 +1,68 @@
+# Pembersihan nilai field (referensi, nomor faktur) agar aman dipakai di nama file: satu tabel
+# str.translate yang disiapkan sekali saat import ditambah satu kali penyatuan whitespace.
+
+# Karakter kontrol C0/C1 (termasuk \n, \r, \t) dihapus
+CONTROL_CHARS = "".join(chr(code) for code in list(range(0x00, 0x20)) + list(range(0x7f, 0xa0)))
+# Semua karakter whitespace Unicode (sama dengan \s pada regex dan str.isspace); seluruhnya ada di BMP awal
+WHITESPACE_CHARS = "".join(chr(code) for code in range(0x3001) if chr(code).isspace())
+# Karakter yang tidak bisa dipakai di nama file, tanpa '/' (diganti sesuai slash_replacement)
+INVALID_REFERENCE_CHARS = '<>:"\\|?*()'
+TRAILING_BRACKETS = ")]}"
+
+MAX_REFERENCE_LENGTH = 200
+MAX_FAKTUR_NUMBER_LENGTH = 50
+
+_WHITESPACE_TABLE = {ord(char): " " for char in WHITESPACE_CHARS}
+_CONTROL_TABLE = {ord(char): None for char in CONTROL_CHARS}
+
+# Nomor faktur: hapus karakter kontrol, whitespace lain jadi spasi
+FAKTUR_NUMBER_TABLE = {**_WHITESPACE_TABLE, **_CONTROL_TABLE}
+# Referensi: seperti nomor faktur, ditambah karakter invalid jadi spasi
+REFERENCE_TABLE = {**FAKTUR_NUMBER_TABLE, **{ord(char): " " for char in INVALID_REFERENCE_CHARS}}
+# Karakter yang diabaikan saat mencari karakter terakhir referensi
+_IGNORED_AT_END = CONTROL_CHARS + WHITESPACE_CHARS
+
+_slash_tables = {}
+
+
+def collapse_whitespace(value):
+    """Satukan deretan whitespace menjadi satu spasi dan buang whitespace di awal/akhir."""
+    return " ".join(value.split())
+
+
+def sanitize_faktur_number(faktur_number):
+    """Hapus karakter kontrol dan whitespace berlebih, batasi panjang maksimal 50 karakter."""
+    faktur_number = collapse_whitespace(faktur_number.translate(FAKTUR_NUMBER_TABLE))
+    if len(faktur_number) > MAX_FAKTUR_NUMBER_LENGTH:
+        faktur_number = faktur_number[:MAX_FAKTUR_NUMBER_LENGTH].strip()
+    return faktur_number
+
+
+def sanitize_reference(reference):
+    """Bersihkan referensi agar aman dipakai di nama file (maksimal 200 karakter).
+
+    Tanda kurung penutup di akhir referensi dibuang. Jika karakter terakhir yang terlihat
+    adalah karakter invalid (sudah menjadi spasi), tanda kurung sebelumnya dipertahankan,
+    sama seperti urutan pembersihan lama (ganti karakter invalid, lalu buang kurung di akhir).
+    """
+    cleaned = reference.translate(REFERENCE_TABLE).rstrip(" ")
+    last_visible = reference.rstrip(_IGNORED_AT_END)[-1:]
+    if last_visible and last_visible not in INVALID_REFERENCE_CHARS:
+        cleaned = cleaned.rstrip(TRAILING_BRACKETS)
+    reference = collapse_whitespace(cleaned)
+    if len(reference) > MAX_REFERENCE_LENGTH:
+        reference = reference[:MAX_REFERENCE_LENGTH].strip()
+    return reference
+
+
+def slash_table(slash_replacement):
+    """Tabel str.translate untuk mengganti '/' dengan slash_replacement (di-cache per nilai)."""
+    table = _slash_tables.get(slash_replacement)
+    if table is None:
+        table = _slash_tables[slash_replacement] = {ord("/"): slash_replacement}
+    return table
+
+
+def replace_slashes(value, slash_replacement):
+    """Ganti '/' di value dengan slash_replacement."""
+    return value.translate(slash_table(slash_replacement))
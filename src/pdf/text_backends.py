@@ -0,0 +1,101 @@
+import io
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LTChar, LTContainer
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from src.pdf.pdf_utils import extract_info_from_page_texts, MISSING_FIELD_VALUES
+from src.pdf.layout_profiles import LAYOUT_PROFILES
+
+# Urutan default: hanya pdfplumber (paling akurat untuk pola regex saat ini)
+DEFAULT_BACKENDS = ("pdfplumber",)
+
+
+class TextBackend:
+    """Antarmuka backend ekstraksi teks: menghasilkan teks per halaman dari PDFDocument."""
+    name = None
+
+    def iter_page_texts(self, document):
+        raise NotImplementedError
+
+    def extract_info(self, document, first_page_only=True):
+        """Ekstrak tuple field dari dokumen; default-nya mem-parse teks per halaman."""
+        return extract_info_from_page_texts(self.iter_page_texts(document), first_page_only)
+
+
+class PdfplumberBackend(TextBackend):
+    """pdfplumber dengan analisis layout penuh (paling lambat, paling akurat)."""
+    name = "pdfplumber"
+
+    def iter_page_texts(self, document):
+        for page in document.get_plumber().pages:
+            yield page.extract_text() or ""
+
+
+class PypdfBackend(TextBackend):
+    """pypdf extract_text: cepat, tanpa objek layout per karakter."""
+    name = "pypdf"
+
+    def iter_page_texts(self, document):
+        for page in document.get_reader().pages:
+            yield page.extract_text() or ""
+
+
+class PdfminerBackend(TextBackend):
+    """pdfminer tanpa analisis layout: karakter dibaca sesuai urutan content stream,
+    baris baru disisipkan setiap kali posisi vertikal berubah."""
+    name = "pdfminer"
+
+    def iter_page_texts(self, document):
+        resource_manager = PDFResourceManager()
+        device = PDFPageAggregator(resource_manager, laparams=None)
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        try:
+            for page in PDFPage.get_pages(io.BytesIO(document.data)):
+                interpreter.process_page(page)
+                yield self._layout_to_text(device.get_result())
+        finally:
+            device.close()
+
+    def _layout_to_text(self, layout):
+        chunks = []
+        last_y = None
+        stack = [iter(layout)]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            if isinstance(item, LTChar):
+                if last_y is not None and abs(item.y0 - last_y) > item.height / 2:
+                    chunks.append("\n")
+                last_y = item.y0
+                chunks.append(item.get_text())
+            elif isinstance(item, LTContainer):
+                stack.append(iter(item))
+        return "".join(chunks)
+
+
+class CoretaxLayoutBackend(TextBackend):
+    """Ekstraksi posisional: hanya area field di halaman pertama (lihat layout_profiles) yang dibaca.
+    Jika tidak ada profil yang cocok, semua field dikembalikan kosong agar backend berikutnya dipakai."""
+    name = "coretax_layout"
+
+    def extract_info(self, document, first_page_only=True):
+        pages = document.get_plumber().pages
+        if pages:
+            for profile in LAYOUT_PROFILES:
+                info = profile.extract(pages[0])
+                if info is not None:
+                    return info
+        return MISSING_FIELD_VALUES
+
+
+TEXT_BACKENDS = {
+    backend.name: backend for backend in (PdfplumberBackend(), PypdfBackend(), PdfminerBackend(), CoretaxLayoutBackend())
+}
+
+
+def resolve_backends(names):
+    """Ubah daftar nama backend dari pengaturan menjadi objek backend; nama yang tidak dikenal diabaikan."""
+    backends = [TEXT_BACKENDS[name] for name in (names or ()) if name in TEXT_BACKENDS]
+    return backends or [TEXT_BACKENDS[name] for name in DEFAULT_BACKENDS]
@@ -1,75 +1,63 @@
 import os
-from src.pdf.pdf_utils import extract_info_from_pdf, generate_filename, validate_pdf
+from src.pdf.pdf_extractor import iter_extracted_info
+from src.pdf.extraction_cache import open_extraction_cache
+from src.utils.input_manifest import InputManifest
 from src.utils.utils import log_message, Fore
+from src.utils.run_config import RunConfig
+from src.pdf.filename_template import FilenameTemplate
 
-def check_long_filenames(input_directory, settings, log_callback=None):
+def check_long_filenames(input_directory, settings, log_callback=None, manifest=None, filename_template=None, results=None, cancel_flag=None, progress_callback=None):
     """
     Periksa apakah ada file yang akan menghasilkan nama file terlalu panjang
+    settings sebaiknya RunConfig yang dibekukan di main thread (dict settings GUI dibekukan di sini).
+    manifest (InputManifest) dan filename_template (FilenameTemplate) dipakai bersama dengan tahap
+    pemrosesan; jika None folder di-scan / template dikompilasi di sini.
+    Semua file diperiksa lewat pipeline ekstraksi paralel yang sama dengan tahap pemrosesan. Jika
+    results (dict) diberikan, hasil ekstraksi disimpan sebagai path -> (status, info, error) agar
+    bisa diteruskan sebagai prefetched ke process_pdfs_* tanpa ekstraksi ulang.
     Return: (has_long_filenames, long_filename_list, sample_filenames)
     """
     
-    # Ambil pengaturan separator
-    separator = settings.get("separator", "-")
-    slash_replacement = settings.get("slash_replacement", "_")
-    # Wrap reference option
-    wrap_ref_var = settings.get("wrap_reference") if isinstance(settings, dict) else None
-    try:
-        wrap_reference = bool(wrap_ref_var.get()) if hasattr(wrap_ref_var, 'get') else bool(wrap_ref_var)
-    except Exception:
-        wrap_reference = False
+    settings = RunConfig.from_settings(settings)
+    if filename_template is None:
+        filename_template = FilenameTemplate.from_config(settings)
     
-    pdf_files = [f for f in os.listdir(input_directory) if f.endswith('.pdf')]
+    if manifest is None:
+        manifest = InputManifest.scan(input_directory)
     
     long_filenames = []
     sample_filenames = []
     max_safe_length = 150  # Batas aman untuk checking
     
-    for filename in pdf_files[:5]:  # Check hanya 5 file pertama untuk sample
-        pdf_path = os.path.join(input_directory, filename)
-        
-        if not validate_pdf(pdf_path):
+    # Periksa semua file; hasil ekstraksi diambil dari / disimpan ke cache
+    pdf_paths = manifest.pdf_paths
+    total_files = len(pdf_paths)
+    cache = open_extraction_cache(settings, log_callback)
+    extracted = iter_extracted_info(
+        pdf_paths, settings.get("first_page_only", True), settings.get("extraction_workers", 0),
+        cancel_flag, log_callback, cache, settings.get("extraction_backends", None),
+        settings.get("strict_validation", True), manifest.stats_by_path
+    )
+
+    for index, (pdf_path, document, status, info, error) in enumerate(extracted, start=1):
+        filename = os.path.basename(pdf_path)
+        document.close()
+        if results is not None:
+            results[pdf_path] = (status, info, error)
+        if progress_callback:
+            progress_callback("preflight", index, total_files, 0, 0)
+        # File yang gagal dibaca dilaporkan saat pemrosesan
+        if status != "ok":
             continue
-            
+        
         try:
-            id_tku_seller, partner_name, faktur_number, date, reference = extract_info_from_pdf(pdf_path, log_callback)
+            id_tku_seller, partner_name, faktur_number, date, reference = info
             
             if partner_name == "Nama tidak ditemukan":
                 continue
                 
-            # Generate filename tanpa batasan untuk check panjang asli
-            # Kita perlu test dengan original generator tanpa truncation
-            parts = []
-            component_values = {
-                "Nama Lawan Transaksi": (partner_name, settings.get("use_name")),
-                "Tanggal Faktur Pajak": (date, settings.get("use_date")),
-                # Terapkan penggantian '/' dan opsi bungkus kurung untuk referensi
-                "Referensi": ( 
-                    (f"({reference.replace('/', slash_replacement)})" if (reference and wrap_reference) else 
-                     (reference.replace('/', slash_replacement) if reference else "NoRef")),
-                    settings.get("use_reference")
-                ),
-                "Nomor Faktur Pajak": (faktur_number, settings.get("use_faktur"))
-            }
-            
-            component_order = settings.get("component_order", None)
-            if component_order:
-                for component_name in component_order:
-                    value, var = component_values.get(component_name, ("", None))
-                    if var and hasattr(var, 'get') and var.get():
-                        if component_name == "Nomor Faktur Pajak" and value == "NoFaktur":
-                            continue
-                        parts.append(value)
-            else:
-                for key, (value, var) in component_values.items():
-                    if var and hasattr(var, 'get') and var.get():
-                        if key == "Nomor Faktur Pajak" and value == "NoFaktur":
-                            continue
-                        parts.append(value)
-            
-            if not parts:
-                parts.append("unnamed")
-            
-            test_filename = separator.join(parts) + ".pdf"
+            # Nama file lengkap tanpa pemotongan untuk cek panjang asli
+            test_filename = filename_template.full_name(partner_name, faktur_number, date, reference)
             
             # Jika filename asli > max_safe_length, tambahkan ke list
             if len(test_filename) > max_safe_length:
@@ -93,6 +81,9 @@ def check_long_filenames(input_directory, settings, log_callback=None):
             log_message(f"Error checking {filename}: {str(e)}", Fore.YELLOW, log_callback=log_callback)
             continue
     
+    if cache:
+        cache.close()
+
     has_long_filenames = len(long_filenames) > 0
     
     if has_long_filenames:
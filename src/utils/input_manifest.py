@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+
+def is_pdf_filename(filename):
+    """Filter file PDF yang dipakai di seluruh aplikasi (tidak peka huruf besar/kecil)."""
+    return filename.lower().endswith('.pdf')
+
+
+class ManifestEntry:
+    """Satu file PDF di folder input beserta info stat-nya (size, mtime, inode)."""
+    __slots__ = ("name", "path", "stat")
+
+    def __init__(self, name, path, stat):
+        self.name = name
+        self.path = path
+        self.stat = stat
+
+    @property
+    def size(self):
+        return self.stat.st_size
+
+    @property
+    def mtime_ns(self):
+        return self.stat.st_mtime_ns
+
+    @property
+    def inode(self):
+        return self.stat.st_ino
+
+
+class InputManifest:
+    """Daftar file PDF di folder input, dibaca sekali dengan os.scandir lalu dipakai bersama
+    oleh preflight, pemrosesan, dan counter."""
+
+    def __init__(self, directory, entries):
+        self.directory = directory
+        self.entries = entries
+        self.scanned_at = time.time()
+
+    @classmethod
+    def scan(cls, directory):
+        """Baca isi folder sekali. Raise OSError jika folder tidak bisa dibaca."""
+        entries = []
+        with os.scandir(directory) as iterator:
+            for dir_entry in iterator:
+                if not is_pdf_filename(dir_entry.name):
+                    continue
+                try:
+                    if not dir_entry.is_file():
+                        continue
+                    entries.append(ManifestEntry(dir_entry.name, dir_entry.path, dir_entry.stat()))
+                except OSError:
+                    # File hilang atau tidak bisa di-stat saat dibaca, lewati
+                    continue
+        return cls(directory, entries)
+
+    @property
+    def filenames(self):
+        return [entry.name for entry in self.entries]
+
+    @property
+    def pdf_paths(self):
+        return [entry.path for entry in self.entries]
+
+    @property
+    def stats_by_path(self):
+        return {entry.path: entry.stat for entry in self.entries}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+
+_shared_manifest = None
+_shared_manifest_lock = threading.Lock()
+
+
+def get_shared_manifest(directory, max_age=2.0):
+    """Manifest untuk counter GUI: hasil scan folder yang sama dipakai ulang selama max_age detik,
+    sehingga beberapa komponen yang bereaksi pada perubahan path tidak membaca folder berulang kali."""
+    global _shared_manifest
+    with _shared_manifest_lock:
+        manifest = _shared_manifest
+        if manifest is not None and manifest.directory == directory and time.time() - manifest.scanned_at <= max_age:
+            return manifest
+        manifest = InputManifest.scan(directory)
+        _shared_manifest = manifest
+        return manifest
@@ -0,0 +1,173 @@
+import os
+import sys
+import queue
+import threading
+import time
+
+# Jumlah pesan yang boleh antre; jika penuh, pemanggil menunggu sampai writer menyusul
+MAX_QUEUED_MESSAGES = 10000
+# Interval maksimum sebelum isi buffer ditulis ke disk (detik)
+FLUSH_INTERVAL = 0.5
+# Buffer ditulis lebih awal jika ukurannya melewati batas ini (byte)
+FLUSH_BUFFER_BYTES = 64 * 1024
+# Rotasi log: ukuran maksimum file log dan jumlah file cadangan (log.txt.1, log.txt.2, ...)
+DEFAULT_MAX_LOG_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 3
+
+_STOP = object()
+
+
+def application_directory():
+    """Folder aplikasi (folder executable pada build PyInstaller, atau folder script utama)."""
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    main_script = sys.argv[0] if sys.argv and sys.argv[0] else ""
+    if main_script and os.path.exists(main_script):
+        return os.path.dirname(os.path.abspath(main_script))
+    return os.getcwd()
+
+
+def resolve_application_path(path):
+    """Path relatif (file log, cache) dihitung dari folder aplikasi, bukan dari working directory."""
+    path = os.path.expanduser(path)
+    if os.path.isabs(path):
+        return path
+    return os.path.join(application_directory(), path)
+
+
+class LogWriter:
+    """Penulis log di background thread.
+
+    Pesan dimasukkan ke antrean terbatas lalu dicetak ke terminal dan ditulis ke file oleh
+    satu thread, dengan buffer yang di-flush setiap FLUSH_INTERVAL atau saat buffer penuh.
+    File log dirotasi saat ukurannya (dalam byte UTF-8) melewati max_bytes. File dibuka sekali,
+    bukan per pesan. Jika file atau rotasi gagal, penulisan dicoba lagi pada flush berikutnya.
+    """
+
+    def __init__(self, log_path, max_bytes=DEFAULT_MAX_LOG_BYTES, backup_count=DEFAULT_LOG_BACKUPS):
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue = queue.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._file = None
+        self._file_size = 0
+        self._error_reported = False
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, console_line, log_entry):
+        """Antrekan satu pesan (baris terminal berwarna, baris file log)."""
+        self._queue.put((console_line, log_entry))
+
+    def flush(self, timeout=2.0):
+        """Tunggu sampai semua pesan yang sudah diantrekan ditulis ke file."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush_buffer()
+                self._close_file()
+                return
+            if isinstance(item, threading.Event):
+                self._flush_buffer()
+                item.set()
+                last_flush = time.monotonic()
+                continue
+            if item is not None:
+                console_line, log_entry = item
+                try:
+                    print(console_line)
+                except (OSError, ValueError):
+                    # Tidak ada terminal (mis. pythonw), pesan tetap ditulis ke file
+                    pass
+                line = (log_entry + "\n").encode("utf-8")
+                self._buffer.append(line)
+                self._buffered_bytes += len(line)
+
+            now = time.monotonic()
+            if self._buffered_bytes >= FLUSH_BUFFER_BYTES or (self._buffer and now - last_flush >= FLUSH_INTERVAL):
+                self._flush_buffer()
+                last_flush = now
+
+    def _flush_buffer(self):
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        if os.linesep != "\n":
+            data = data.replace(b"\n", os.linesep.encode("ascii"))
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        try:
+            if self._file is None:
+                self._open_file()
+            if self.max_bytes and self._file_size > 0 and self._file_size + len(data) > self.max_bytes:
+                try:
+                    self._rotate()
+                except OSError as e:
+                    # Rotasi gagal (mis. file dikunci proses lain): tulis ke file yang ada, rotasi dicoba lagi nanti
+                    self._report_error(e)
+                    if self._file is None:
+                        self._open_file()
+            self._file.write(data)
+            self._file.flush()
+            self._file_size += len(data)
+            self._error_reported = False
+        except OSError as e:
+            # File log tidak bisa ditulis: pesan ini dilewati agar proses tidak terganggu, file dibuka lagi pada flush berikutnya
+            self._close_file()
+            self._report_error(e)
+
+    def _report_error(self, error):
+        """Cetak kegagalan file log ke stderr sekali sampai penulisan berhasil lagi."""
+        if self._error_reported:
+            return
+        self._error_reported = True
+        try:
+            print(f"Log file {self.log_path} tidak bisa ditulis: {str(error)}", file=sys.stderr)
+        except (OSError, ValueError):
+            pass
+
+    def _open_file(self):
+        log_dir = os.path.dirname(self.log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        # Mode biner agar ukuran file dihitung dalam byte; newline dikonversi di _flush_buffer
+        self._file = open(self.log_path, "ab")
+        self._file_size = os.fstat(self._file.fileno()).st_size
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _rotate(self):
+        """log.txt -> log.txt.1 -> log.txt.2 ...; file cadangan tertua dihapus."""
+        self._close_file()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.log_path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_path}.{index + 1}")
+            os.replace(self.log_path, f"{self.log_path}.1")
+        else:
+            os.remove(self.log_path)
+        self._open_file()
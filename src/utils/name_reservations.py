@@ -0,0 +1,89 @@
+import errno
+import os
+import threading
+
+
+# Batas percobaan nama baru jika nama yang dipesan ternyata sudah dibuat penulis lain
+MAX_CLAIM_ATTEMPTS = 1000
+
+
+class NameReservations:
+    """Index nama file yang sudah dipakai per folder output, untuk memilih nama unik tanpa probe os.path.exists.
+
+    Setiap folder di-scan sekali saat pertama kali dipakai, lalu setiap nama yang dipilih
+    langsung dicatat. Nama dengan akhiran " (N)" dipilih memakai penghitung per nama dasar,
+    sehingga nama berikutnya ditemukan dalam waktu konstan (amortized). Aman dipakai dari
+    beberapa thread. Index hanya perkiraan untuk file yang dibuat proses lain setelah scan;
+    claim() membuat file secara eksklusif sehingga nama tersebut tidak pernah ditimpa.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {folder: set(nama file)}, nama dinormalisasi dengan os.path.normcase
+        self._names = {}
+        # {folder: {nama dasar: akhiran berikutnya yang dicoba}}
+        self._next_suffix = {}
+
+    def _folder_names(self, folder):
+        names = self._names.get(folder)
+        if names is None:
+            names = set()
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        names.add(os.path.normcase(entry.name))
+            except FileNotFoundError:
+                pass
+            self._names[folder] = names
+            self._next_suffix[folder] = {}
+        return names
+
+    def reserve(self, destination_path):
+        """Pilih dan catat nama unik untuk destination_path: nama asli, atau "{nama} (N){ext}" jika sudah dipakai."""
+        folder, filename = os.path.split(destination_path)
+        folder_key = os.path.normcase(os.path.abspath(folder))
+        with self._lock:
+            names = self._folder_names(folder_key)
+            if os.path.normcase(filename) not in names:
+                names.add(os.path.normcase(filename))
+                return destination_path
+
+            base, ext = os.path.splitext(filename)
+            base_key = os.path.normcase(filename)
+            next_suffix = self._next_suffix[folder_key]
+            counter = next_suffix.get(base_key, 1)
+            candidate = f"{base} ({counter}){ext}"
+            while os.path.normcase(candidate) in names:
+                counter += 1
+                candidate = f"{base} ({counter}){ext}"
+            next_suffix[base_key] = counter + 1
+            names.add(os.path.normcase(candidate))
+            return os.path.join(folder, candidate)
+
+    def release(self, destination_path):
+        """Lepaskan nama yang sudah dipesan tapi gagal ditulis."""
+        folder, filename = os.path.split(destination_path)
+        folder_key = os.path.normcase(os.path.abspath(folder))
+        with self._lock:
+            names = self._names.get(folder_key)
+            if names is not None:
+                names.discard(os.path.normcase(filename))
+
+    def claim(self, destination_path, create, max_attempts=MAX_CLAIM_ATTEMPTS):
+        """Pesan nama unik lalu buat file dengan create(path).
+
+        create harus membuat file secara eksklusif dan melempar FileExistsError jika nama sudah
+        ada (mis. dibuat penulis lain setelah folder di-scan). Nama tersebut tetap tercatat
+        sebagai terpakai dan akhiran berikutnya dicoba. Jika create gagal karena error lain,
+        nama dilepas dan error diteruskan. Return: (path, hasil create).
+        """
+        for _ in range(max_attempts):
+            path = self.reserve(destination_path)
+            try:
+                return path, create(path)
+            except FileExistsError:
+                continue
+            except BaseException:
+                self.release(path)
+                raise
+        raise FileExistsError(errno.EEXIST, "Tidak ada nama unik yang tersedia", destination_path)
@@ -0,0 +1,94 @@
+import time
+
+# Bobot setiap tahap pada progress bar: (awal, lebar) dalam persen
+STAGE_RANGES = {
+    "reading": (0, 40),
+    "processing": (40, 40),
+    "finalizing": (80, 20),
+}
+# Bila preflight berjalan (mode Rename Saja), preflight sudah mengekstrak semua file sehingga
+# tahap membaca setelahnya hampir instan; slot membaca dibagi dan sebagian besar untuk preflight
+PREFLIGHT_STAGE_RANGES = dict(STAGE_RANGES, preflight=(0, 30), reading=(30, 10))
+
+
+class ProgressSample:
+    """Keadaan progress pada satu waktu, siap ditampilkan di GUI."""
+
+    __slots__ = ("stage", "current", "total", "percentage", "rate", "eta")
+
+    def __init__(self, stage, current, total, percentage, rate, eta):
+        self.stage = stage
+        self.current = current
+        self.total = total
+        self.percentage = percentage
+        self.rate = rate
+        self.eta = eta
+
+
+class ProgressTracker:
+    """Penampung progress yang diperbarui thread pemrosesan dan dibaca GUI secara berkala.
+
+    update() hanya menyimpan satu tuple (penugasan atribut atomik di CPython), tanpa lock,
+    log, atau penjadwalan event Tk, sehingga aman dipanggil untuk setiap file. GUI memanggil
+    sample() dengan frame rate tetap untuk menghitung persentase, kecepatan, dan ETA.
+    """
+
+    def __init__(self):
+        self._state = None
+        self._version = 0
+        self._with_preflight = False
+
+    def reset(self):
+        self._state = None
+        self._with_preflight = False
+        self._version += 1
+
+    def update(self, stage, current, total_files, total_to_merge, total_to_finalize):
+        """Callback progress (signature sama dengan progress_callback processor)."""
+        state = self._state
+        now = time.monotonic()
+        # Waktu mulai tahap dipakai untuk menghitung kecepatan per tahap
+        stage_started = state[5] if state is not None and state[0] == stage else now
+        if stage == "preflight":
+            self._with_preflight = True
+        self._state = (stage, current, total_files, total_to_merge, total_to_finalize, stage_started)
+        self._version += 1
+
+    @property
+    def version(self):
+        """Bertambah setiap kali ada update; GUI bisa melewati frame jika tidak ada perubahan."""
+        return self._version
+
+    def sample(self):
+        """Return ProgressSample untuk keadaan terakhir, atau None jika belum ada update."""
+        state = self._state
+        if state is None:
+            return None
+        stage, current, total_files, total_to_merge, total_to_finalize, stage_started = state
+        total = {"preflight": total_files, "reading": total_files, "processing": total_to_merge}.get(stage, total_to_finalize)
+
+        stage_ranges = PREFLIGHT_STAGE_RANGES if self._with_preflight else STAGE_RANGES
+        start, width = stage_ranges.get(stage, stage_ranges["finalizing"])
+        if stage == "finalizing" and total_to_finalize <= 0:
+            percentage = 100.0
+        else:
+            percentage = start + (current / max(total, 1)) * width
+        percentage = min(max(percentage, 0.0), 100.0)
+
+        elapsed = time.monotonic() - stage_started
+        rate = current / elapsed if elapsed > 0 and current > 0 else 0.0
+        eta = (total - current) / rate if rate > 0 and total > current else None
+        return ProgressSample(stage, current, total, percentage, rate, eta)
+
+
+def format_progress_detail(sample):
+    """Teks kecepatan dan ETA untuk label progress, mis. "Membaca 120/500 · 35.2 file/s · ETA 00:11"."""
+    labels = {"preflight": "Memeriksa", "reading": "Membaca", "processing": "Menggabungkan", "finalizing": "Finalisasi"}
+    parts = [f"{labels.get(sample.stage, sample.stage)} {sample.current}/{sample.total}"]
+    if sample.rate > 0:
+        parts.append(f"{sample.rate:.1f} file/s")
+    if sample.eta is not None:
+        minutes, seconds = divmod(int(sample.eta + 0.5), 60)
+        hours, minutes = divmod(minutes, 60)
+        parts.append(f"ETA {hours:d}:{minutes:02d}:{seconds:02d}" if hours else f"ETA {minutes:02d}:{seconds:02d}")
+    return " · ".join(parts)
@@ -0,0 +1,62 @@
+from collections.abc import Mapping
+
+
+def _freeze(value):
+    """Ambil nilai aktual dari variabel Tk (BooleanVar, StringVar, ...) dan bekukan list/dict."""
+    if hasattr(value, 'get') and not isinstance(value, (dict, Mapping)):
+        value = value.get()
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (dict, Mapping)):
+        return RunConfig(value)
+    return value
+
+
+class RunConfig(Mapping):
+    """Snapshot pengaturan yang dibekukan saat proses dimulai.
+
+    Semua variabel Tk dibaca sekali di main thread, sehingga thread pemrosesan dan worker
+    process tidak pernah memanggil Tcl. Objek tidak bisa diubah (gunakan replace()) dan bisa
+    di-pickle. Antarmukanya sama dengan dict (get, [], in), jadi bisa dipakai sebagai settings.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values=None):
+        object.__setattr__(self, "_values", {key: _freeze(value) for key, value in dict(values or {}).items()})
+
+    @classmethod
+    def from_settings(cls, settings, **overrides):
+        """Buat snapshot dari dict settings GUI; RunConfig yang sudah ada dikembalikan apa adanya."""
+        if isinstance(settings, cls) and not overrides:
+            return settings
+        values = dict(settings or {})
+        values.update(overrides)
+        return cls(values)
+
+    def replace(self, **changes):
+        """Return RunConfig baru dengan beberapa nilai diganti."""
+        values = dict(self._values)
+        values.update(changes)
+        return RunConfig(values)
+
+    def enabled(self, key, default=False):
+        return bool(self._values.get(key, default))
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RunConfig tidak bisa diubah, gunakan replace()")
+
+    def __reduce__(self):
+        return (RunConfig, (self._values,))
+
+    def __repr__(self):
+        return f"RunConfig({self._values!r})"
@@ -17,6 +17,23 @@ class SettingsManager:
             "use_reference": True,
             "use_faktur": True,
             "wrap_reference": False,
+            "first_page_only": True,
+            "extraction_workers": 0,
+            "use_extraction_cache": True,
+            "extraction_backends": ["pdfplumber"],
+            "strict_validation": True,
+            "merge_memory_budget_mb": 256,
+            "merge_workers": 0,
+            "merge_append": False,
+            "merge_optimize": True,
+            "merge_max_pages": 0,
+            "merge_max_mb": 0,
+            "output_strategy": "copy",
+            "log_path": "log.txt",
+            "log_level": "INFO",
+            # Mode rencana: "off", "plan" (tulis rencana tanpa memproses file), atau "apply" (jalankan rencana)
+            "plan_mode": "off",
+            "plan_path": "",
             "separator": "-",
             "slash_replacement": "_",
             "component_order": [
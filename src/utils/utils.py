@@ -1,21 +1,154 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
 from datetime import datetime
+from multiprocessing import util as multiprocessing_util
 from colorama import Fore, Style, init
+from src.utils.log_writer import LogWriter, resolve_application_path, DEFAULT_MAX_LOG_BYTES, DEFAULT_LOG_BACKUPS
 
 init(autoreset=True)
 LOG_FILE = "log.txt"
 
-def log_message(message, color=Fore.WHITE, include_timestamp=True, log_callback=None):
-    """Mencetak pesan ke terminal, menyimpannya ke log file, dan mengirimkan ke GUI jika ada callback."""
+# Level log; pesan di bawah level yang aktif dibuang sebelum diformat
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LOG_LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+_log_level = INFO
+_log_path = resolve_application_path(LOG_FILE)
+_log_max_bytes = DEFAULT_MAX_LOG_BYTES
+_log_backups = DEFAULT_LOG_BACKUPS
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+# Worker process tidak memakai thread LogWriter; baris log dikumpulkan lalu ditulis sekaligus
+WORKER_FLUSH_LINES = 50
+WORKER_FLUSH_INTERVAL = 1.0
+_worker_buffer = []
+_worker_last_flush = 0.0
+_worker_finalizer_pid = None
+
+
+def configure_logging(log_path=None, level=None, max_bytes=None, backup_count=None):
+    """Atur path file log (relatif terhadap folder aplikasi), level minimum, dan rotasi.
+
+    level boleh berupa nama ("DEBUG", "INFO", ...) atau angka. Pesan yang sudah diantrekan
+    ditulis ke file lama sebelum pengaturan baru berlaku.
+    """
+    global _log_level, _log_path, _log_max_bytes, _log_backups, _writer
+    with _writer_lock:
+        if _worker_buffer:
+            _flush_worker_buffer()
+        if level is not None:
+            _log_level = LOG_LEVELS.get(str(level).upper(), INFO) if isinstance(level, str) else int(level)
+        if log_path:
+            _log_path = resolve_application_path(log_path)
+        if max_bytes is not None:
+            _log_max_bytes = max_bytes
+        if backup_count is not None:
+            _log_backups = backup_count
+        if _writer is not None and _writer_pid == os.getpid():
+            _writer.close()
+        _writer = None
+
+
+def logging_config():
+    """Pengaturan logging aktif (log_path, level, max_bytes, backup_count) untuk diteruskan ke worker process."""
+    return _log_path, _log_level, _log_max_bytes, _log_backups
+
+
+def init_worker_logging(config):
+    """Initializer ProcessPoolExecutor: terapkan pengaturan logging proses utama di worker.
+
+    Worker dengan start method spawn mengimpor ulang modul ini sehingga tanpa initializer
+    memakai log_path dan level default, bukan hasil configure_logging di proses utama.
+    """
+    configure_logging(*config)
+
+
+def flush_logs():
+    """Tulis semua pesan yang masih di antrean ke file log."""
+    writer = _writer
+    if writer is not None and _writer_pid == os.getpid():
+        writer.flush()
+    if _worker_buffer:
+        _flush_worker_buffer()
+
+
+def _write_directly(console_line, log_entry):
+    """Penulisan untuk worker process tanpa thread writer: file dibuka sekali per kumpulan baris, bukan per pesan.
+
+    Buffer ditulis saat berisi WORKER_FLUSH_LINES baris, jika flush terakhir sudah lebih dari
+    WORKER_FLUSH_INTERVAL detik, dan saat worker berhenti. Worker diakhiri tanpa atexit, sehingga
+    flush terakhir didaftarkan sebagai finalizer multiprocessing.
+    """
+    global _worker_finalizer_pid
+    print(console_line)
+    if _worker_finalizer_pid != os.getpid():
+        multiprocessing_util.Finalize(None, _flush_worker_buffer, exitpriority=10)
+        _worker_finalizer_pid = os.getpid()
+    _worker_buffer.append(log_entry + "\n")
+    if len(_worker_buffer) >= WORKER_FLUSH_LINES or time.monotonic() - _worker_last_flush >= WORKER_FLUSH_INTERVAL:
+        _flush_worker_buffer()
+
+
+def _flush_worker_buffer():
+    global _worker_last_flush
+    _worker_last_flush = time.monotonic()
+    if not _worker_buffer:
+        return
+    lines = "".join(_worker_buffer)
+    _worker_buffer.clear()
+    try:
+        with open(_log_path, "a", encoding="utf-8") as log_file:
+            log_file.write(lines)
+    except OSError:
+        # File log tidak bisa dibuka (dikunci/folder hilang); baris tetap sudah dicetak ke terminal
+        pass
+
+
+def _get_writer():
+    global _writer, _writer_pid
+    # Proses anak hasil fork tidak mewarisi thread writer, jadi writer dibuat ulang per proses
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                _writer = LogWriter(_log_path, _log_max_bytes, _log_backups)
+                _writer_pid = os.getpid()
+    return _writer
+
+
+def _shutdown_logging():
+    writer = _writer
+    if writer is not None and _writer_pid == os.getpid():
+        writer.close()
+
+
+atexit.register(_shutdown_logging)
+
+
+def log_message(message, color=Fore.WHITE, include_timestamp=True, log_callback=None, level=INFO):
+    """Mencetak pesan ke terminal, menyimpannya ke log file, dan mengirimkan ke GUI jika ada callback.
+
+    Terminal dan file ditangani LogWriter di background thread; pesan dengan level di bawah
+    level aktif (lihat configure_logging) langsung diabaikan.
+    """
+    if level < _log_level:
+        return
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_entry = f"[{timestamp}] {message}" if include_timestamp else message
-    
-    # Cetak ke terminal
-    print(f"{color}{log_entry}")
-    
-    # Simpan ke file log
-    with open(LOG_FILE, "a", encoding="utf-8") as log_file:
-        log_file.write(log_entry + "\n")
-    
+
+    # Cetak ke terminal dan simpan ke file log (asinkron kecuali di worker process)
+    if multiprocessing.parent_process() is not None:
+        _write_directly(f"{color}{log_entry}", log_entry)
+    else:
+        _get_writer().write(f"{color}{log_entry}", log_entry)
+
     # Kirim ke GUI melalui callback jika ada
     if log_callback:
-        log_callback(log_entry)
\ No newline at end of file
+        log_callback(log_entry)
@@ -0,0 +1,19 @@
+# Pastikan paket src dapat diimpor saat pytest dijalankan dari root repository
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.utils.utils import configure_logging, flush_logs
+
+
+@pytest.fixture(autouse=True, scope="session")
+def log_to_temp_directory(tmp_path_factory):
+    """Log selama test ditulis ke folder sementara, bukan log.txt di folder aplikasi."""
+    configure_logging(str(tmp_path_factory.mktemp("logs") / "log.txt"))
+    yield
+    flush_logs()
@@ -0,0 +1,86 @@
+# Pembuat PDF kecil untuk test: teks Helvetica per halaman tanpa dependensi tambahan
+import os
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages, padding=0, logo=0):
+    """Byte PDF; pages berisi daftar baris per halaman, baris berupa teks atau (x relatif, top relatif, teks).
+
+    padding menambahkan komentar sebesar itu di setiap content stream untuk memperbesar file.
+    logo menambahkan XObject form sebesar itu (isi sama di setiap file) yang digambar di setiap
+    halaman, seperti logo dan font yang tertanam di setiap faktur Coretax.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    resources = "/Font << /F1 3 0 R >>"
+    if logo:
+        stream = "0 0 m 10 10 l S\n%" + "logo" * (logo // 4)
+        objects.append(f"<< /Type /XObject /Subtype /Form /BBox [0 0 10 10] /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        resources += f" /XObject << /Logo {len(objects)} 0 R >>"
+    kids = []
+    for lines in pages:
+        content = ["BT /F1 8 Tf"]
+        for index, line in enumerate(lines):
+            x, top, text = line if isinstance(line, tuple) else (0.07, 0.05 + index * 0.015, line)
+            content.append(f"1 0 0 1 {x * PAGE_WIDTH:.1f} {(1 - top) * PAGE_HEIGHT:.1f} Tm ({_escape(text)}) Tj")
+        content.append("ET")
+        if logo:
+            content.append("/Logo Do")
+        if padding:
+            content.append("%" + "x" * padding)
+        stream = "\n".join(content)
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}]"
+            f" /Resources << {resources} >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return data
+
+
+def faktur_lines(name="PT ALPHA SATU", nomor="04002500000001", tanggal="12 Januari 2025", reference="INV/2025/001",
+                 id_tku="1234567890123456789012"):
+    """Baris teks satu halaman faktur seperti hasil Coretax (urutan blok yang sama)."""
+    return [
+        "Faktur Pajak",
+        f"Kode dan Nomor Seri Faktur Pajak: {nomor}",
+        "Pengusaha Kena Pajak:",
+        "Nama : PT PENJUAL JAYA",
+        "Alamat : JL MERDEKA 1",
+        "NPWP : 0012345678901234",
+        "Pembeli Barang Kena Pajak / Penerima Jasa Kena Pajak:",
+        f"Nama : {name}",
+        "Alamat : JL SUDIRMAN 2",
+        "NPWP : 0098765432109876",
+        f"# {id_tku}",
+        "Harga Jual 1.000.000,00",
+        f"JAKARTA, {tanggal}",
+        f"Referensi: {reference}",
+        "",
+        "Ditandatangani secara elektronik",
+    ]
+
+
+def write_faktur(folder, filename, extra_pages=0, padding=0, logo=0, **fields):
+    """Tulis PDF faktur ke folder/filename dan return path-nya."""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, filename)
+    pages = [faktur_lines(**fields)] + [["Lampiran"]] * extra_pages
+    with open(path, "wb") as pdf_file:
+        pdf_file.write(make_pdf(pages, padding, logo))
+    return path
@@ -0,0 +1,81 @@
+import os
+from types import SimpleNamespace
+
+from src.pdf import extraction_cache
+from src.pdf.extraction_cache import ExtractionCache
+
+INFO = ("1234567890123456789012", "Pt Alpha", "0400", "12-01-2025", "INV-1")
+VARIANT = "test"
+
+
+def scandir_stat(path):
+    """Stat seperti DirEntry.stat() di Windows: st_ino selalu 0."""
+    stat_result = os.stat(path)
+    return SimpleNamespace(st_size=stat_result.st_size, st_mtime_ns=stat_result.st_mtime_ns, st_ino=0)
+
+
+def test_key_matches_between_scandir_and_os_stat(tmp_path):
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 a")
+    with ExtractionCache(str(tmp_path / "cache.db")) as cache:
+        cache.put(str(pdf_path), VARIANT, INFO, scandir_stat(str(pdf_path)))
+        assert cache.get(str(pdf_path), VARIANT) == INFO
+        assert cache.get(str(pdf_path), VARIANT, scandir_stat(str(pdf_path))) == INFO
+
+
+def test_changed_file_replaces_entry(tmp_path):
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 a")
+    with ExtractionCache(str(tmp_path / "cache.db")) as cache:
+        cache.put(str(pdf_path), VARIANT, INFO)
+        pdf_path.write_bytes(b"%PDF-1.4 changed")
+        assert cache.get(str(pdf_path), VARIANT) is None
+        cache.put(str(pdf_path), VARIANT, INFO)
+        count = cache._connection.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+    assert count == 1
+
+
+def test_prune_drops_least_recently_used(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "cache.db")
+    paths = []
+    for index in range(4):
+        pdf_path = tmp_path / f"{index}.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+        paths.append(str(pdf_path))
+
+    clock = [1000]
+    monkeypatch.setattr(extraction_cache.time, "time", lambda: clock[0])
+    with ExtractionCache(cache_file, max_entries=0) as cache:
+        for path in paths:
+            clock[0] += 1
+            cache.put(path, VARIANT, INFO)
+    # File pertama dipakai lagi sehingga bukan yang paling lama tidak dipakai
+    clock[0] += 1
+    with ExtractionCache(cache_file, max_entries=0) as cache:
+        assert cache.get(paths[0], VARIANT) == INFO
+
+    with ExtractionCache(cache_file, max_entries=2) as cache:
+        kept = [path for path in paths if cache.get(path, VARIANT) is not None]
+    assert kept == [paths[0], paths[3]]
+
+
+def test_relative_cache_file_resolves_to_application_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.utils.log_writer.application_directory", lambda: str(tmp_path))
+    monkeypatch.chdir(os.path.dirname(str(tmp_path)))
+    with ExtractionCache("cache.db") as cache:
+        assert cache.cache_file == os.path.join(str(tmp_path), "cache.db")
+    assert os.path.exists(tmp_path / "cache.db")
+
+
+def test_old_schema_is_replaced(tmp_path):
+    import sqlite3
+    cache_file = str(tmp_path / "cache.db")
+    connection = sqlite3.connect(cache_file)
+    connection.execute("CREATE TABLE extraction_cache (path TEXT, size INTEGER, mtime_ns INTEGER, inode INTEGER)")
+    connection.commit()
+    connection.close()
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 a")
+    with ExtractionCache(cache_file) as cache:
+        cache.put(str(pdf_path), VARIANT, INFO)
+        assert cache.get(str(pdf_path), VARIANT) == INFO
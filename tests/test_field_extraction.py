@@ -0,0 +1,206 @@
+import random
+import re
+import time
+
+import pytest
+
+from src.pdf.field_extraction import FIELD_SPECS, REFERENCE_WINDOW, FieldExtractor, find_reference
+
+# Oracle: ekstraksi versi lama (satu regex per field atas seluruh teks), disalin apa adanya
+# sebagai pembanding untuk engine FieldSpec/find_reference.
+OLD_FLAGS = re.MULTILINE | re.DOTALL
+OLD_REFERENCE_PATTERNS = [
+    re.compile(r'Referensi:\s*([^}]*?)(?:\n\s*\n|\n\s*[A-Z][^:]*:|$)', OLD_FLAGS),
+    re.compile(r'Referensi:\s*([^}]*?)(?:\n\s*Pembeli|$)', OLD_FLAGS),
+    re.compile(r'Referensi:\s*(.*?)(?:\n\s*(?:[A-Z][^:]*:|$))', OLD_FLAGS),
+]
+OLD_MONTHS = {
+    "Januari": "01", "Februari": "02", "Maret": "03", "April": "04", "Mei": "05", "Juni": "06",
+    "Juli": "07", "Agustus": "08", "September": "09", "Oktober": "10", "November": "11", "Desember": "12"
+}
+
+
+def old_reference(text):
+    for pattern in OLD_REFERENCE_PATTERNS:
+        match = pattern.search(text)
+        if match and match.group(1).strip():
+            return match.group(1).strip()
+    return None
+
+
+def old_extract_info(text):
+    partner_match = re.search(r'Pembeli Barang Kena Pajak\s*/\s*Penerima Jasa Kena Pajak:\s*Nama\s*:\s*(.+?)\s*Alamat', text, re.DOTALL)
+    partner_name = partner_match.group(1).strip().title() if partner_match else "Nama tidak ditemukan"
+    id_tku_match = re.search(r'#?(\d{22})', text)
+    id_tku = id_tku_match.group(1).strip() if id_tku_match else "IDTKU_Tidak_Ditemukan"
+    date_match = re.search(r'(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})', text)
+    date = f"{date_match.group(1)}-{OLD_MONTHS.get(date_match.group(2), '00')}-{date_match.group(3)}" if date_match else "Tanggal tidak ditemukan"
+    faktur_match = re.search(r'Faktur Pajak:\s*([\w\d\-/.]{1,50}?)(?:\s|$|\n)', text, re.IGNORECASE)
+    faktur_number = faktur_match.group(1).strip() if faktur_match else "NoFaktur"
+    faktur_number = re.sub(r'\s+', ' ', re.sub(r'[\x00-\x1f\x7f-\x9f]', '', faktur_number)).strip()[:50].strip() or "NoFaktur"
+    reference = old_reference(text) or ""
+    if reference:
+        reference = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', reference)
+        reference = re.sub(r'[\n\r\t]+', ' ', reference)
+        reference = re.sub(r'\s+', ' ', reference).strip()
+        reference = re.sub(r'[<>:"\\|?*()]', ' ', reference)
+        reference = re.sub(r'[)\]\}]+$', '', reference).strip()
+        reference = re.sub(r'\s+', ' ', reference).strip()
+        reference = reference[:200].strip()
+    return id_tku, partner_name, faktur_number, date, reference
+
+
+def faktur_text(name="PT ALPHA SATU", nomor="04002500000001", tanggal="12 Januari 2025",
+                reference_lines=("INV/2025/001",), id_tku="1234567890123456789012", item_lines=1, footer=True):
+    """Teks faktur seperti hasil pdfplumber; reference_lines=None berarti tanpa label Referensi."""
+    lines = [
+        "Faktur Pajak",
+        f"Kode dan Nomor Seri Faktur Pajak: {nomor}",
+        "Pengusaha Kena Pajak:",
+        "Nama : PT PENJUAL JAYA",
+        "Alamat : JL MERDEKA 1",
+        "NPWP : 0012345678901234",
+        "Pembeli Barang Kena Pajak / Penerima Jasa Kena Pajak:",
+        f"Nama : {name}",
+        "Alamat : JL SUDIRMAN 2",
+        "NPWP : 0098765432109876",
+        f"# {id_tku}",
+        "No. Kode Barang Nama Barang Harga",
+    ]
+    lines += [f"{index} 000000 barang {index} 1.000.000,00" for index in range(1, item_lines + 1)]
+    lines += ["Harga Jual 1.000.000,00", f"JAKARTA, {tanggal}"]
+    if reference_lines is not None:
+        lines.append("Referensi: " + "\n".join(reference_lines))
+    if footer:
+        lines += ["", "Ditandatangani secara elektronik"]
+    return "\n".join(lines) + "\n"
+
+
+# Korpus regresi: faktur dengan variasi Referensi yang pernah ditemui
+CORPUS = [
+    faktur_text(),
+    faktur_text(reference_lines=("PO-77 (urgent)",)),
+    faktur_text(reference_lines=("INV: 2025/03 \"A|B\"",)),
+    faktur_text(reference_lines=("",)),
+    faktur_text(reference_lines=None),
+    faktur_text(reference_lines=("SO-1 }", "lanjutan 2")),
+    faktur_text(reference_lines=("SO-2 {x}", "123 baris kedua", "Catatan")),
+    faktur_text(reference_lines=("SO-3 }", "Catatan tanpa titik dua"), footer=False),
+    faktur_text(reference_lines=("SO-4 }",), footer=False),
+    faktur_text(reference_lines=("x" * 300,)),
+    faktur_text(name="cv beta abadi", nomor="040.025-00.00000003", tanggal="3 Mei 2024"),
+    faktur_text(tanggal="31 Desember 2025", item_lines=40),
+    faktur_text(tanggal="7 Bulan 2025"),
+    faktur_text(id_tku="12345"),
+    "Referensi: INV-9\n",
+    "",
+]
+
+
+def extract(text):
+    extractor = FieldExtractor()
+    extractor.update(text)
+    return extractor.result()
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_corpus_matches_old_extraction(text):
+    assert extract(text) == old_extract_info(text)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_incremental_update_matches_full_text(text):
+    # Teks diberikan per "halaman" (per beberapa baris) seperti saat membaca PDF multi-halaman
+    lines = text.splitlines(keepends=True)
+    extractor = FieldExtractor()
+    accumulated = ""
+    for start in range(0, len(lines), 3):
+        accumulated += "".join(lines[start:start + 3])
+        extractor.update(accumulated)
+    assert extractor.result() == extract(text)
+
+
+def test_incremental_update_finds_field_split_across_pages():
+    pages = ["x\n" * 3000 + "Pembeli Barang Kena Pajak / Penerima Jasa Kena Pajak:\n", "Nama : PT GAMMA\nAlamat : JL 3\n"]
+    extractor = FieldExtractor()
+    extractor.update(pages[0])
+    extractor.update(pages[0] + pages[1])
+    assert extractor.values["partner_name"] == "Pt Gamma"
+
+
+def test_reference_same_line_matches_old_regex():
+    # Nilai di baris yang sama dengan label: hasil harus identik dengan regex lama
+    pieces = ["\n", "\n\n", "  ", "}", "{", "INV/001", "PO-7 }", "Harga Jual:", "Pembeli", "abc", "X",
+              "x:", ":", "Nama : PT A", "\t", "item 1 }", "Total", "Referensi: INV-2"]
+    rng = random.Random(8)
+    for _ in range(20000):
+        text = "Referensi: " + rng.choice(["INV/001", "PO-7 }", "X }", "{a}"]) + "".join(
+            rng.choice(pieces) for _ in range(rng.randint(0, 12))
+        )
+        assert (find_reference(text) or None) == old_reference(text), repr(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Baris berawalan huruf besar menghentikan lanjutan jika ada ':' di mana pun setelahnya
+    ("Referensi: PO }\nLanjutan\nCatatan tanpa titik dua\nTotal: 5", "PO }"),
+    ("Referensi: PO }\n123 lanjutan\nCatatan\nTotal: 5", "PO }\n123 lanjutan"),
+    # Tanpa ':' setelahnya, baris berhuruf besar tetap ikut sampai baris kosong
+    ("Referensi: PO }\nLanjutan\n\nx", "PO }\nLanjutan"),
+    # Tanpa baris kosong maupun label penutup, pola lama tidak menghasilkan nilai
+    ("Referensi: PO }\nLanjutan\nCatatan", None),
+])
+def test_reference_continuation_stop_rule(text, expected):
+    assert old_reference(text) == expected
+    assert (find_reference(text) or None) == expected
+
+
+def test_reference_prefers_clean_label_over_old_backtracking_quirk():
+    # Penyimpangan yang disengaja: jika baris label kosong, regex lama mengambil baris '}' berikutnya
+    # karena pola utama menghasilkan kecocokan kosong lalu dilewati. find_reference memakai label
+    # lain yang nilainya bersih.
+    text = "Referensi: \nPO-7 }\nReferensi: INV-1\n"
+    assert old_reference(text) == "PO-7 }"
+    assert find_reference(text) == "INV-1"
+
+
+def test_reference_worst_case_is_linear():
+    # Referensi dengan '}' diikuti ribuan baris item tanpa label: regex lama backtracking ke akhir dokumen
+    text = faktur_text(reference_lines=("SO-9 }",) + tuple(f"item {index} lanjutan" for index in range(5000)), footer=False)
+    text += ("Referensi: }\n" + "baris tanpa label\n" * 20) * 200
+    started = time.perf_counter()
+    for _ in range(10):
+        value = find_reference(text)
+    elapsed = (time.perf_counter() - started) / 10
+    assert value is not None and len(value) <= REFERENCE_WINDOW
+    assert elapsed < 0.2
+
+
+def test_field_specs_order_matches_result_tuple():
+    assert [spec.name for spec in FIELD_SPECS] == ["id_tku", "partner_name", "faktur_number", "date", "reference"]
+
+
+def _consumed_pages(pages):
+    consumed = []
+
+    def page_texts():
+        for page in pages:
+            consumed.append(page)
+            yield page
+
+    return consumed, page_texts()
+
+
+def test_early_stop_when_reference_label_seen_with_empty_value():
+    from src.pdf.pdf_utils import extract_info_from_page_texts
+    consumed, page_texts = _consumed_pages([faktur_text(reference_lines=("",), footer=False), "Lampiran\n"])
+    info = extract_info_from_page_texts(page_texts)
+    assert len(consumed) == 1
+    assert info[4] == ""
+
+
+def test_no_early_stop_before_reference_label_seen():
+    from src.pdf.pdf_utils import extract_info_from_page_texts
+    consumed, page_texts = _consumed_pages([faktur_text(reference_lines=None, footer=False), "Referensi: INV-2\n"])
+    info = extract_info_from_page_texts(page_texts)
+    assert len(consumed) == 2
+    assert info[4] == "INV-2"
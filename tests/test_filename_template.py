@@ -0,0 +1,121 @@
+import pytest
+
+from pdf_factory import write_faktur
+from src.pdf.filename_template import DATE, DEFAULT_MAX_FILENAME_LENGTH, FAKTUR, NAME, REFERENCE, FilenameTemplate
+from src.pdf.pdf_utils import generate_filename
+from src.utils.filename_checker import check_long_filenames
+
+PARTNER = "Pt Alpha Satu"
+FAKTUR_NUMBER = "04002500000001"
+DATE_VALUE = "01-02-2025"
+
+
+def make_template(order=(NAME, DATE, REFERENCE, FAKTUR), **kwargs):
+    return FilenameTemplate(list(order), enabled_components=order, **kwargs)
+
+
+def test_short_name_follows_component_order():
+    template = make_template((FAKTUR, REFERENCE, NAME), separator="_")
+    assert template(PARTNER, FAKTUR_NUMBER, DATE_VALUE, "INV/01") == f"{FAKTUR_NUMBER}_INV_01_{PARTNER}.pdf"
+    assert template(PARTNER, "NoFaktur", DATE_VALUE, "") == f"NoRef_{PARTNER}.pdf"
+    assert FilenameTemplate([NAME], enabled_components=())(PARTNER, FAKTUR_NUMBER, DATE_VALUE, "") == "unnamed.pdf"
+
+
+def test_wrap_reference_and_slash_replacement():
+    template = make_template((NAME, REFERENCE), slash_replacement="~", wrap_reference=True)
+    assert template(PARTNER, FAKTUR_NUMBER, DATE_VALUE, "INV/01") == f"{PARTNER}-(INV~01).pdf"
+    assert template(PARTNER, FAKTUR_NUMBER, DATE_VALUE, "") == f"{PARTNER}-NoRef.pdf"
+
+
+def test_invalid_separator_raises():
+    with pytest.raises(ValueError):
+        FilenameTemplate(separator="/")
+    with pytest.raises(ValueError):
+        FilenameTemplate(slash_replacement=":")
+
+
+def test_long_reference_is_shortened_first():
+    reference = "R" * 200
+    template = make_template()
+    filename = template(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference)
+    assert len(filename) <= DEFAULT_MAX_FILENAME_LENGTH
+    assert filename.startswith(f"{PARTNER}-{DATE_VALUE}-{{RRR")
+    assert filename.endswith(f"...}} {FAKTUR_NUMBER}.pdf")
+    assert template.full_name(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference) == f"{PARTNER}-{DATE_VALUE}-{reference}-{FAKTUR_NUMBER}.pdf"
+
+
+@pytest.mark.parametrize("order", [
+    (FAKTUR, REFERENCE, DATE, NAME),
+    (REFERENCE, NAME, FAKTUR, DATE),
+    (DATE, FAKTUR, NAME, REFERENCE),
+])
+def test_truncation_uses_roles_not_positions(order):
+    # Referensi yang mirip tanggal dan nomor faktur tetap diperlakukan sebagai referensi
+    reference = "31-12-2024 " + "9" * 150
+    filename = make_template(order)(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference)
+    assert len(filename) <= DEFAULT_MAX_FILENAME_LENGTH
+    assert filename.startswith(f"{PARTNER}-{DATE_VALUE}-{{31-12-2024 999")
+    assert filename.endswith(f"...}} {FAKTUR_NUMBER}.pdf")
+
+
+def test_reference_dropped_when_no_room_left():
+    partner = "Pt " + "Panjang " * 14
+    filename = make_template()(partner, FAKTUR_NUMBER, DATE_VALUE, "INV/2025/001")
+    assert filename == f"{partner}-{DATE_VALUE} {FAKTUR_NUMBER}.pdf"
+
+
+def test_truncation_without_date_or_faktur():
+    filename = make_template((REFERENCE, NAME))(PARTNER, FAKTUR_NUMBER, DATE_VALUE, "R" * 200)
+    assert filename.startswith(f"{PARTNER}-{{RRR")
+    assert filename.endswith("...}.pdf")
+    assert len(filename) <= DEFAULT_MAX_FILENAME_LENGTH
+
+
+def test_single_component_is_cut_to_max_length():
+    filename = make_template((REFERENCE,), max_length=40)(PARTNER, FAKTUR_NUMBER, DATE_VALUE, "R" * 100)
+    assert filename == "R" * 33 + "....pdf"
+    assert len(filename) == 40
+
+
+def test_with_max_length_copies_template():
+    template = make_template(separator="_")
+    longer = template.with_max_length(250)
+    reference = "R" * 150
+    assert longer.max_length == 250
+    assert template.max_length == DEFAULT_MAX_FILENAME_LENGTH
+    assert longer(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference) == longer.full_name(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference)
+    assert template(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference) != longer(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference)
+    assert (longer.roles, longer.separator) == (template.roles, template.separator)
+    assert longer.with_max_length(None).max_length == DEFAULT_MAX_FILENAME_LENGTH
+
+
+@pytest.mark.parametrize("reference", ["INV/01", "", "R" * 200])
+def test_generate_filename_matches_compiled_template(reference):
+    settings = {"use_name": True, "use_date": False, "use_reference": True, "use_faktur": True, "wrap_reference": True}
+    order = [FAKTUR, NAME, DATE, REFERENCE]
+    template = FilenameTemplate.from_config(dict(settings, component_order=order, separator="_", max_filename_length=100))
+    assert generate_filename(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference, settings, order, "_", max_length=100) == \
+        template(PARTNER, FAKTUR_NUMBER, DATE_VALUE, reference)
+
+
+def test_check_long_filenames_reports_untruncated_name(tmp_path):
+    input_directory = tmp_path / "input"
+    input_directory.mkdir()
+    write_faktur(input_directory, "panjang.pdf", reference="R" * 200)
+    write_faktur(input_directory, "pendek.pdf", nomor="04002500000002")
+    settings = {
+        "use_name": True, "use_date": True, "use_reference": True, "use_faktur": True,
+        "use_extraction_cache": False, "extraction_workers": 1,
+    }
+    template = FilenameTemplate.from_config(settings)
+    results = {}
+    has_long, long_filenames, samples = check_long_filenames(str(input_directory), settings, filename_template=template, results=results)
+
+    assert has_long
+    assert [entry["original_file"] for entry in long_filenames] == ["panjang.pdf"]
+    info = results[str(input_directory / "panjang.pdf")][1]
+    assert long_filenames[0]["generated_filename"] == template.full_name(*info[1:])
+    assert long_filenames[0]["length"] > 150
+    # Nama final untuk file yang sama dipotong sampai batas template
+    assert len(template(*info[1:])) <= template.max_length
+    assert len(samples) == 2
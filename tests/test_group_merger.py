@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_factory import write_faktur
+from src.pdf.group_merger import MergeJob, iter_merged_groups, merge_group_files
+from src.pdf.pdf_document import PDFDocument
+
+
+def make_jobs(folder, output_folder, loaded=True):
+    """Empat grup: dua file, satu file, satu file rusak di tengah grup, dan grup tanpa dokumen."""
+    def document(name, **fields):
+        path = write_faktur(folder, name, **fields)
+        document = PDFDocument(path)
+        if loaded:
+            document.data
+        return document
+
+    os.makedirs(folder, exist_ok=True)
+    bad_path = os.path.join(folder, "rusak.pdf")
+    with open(bad_path, "wb") as bad_file:
+        bad_file.write(b"%PDF-1.4 rusak")
+    return [
+        MergeJob(os.path.join(output_folder, "A.pdf"), [document("a1.pdf", extra_pages=1), document("a2.pdf")]),
+        MergeJob(os.path.join(output_folder, "B.pdf"), [document("b1.pdf", extra_pages=2)]),
+        MergeJob(os.path.join(output_folder, "C.pdf"), [document("c1.pdf"), PDFDocument(bad_path), document("c2.pdf")]),
+        MergeJob(os.path.join(output_folder, "D.pdf"), [], skipped=2),
+    ]
+
+
+def run(jobs, workers, cancel_flag=None):
+    messages = []
+    results = [
+        (os.path.basename(job.output_path), error)
+        for job, error in iter_merged_groups(jobs, workers, cancel_flag, messages.append, len(jobs))
+    ]
+    return results, messages
+
+
+def page_counts(output_folder):
+    return {name: len(PdfReader(os.path.join(output_folder, name)).pages) for name in sorted(os.listdir(output_folder))}
+
+
+@pytest.mark.parametrize("loaded", [True, False])
+def test_parallel_merge_matches_sequential(tmp_path, loaded):
+    outputs = {}
+    for workers in (1, 2):
+        output_folder = str(tmp_path / f"out{workers}")
+        os.makedirs(output_folder)
+        results, messages = run(make_jobs(str(tmp_path / f"in{workers}"), output_folder, loaded), workers)
+        assert [name for name, _ in results] == ["A.pdf", "B.pdf", "C.pdf", "D.pdf"]
+        assert all(error is None for _, error in results)
+        # Pesan worker dikembalikan ke proses utama, termasuk file rusak yang dilewati
+        assert any("rusak.pdf" in message for message in messages)
+        outputs[workers] = page_counts(output_folder)
+    assert outputs[2] == outputs[1] == {"A.pdf": 3, "B.pdf": 3, "C.pdf": 2}
+
+
+def test_failed_group_does_not_stop_others(tmp_path):
+    output_folder = str(tmp_path / "out")
+    os.makedirs(output_folder)
+    jobs = make_jobs(str(tmp_path / "in"), output_folder)
+    # Folder tujuan tidak ada: hanya grup B yang gagal
+    jobs[1].output_path = str(tmp_path / "hilang" / "B.pdf")
+    results, _ = run(jobs, 2)
+    assert [name for name, _ in results] == ["A.pdf", "B.pdf", "C.pdf", "D.pdf"]
+    assert [error is not None for _, error in results] == [False, True, False, False]
+    assert page_counts(output_folder) == {"A.pdf": 3, "C.pdf": 2}
+
+
+def test_documents_are_closed_after_submit(tmp_path):
+    output_folder = str(tmp_path / "out")
+    os.makedirs(output_folder)
+    jobs = make_jobs(str(tmp_path / "in"), output_folder)
+    run(jobs, 2)
+    assert all(document.loaded_size == 0 for job in jobs for document in job.documents)
+
+
+def test_cancel_joins_merge_workers(tmp_path):
+    output_folder = str(tmp_path / "out")
+    os.makedirs(output_folder)
+    cancel_flag = threading.Event()
+    jobs = make_jobs(str(tmp_path / "in"), output_folder) * 3
+    results = []
+    for job, error in iter_merged_groups(jobs, 2, cancel_flag, None, len(jobs)):
+        results.append(job)
+        cancel_flag.set()
+    assert len(results) == 1
+    assert multiprocessing.active_children() == []
+
+
+@pytest.mark.parametrize("loaded", [True, False])
+def test_single_file_group_is_copied_byte_for_byte(tmp_path, loaded):
+    source = write_faktur(str(tmp_path / "in"), "a.pdf", extra_pages=1)
+    document = PDFDocument(source)
+    if loaded:
+        document.data
+    output_path = str(tmp_path / "A.pdf")
+    messages = []
+    merge_group_files([document], output_path, messages.append)
+    with open(source, "rb") as source_file, open(output_path, "rb") as output_file:
+        assert output_file.read() == source_file.read()
+    assert len(messages) == 1
+    assert messages[0].endswith(f"✅ File digabungkan ke {output_path}")
+
+
+def test_single_file_append_still_appends(tmp_path):
+    output_path = write_faktur(str(tmp_path), "A.pdf", nomor="04002500000001")
+    source = write_faktur(str(tmp_path / "in"), "b.pdf", nomor="04002500000002")
+    merge_group_files([source], output_path, append=True)
+    assert len(PdfReader(output_path).pages) == 2
+
+
+def test_multi_file_group_is_rewritten(tmp_path):
+    sources = [write_faktur(str(tmp_path / "in"), f"{index}.pdf") for index in range(2)]
+    output_path = str(tmp_path / "A.pdf")
+    merge_group_files(sources, output_path)
+    assert len(PdfReader(output_path).pages) == 2
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from src.utils import input_manifest
+from src.utils.input_manifest import InputManifest, get_shared_manifest, is_pdf_filename
+
+
+@pytest.fixture
+def input_directory(tmp_path):
+    for name in ("a.pdf", "B.PDF", "c.Pdf", "catatan.txt", "pdf", "d.pdf.bak"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4 " + name.encode())
+    # Folder berakhiran .pdf bukan file PDF
+    (tmp_path / "arsip.pdf").mkdir()
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_manifest(monkeypatch):
+    monkeypatch.setattr(input_manifest, "_shared_manifest", None)
+
+
+def test_is_pdf_filename_ignores_case():
+    assert is_pdf_filename("faktur.PDF")
+    assert is_pdf_filename("faktur.pDf")
+    assert not is_pdf_filename("faktur.pdf.bak")
+    assert not is_pdf_filename("pdf")
+
+
+def test_scan_matches_extension_case_insensitively(input_directory):
+    manifest = InputManifest.scan(str(input_directory))
+    assert sorted(manifest.filenames) == ["B.PDF", "a.pdf", "c.Pdf"]
+    assert len(manifest) == 3
+    for entry in manifest:
+        assert entry.path == os.path.join(str(input_directory), entry.name)
+        assert entry.size == os.path.getsize(entry.path)
+        assert entry.mtime_ns == os.stat(entry.path).st_mtime_ns
+    assert set(manifest.stats_by_path) == set(manifest.pdf_paths)
+
+
+def test_scan_missing_directory_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        InputManifest.scan(str(tmp_path / "hilang"))
+
+
+def test_shared_manifest_is_reused_within_max_age(input_directory, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(input_manifest.time, "time", lambda: clock[0])
+    first = get_shared_manifest(str(input_directory))
+    (input_directory / "baru.pdf").write_bytes(b"%PDF-1.4")
+
+    clock[0] += 1
+    assert get_shared_manifest(str(input_directory)) is first
+    assert len(first) == 3
+
+    clock[0] += 2
+    rescanned = get_shared_manifest(str(input_directory))
+    assert rescanned is not first
+    assert len(rescanned) == 4
+
+
+def test_shared_manifest_rescans_other_directory(input_directory, tmp_path_factory):
+    other = tmp_path_factory.mktemp("lain")
+    (other / "x.pdf").write_bytes(b"%PDF-1.4")
+    first = get_shared_manifest(str(input_directory))
+    second = get_shared_manifest(str(other))
+    assert second is not first
+    assert second.filenames == ["x.pdf"]
+    assert get_shared_manifest(str(input_directory)) is not first
@@ -0,0 +1,58 @@
+import io
+
+import pdfplumber
+
+from pdf_factory import make_pdf
+from src.pdf.layout_profiles import CORETAX_PROFILE
+
+
+def coretax_lines(reference="INV/2025/001", signature=True):
+    lines = [
+        (0.40, 0.05, "Faktur Pajak"),
+        (0.05, 0.08, "Kode dan Nomor Seri Faktur Pajak: 04002500000001"),
+        (0.05, 0.11, "Pengusaha Kena Pajak:"),
+        (0.05, 0.13, "Nama : PT PENJUAL JAYA"),
+        (0.05, 0.15, "NPWP : 0012345678901234 #1234567890123456789012"),
+        (0.05, 0.20, "Pembeli Barang Kena Pajak / Penerima Jasa Kena Pajak:"),
+        (0.05, 0.22, "Nama : PT ALPHA SATU"),
+        (0.05, 0.24, "Alamat : JL SUDIRMAN 2"),
+        # Baris barang dengan pola mirip tanggal di luar area tanggal
+        (0.05, 0.45, "1 Unit 2024 Barang A 1.000.000,00"),
+        (0.05, 0.70, "Referensi: " + reference),
+        (0.60, 0.75, "JAKARTA, 12 Januari 2025"),
+    ]
+    if signature:
+        lines.append((0.60, 0.82, "Ditandatangani secara elektronik"))
+    return lines
+
+
+def extract(lines):
+    with pdfplumber.open(io.BytesIO(make_pdf([lines]))) as pdf:
+        return CORETAX_PROFILE.extract(pdf.pages[0])
+
+
+def test_coretax_profile_extracts_fields():
+    assert extract(coretax_lines()) == (
+        "1234567890123456789012", "Pt Alpha Satu", "04002500000001", "12-01-2025", "INV/2025/001"
+    )
+
+
+def test_empty_reference_does_not_fail_profile():
+    info = extract(coretax_lines(reference=""))
+    assert info is not None
+    assert info[3] == "12-01-2025"
+    assert info[4] == ""
+
+
+def test_missing_date_anchor_falls_back():
+    assert extract(coretax_lines(signature=False)) is None
+
+
+def test_missing_reference_label_falls_back():
+    lines = [line for line in coretax_lines() if not line[2].startswith("Referensi:")]
+    assert extract(lines) is None
+
+
+def test_multiline_reference_falls_back():
+    # Referensi dengan '}' berlanjut ke baris berikutnya; area profil hanya membaca baris anchor
+    assert extract(coretax_lines(reference="SO-1 }")) is None
@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.utils import log_writer, utils
+from src.utils.log_writer import LogWriter
+
+
+def write_lines(writer, lines):
+    for line in lines:
+        writer.write(line, line)
+        writer.flush()
+
+
+def test_rotation_uses_utf8_byte_size(tmp_path):
+    log_path = str(tmp_path / "log.txt")
+    writer = LogWriter(log_path, max_bytes=200, backup_count=2)
+    # Emoji 4 byte per karakter: 30 karakter = lebih dari 100 byte per baris
+    write_lines(writer, ["📄" * 30, "📄" * 30, "📄" * 30])
+    writer.close()
+    assert os.path.exists(f"{log_path}.1")
+    for path in (log_path, f"{log_path}.1"):
+        assert os.path.getsize(path) <= 200
+
+
+def test_failed_rotation_is_retried_on_next_write(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "log.txt")
+    real_replace = os.replace
+    failures = []
+
+    def replace_failing_once(source, destination):
+        if not failures:
+            failures.append(source)
+            raise PermissionError("file dikunci")
+        return real_replace(source, destination)
+
+    monkeypatch.setattr(log_writer.os, "replace", replace_failing_once)
+    writer = LogWriter(log_path, max_bytes=50, backup_count=1)
+    write_lines(writer, ["a" * 40, "b" * 40, "c" * 40])
+    writer.close()
+
+    assert failures
+    # Baris saat rotasi gagal tetap tertulis, dan rotasi berhasil pada penulisan berikutnya
+    with open(f"{log_path}.1", encoding="utf-8") as rotated:
+        assert rotated.read().split() == ["a" * 40, "b" * 40]
+    with open(log_path, encoding="utf-8") as current:
+        assert current.read().split() == ["c" * 40]
+
+
+def test_unwritable_log_is_retried(tmp_path):
+    blocker = tmp_path / "logs"
+    blocker.write_text("bukan folder")
+    log_path = str(blocker / "log.txt")
+    writer = LogWriter(log_path)
+    write_lines(writer, ["hilang"])
+    blocker.unlink()
+    write_lines(writer, ["tertulis"])
+    writer.close()
+    with open(log_path, encoding="utf-8") as log_file:
+        assert log_file.read().split() == ["tertulis"]
+
+
+def log_from_worker(index):
+    for line in range(3):
+        utils.log_message(f"worker {index} baris {line}")
+    return index
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "fork"])
+def test_worker_lines_reach_configured_log(tmp_path, start_method):
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"start method {start_method} tidak tersedia")
+    previous = utils.logging_config()
+    log_path = str(tmp_path / "worker.txt")
+    utils.configure_logging(log_path)
+    try:
+        context = multiprocessing.get_context(start_method)
+        with ProcessPoolExecutor(2, mp_context=context, initializer=utils.init_worker_logging, initargs=(utils.logging_config(),)) as executor:
+            list(executor.map(log_from_worker, range(4)))
+    finally:
+        utils.configure_logging(*previous)
+    with open(log_path, encoding="utf-8") as log_file:
+        lines = [line.split("] ", 1)[1] for line in log_file.read().splitlines()]
+    assert sorted(lines) == sorted(f"worker {index} baris {line}" for index in range(4) for line in range(3))
+
+
+def test_worker_lines_are_written_in_batches(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "worker.txt")
+    monkeypatch.setattr(utils, "_log_path", log_path)
+    monkeypatch.setattr(utils.time, "monotonic", lambda: 1000.0)
+    opened = []
+    monkeypatch.setattr(utils, "open", lambda *args, **kwargs: opened.append(args) or open(*args, **kwargs), raising=False)
+
+    # Pesan pertama ditulis langsung (flush terakhir sudah lama); berikutnya dikumpulkan
+    for line in range(utils.WORKER_FLUSH_LINES + 2):
+        utils._write_directly(f"baris {line}", f"baris {line}")
+    assert len(opened) == 2
+    utils.flush_logs()
+    assert len(opened) == 3
+    with open(log_path, encoding="utf-8") as log_file:
+        assert log_file.read().splitlines() == [f"baris {line}" for line in range(utils.WORKER_FLUSH_LINES + 2)]
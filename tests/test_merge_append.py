@@ -0,0 +1,97 @@
+import os
+import re
+
+from pypdf import PdfReader
+
+from pdf_factory import write_faktur
+from src.pdf.merge_index import MergeIndex, read_archive_fakturs
+from src.pdf.pdf_append import append_pdfs
+from src.pdf.pdf_processor import process_pdfs
+
+FAKTUR_LINE = re.compile(r"Kode dan Nomor Seri Faktur Pajak: (\d+)")
+ARCHIVE = os.path.join("1234567890123456789012", "Pt Alpha Satu.pdf")
+
+
+def run(input_directory, output_directory, merge_append=True):
+    settings = {
+        "merge_append": merge_append,
+        "use_extraction_cache": False,
+        "extraction_workers": 1,
+        "merge_workers": 1,
+    }
+    return process_pdfs(str(input_directory), str(output_directory), settings=settings)
+
+
+def archive_pages(output_directory):
+    """Nomor faktur per halaman file gabungan; halaman lampiran menjadi None."""
+    reader = PdfReader(os.path.join(str(output_directory), ARCHIVE))
+    pages = []
+    for page in reader.pages:
+        match = FAKTUR_LINE.search(page.extract_text())
+        pages.append(match.group(1) if match else None)
+    return pages
+
+
+def test_new_fakturs_are_appended(tmp_path):
+    write_faktur(tmp_path / "in", "a.pdf", nomor="04002500000001")
+    run(tmp_path / "in", tmp_path / "out")
+    write_faktur(tmp_path / "in2", "b.pdf", extra_pages=1, nomor="04002500000002")
+    run(tmp_path / "in2", tmp_path / "out")
+
+    pages = archive_pages(tmp_path / "out")
+    assert pages == ["04002500000001", "04002500000002", None]
+    archive = os.path.join(str(tmp_path / "out"), ARCHIVE)
+    assert read_archive_fakturs(archive) == {"04002500000001", "04002500000002"}
+
+
+def test_known_fakturs_are_skipped(tmp_path):
+    write_faktur(tmp_path / "in", "a.pdf", nomor="04002500000001")
+    write_faktur(tmp_path / "in", "b.pdf", nomor="04002500000002")
+    run(tmp_path / "in", tmp_path / "out")
+    archive = os.path.join(str(tmp_path / "out"), ARCHIVE)
+    size = os.path.getsize(archive)
+
+    run(tmp_path / "in", tmp_path / "out")
+    assert archive_pages(tmp_path / "out") == ["04002500000001", "04002500000002"]
+    assert os.path.getsize(archive) == size
+
+
+def test_untracked_archive_is_seeded_not_duplicated(tmp_path):
+    write_faktur(tmp_path / "in", "a.pdf", nomor="04002500000001")
+    run(tmp_path / "in", tmp_path / "out", merge_append=False)
+    assert not os.path.exists(tmp_path / "out" / "merged_faktur_index.db")
+
+    write_faktur(tmp_path / "in", "b.pdf", nomor="04002500000002")
+    run(tmp_path / "in", tmp_path / "out")
+    assert archive_pages(tmp_path / "out") == ["04002500000001", "04002500000002"]
+
+
+def test_externally_modified_archive_is_reread(tmp_path):
+    write_faktur(tmp_path / "in", "a.pdf", nomor="04002500000001")
+    run(tmp_path / "in", tmp_path / "out")
+    archive = os.path.join(str(tmp_path / "out"), ARCHIVE)
+
+    # Archive diganti di luar aplikasi: isi index lama (faktur 01) tidak lagi berlaku
+    write_faktur(tmp_path / "other", "c.pdf", nomor="04002500000003")
+    os.replace(str(tmp_path / "other" / "c.pdf"), archive)
+    assert MergeIndex(str(tmp_path / "out")).known_fakturs(archive) is None
+
+    write_faktur(tmp_path / "in", "d.pdf", nomor="04002500000003")
+    run(tmp_path / "in", tmp_path / "out")
+    assert archive_pages(tmp_path / "out") == ["04002500000003", "04002500000001"]
+
+
+def test_append_keeps_existing_bytes(tmp_path):
+    archive = write_faktur(str(tmp_path), "archive.pdf", nomor="04002500000001")
+    addition = write_faktur(str(tmp_path), "new.pdf", extra_pages=2, nomor="04002500000002")
+    with open(archive, "rb") as archive_file:
+        original = archive_file.read()
+
+    append_pdfs([addition], archive)
+    append_pdfs([write_faktur(str(tmp_path), "third.pdf", nomor="04002500000003")], archive)
+
+    with open(archive, "rb") as archive_file:
+        assert archive_file.read(len(original)) == original
+    reader = PdfReader(archive)
+    assert len(reader.pages) == 5
+    assert read_archive_fakturs(archive) == {"04002500000001", "04002500000002", "04002500000003"}
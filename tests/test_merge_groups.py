@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from src.pdf.merge_groups import MAX_GROUP_RECORDS_IN_MEMORY, MergeGroupIndex
+from src.pdf.pdf_document import PDFDocument
+
+
+def make_records(count, seed=0):
+    """(id_tku, partner, path, faktur) acak; beberapa grup muncul lagi jauh setelah kemunculan pertama."""
+    rng = random.Random(seed)
+    return [
+        (f"tku{rng.randrange(7)}", f"partner{rng.randrange(40)}", f"/tidak/ada/{index}.pdf", f"{index:014d}")
+        for index in range(count)
+    ]
+
+
+def expected_groups(records):
+    """Oracle: grup sesuai kemunculan pertama ID TKU lalu partner, file sesuai urutan ditambahkan."""
+    groups = {}
+    for id_tku, partner_name, path, faktur_number in records:
+        groups.setdefault(id_tku, {}).setdefault(partner_name, []).append((path, faktur_number))
+    return [
+        (id_tku, partner_name, files)
+        for id_tku, partners in groups.items() for partner_name, files in partners.items()
+    ]
+
+
+def fill(index, records, data=b""):
+    for id_tku, partner_name, path, faktur_number in records:
+        index.add(id_tku, partner_name, PDFDocument(path, data=data), faktur_number)
+
+
+def read_groups(index):
+    groups = []
+    for id_tku, partner_name, records in index.iter_groups():
+        groups.append((id_tku, partner_name, [(document.pdf_path, faktur_number) for document, faktur_number in records]))
+        for document, _ in records:
+            document.close()
+    return groups
+
+
+@pytest.mark.parametrize("count", [100, MAX_GROUP_RECORDS_IN_MEMORY * 2 + 123])
+def test_order_is_preserved(count):
+    records = make_records(count)
+    with MergeGroupIndex() as index:
+        fill(index, records)
+        assert index.is_spilled == (count > MAX_GROUP_RECORDS_IN_MEMORY)
+        assert index.total_records == count
+        assert index.group_count == len(expected_groups(records))
+        assert read_groups(index) == expected_groups(records)
+
+
+def test_spill_keeps_no_group_keys_in_memory():
+    records = make_records(MAX_GROUP_RECORDS_IN_MEMORY + 1)
+    with MergeGroupIndex() as index:
+        fill(index, records)
+        assert index.is_spilled
+        assert index._groups == {}
+        # Record berikutnya hanya membuat grupnya sendiri di memori sampai dipindahkan lagi
+        fill(index, [("tku0", "partner0", "/tidak/ada/baru.pdf", "baru")])
+        assert index._groups == {"tku0": {"partner0": index._groups["tku0"]["partner0"]}}
+
+
+def test_recent_documents_keep_their_bytes_after_spill():
+    records = make_records(30)
+    with MergeGroupIndex(max_cached_bytes=1000, max_records_in_memory=10) as index:
+        fill(index, records, data=b"x" * 10)
+        # 30 record: dua kali dipindahkan ke disk, 8 record terakhir masih di memori
+        loaded = {}
+        for _, _, group_records in index.iter_groups():
+            for document, faktur_number in group_records:
+                loaded[faktur_number] = document.loaded_size
+                document.close()
+    assert [faktur for faktur, size in sorted(loaded.items()) if size] == [records[i][3] for i in range(22, 30)]
+    assert index.cached_bytes == 0
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_factory import write_faktur
+from src.pdf.pdf_utils import merge_pdfs
+
+LOGO_BYTES = 20000
+
+
+@pytest.fixture
+def sources(tmp_path):
+    return [
+        write_faktur(str(tmp_path / "in"), f"{index}.pdf", padding=2000, logo=LOGO_BYTES, nomor=f"040025000000{index:02d}")
+        for index in range(5)
+    ]
+
+
+def test_shared_objects_are_stored_once(tmp_path, sources):
+    optimized = str(tmp_path / "optimized.pdf")
+    plain = str(tmp_path / "plain.pdf")
+    merge_pdfs(sources, optimized, optimize=True)
+    merge_pdfs(sources, plain, optimize=False)
+
+    # Tanpa optimasi setiap faktur membawa salinan logo sendiri
+    assert os.path.getsize(plain) > len(sources) * LOGO_BYTES
+    assert os.path.getsize(optimized) < 2 * LOGO_BYTES
+
+    reader = PdfReader(optimized)
+    logos = {page["/Resources"]["/XObject"].raw_get("/Logo").idnum for page in reader.pages}
+    assert len(logos) == 1
+
+
+def test_optimized_merge_keeps_page_content(tmp_path, sources):
+    optimized = str(tmp_path / "optimized.pdf")
+    merge_pdfs(sources, optimized, optimize=True)
+    reader = PdfReader(optimized)
+    assert len(reader.pages) == len(sources)
+    for index, page in enumerate(reader.pages):
+        assert f"Kode dan Nomor Seri Faktur Pajak: 040025000000{index:02d}" in page.extract_text()
+        assert page["/Contents"].get_object().get("/Filter") == "/FlateDecode"
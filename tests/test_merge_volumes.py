@@ -0,0 +1,64 @@
+import os
+
+from pypdf import PdfReader
+
+from pdf_factory import write_faktur
+from src.pdf.pdf_utils import assign_volumes, merge_pdfs_in_volumes, volume_path
+
+
+def test_assign_volumes_without_limits_is_single_volume():
+    assert assign_volumes([(3, 100), (5, 200)]) == [1, 1]
+
+
+def test_assign_volumes_by_pages_keeps_oversized_file_alone():
+    assert assign_volumes([(1, 0), (1, 0), (5, 0), (1, 0)], max_pages=2) == [1, 1, 2, 3]
+
+
+def test_assign_volumes_by_bytes():
+    assert assign_volumes([(1, 60), (1, 60), (1, 30)], max_bytes=100) == [1, 2, 2]
+
+
+def test_volume_path():
+    assert volume_path("out/Pt Alpha.pdf", 2) == "out/Pt Alpha (part 2).pdf"
+
+
+def make_inputs(folder, pages_per_file, padding=0):
+    return [
+        write_faktur(folder, f"{index}.pdf", extra_pages=pages - 1, padding=padding, nomor=f"040025000000{index:02d}")
+        for index, pages in enumerate(pages_per_file)
+    ]
+
+
+def page_counts(paths):
+    return [len(PdfReader(path).pages) for path in paths]
+
+
+def test_merge_in_volumes_by_pages(tmp_path):
+    pdf_paths = make_inputs(str(tmp_path / "in"), [2, 1, 3, 1, 1])
+    output_path = str(tmp_path / "Pt Alpha.pdf")
+    written = merge_pdfs_in_volumes(pdf_paths, output_path, max_pages=3)
+
+    assert written == [volume_path(output_path, number) for number in (1, 2, 3)]
+    # Faktur 3 halaman tidak dipecah walaupun volume sebelumnya belum penuh
+    assert page_counts(written) == [3, 3, 2]
+    assert not os.path.exists(output_path)
+
+
+def test_merge_in_volumes_by_bytes(tmp_path):
+    pdf_paths = make_inputs(str(tmp_path / "in"), [1, 1, 1, 1, 1], padding=3000)
+    sizes = [os.path.getsize(path) for path in pdf_paths]
+    max_bytes = sizes[0] * 2 + sizes[0] // 2
+    output_path = str(tmp_path / "Pt Alpha.pdf")
+    written = merge_pdfs_in_volumes(pdf_paths, output_path, max_bytes=max_bytes)
+
+    assert assign_volumes([(1, size) for size in sizes], max_bytes=max_bytes) == [1, 1, 2, 2, 3]
+    assert written == [volume_path(output_path, number) for number in (1, 2, 3)]
+    assert page_counts(written) == [2, 2, 1]
+
+
+def test_merge_under_limit_keeps_plain_name(tmp_path):
+    pdf_paths = make_inputs(str(tmp_path / "in"), [1, 2])
+    output_path = str(tmp_path / "Pt Alpha.pdf")
+    assert merge_pdfs_in_volumes(pdf_paths, output_path, max_pages=10, max_bytes=10 ** 9) == [output_path]
+    assert page_counts([output_path]) == [3]
+    assert merge_pdfs_in_volumes(pdf_paths, str(tmp_path / "Tanpa Batas.pdf")) == [str(tmp_path / "Tanpa Batas.pdf")]
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import pytest
+
+from src.utils.name_reservations import NameReservations
+
+
+def create_exclusive(path):
+    with open(path, "xb") as output_file:
+        output_file.write(b"isi")
+    return "copy"
+
+
+def test_reserve_skips_existing_and_reserved_names(tmp_path):
+    (tmp_path / "Faktur.pdf").write_bytes(b"")
+    (tmp_path / "Faktur (1).pdf").write_bytes(b"")
+    reservations = NameReservations()
+    requested = str(tmp_path / "Faktur.pdf")
+    assert reservations.reserve(requested) == str(tmp_path / "Faktur (2).pdf")
+    assert reservations.reserve(requested) == str(tmp_path / "Faktur (3).pdf")
+    assert reservations.reserve(str(tmp_path / "Lain.pdf")) == str(tmp_path / "Lain.pdf")
+
+
+def test_reserve_ignores_case(tmp_path, monkeypatch):
+    monkeypatch.setattr(os.path, "normcase", str.lower)
+    (tmp_path / "FAKTUR.PDF").write_bytes(b"")
+    reservations = NameReservations()
+    assert reservations.reserve(str(tmp_path / "faktur.pdf")) == str(tmp_path / "faktur (1).pdf")
+
+
+def test_claim_skips_name_created_after_scan(tmp_path):
+    reservations = NameReservations()
+    requested = str(tmp_path / "Faktur.pdf")
+    # Folder di-scan saat reserve pertama; file lalu dibuat penulis lain
+    assert reservations.reserve(str(tmp_path / "Lain.pdf"))
+    (tmp_path / "Faktur.pdf").write_bytes(b"milik orang lain")
+    (tmp_path / "Faktur (1).pdf").write_bytes(b"milik orang lain")
+
+    path, method = reservations.claim(requested, create_exclusive)
+    assert (path, method) == (str(tmp_path / "Faktur (2).pdf"), "copy")
+    assert (tmp_path / "Faktur.pdf").read_bytes() == b"milik orang lain"
+    # Nama yang ternyata sudah dipakai tetap tercatat
+    assert reservations.claim(requested, create_exclusive)[0] == str(tmp_path / "Faktur (3).pdf")
+
+
+def test_failed_create_releases_name(tmp_path):
+    reservations = NameReservations()
+    requested = str(tmp_path / "Faktur.pdf")
+
+    def failing_create(path):
+        raise PermissionError("dikunci")
+
+    with pytest.raises(PermissionError):
+        reservations.claim(requested, failing_create)
+    assert reservations.claim(requested, create_exclusive)[0] == requested
+
+
+def test_claim_gives_up_after_max_attempts(tmp_path):
+    reservations = NameReservations()
+
+    def always_exists(path):
+        raise FileExistsError(path)
+
+    with pytest.raises(FileExistsError):
+        reservations.claim(str(tmp_path / "Faktur.pdf"), always_exists, max_attempts=3)
+
+
+def test_concurrent_claims_never_share_a_name(tmp_path):
+    reservations = NameReservations()
+    requested = str(tmp_path / "Faktur.pdf")
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(25):
+            path, _ = reservations.claim(requested, create_exclusive)
+            with lock:
+                claimed.append(path)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(claimed)) == len(claimed) == 100
+    assert len(os.listdir(tmp_path)) == 100
@@ -0,0 +1,61 @@
+import pytest
+
+from pdf_factory import make_pdf
+from src.pdf.pdf_document import (
+    STRUCTURE_INVALID, STRUCTURE_OK, STRUCTURE_SUSPICIOUS, PDFDocument, check_pdf_file_structure, check_pdf_structure,
+)
+from src.pdf.pdf_utils import validate_pdf
+
+VALID = make_pdf([["Faktur Pajak"]])
+# Offset startxref dirusak: struktur mencurigakan, tetapi pdfplumber masih bisa memperbaiki xref
+WRONG_XREF = VALID.replace(b"startxref\n", b"startxref\n1")
+NO_TRAILER = VALID[:VALID.rindex(b"startxref")]
+# Header setelah 1024 byte sampah dianggap bukan PDF
+LATE_HEADER = b"x" * 1024 + VALID
+
+
+@pytest.mark.parametrize("data, expected", [
+    (VALID, STRUCTURE_OK),
+    (VALID + b"\n" * 3000, STRUCTURE_SUSPICIOUS),
+    (make_pdf([["Lampiran"]] * 3, padding=4000), STRUCTURE_OK),
+    (WRONG_XREF, STRUCTURE_SUSPICIOUS),
+    (NO_TRAILER, STRUCTURE_SUSPICIOUS),
+    (LATE_HEADER, STRUCTURE_INVALID),
+    (b"bukan pdf", STRUCTURE_INVALID),
+    (b"", STRUCTURE_INVALID),
+])
+def test_file_check_matches_in_memory_check(tmp_path, data, expected):
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(data)
+    assert check_pdf_structure(data) == expected
+    assert check_pdf_file_structure(str(pdf_path)) == expected
+
+
+def test_validate_does_not_load_valid_file(tmp_path):
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(make_pdf([["Lampiran"]] * 3, padding=4000))
+    document = PDFDocument(str(pdf_path))
+    assert document.validate()
+    assert document.loaded_size == 0
+
+
+def test_validate_uses_loaded_bytes(tmp_path):
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(b"bukan pdf")
+    # Byte yang sudah ada di memori (mis. dikirim ke worker) dipakai, file di disk tidak dibaca
+    assert PDFDocument(str(pdf_path), data=VALID).validate()
+
+
+def test_suspicious_file_falls_back_to_full_parse(tmp_path):
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(WRONG_XREF)
+    assert validate_pdf(str(pdf_path), strict=True)
+    assert not validate_pdf(str(pdf_path), strict=False)
+
+    broken_path = tmp_path / "broken.pdf"
+    broken_path.write_bytes(b"%PDF-1.4\nrusak")
+    assert not validate_pdf(str(broken_path), strict=True)
+
+
+def test_missing_file_is_invalid(tmp_path):
+    assert not validate_pdf(str(tmp_path / "hilang.pdf"))
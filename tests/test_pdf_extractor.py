@@ -0,0 +1,40 @@
+import multiprocessing
+import threading
+
+from pdf_factory import write_faktur
+from src.pdf.pdf_extractor import iter_extracted_info
+
+
+def make_inputs(folder, count=6):
+    paths = [write_faktur(folder, f"{index}.pdf", nomor=f"040025000000{index:02d}") for index in range(count)]
+    bad_path = folder / "rusak.pdf"
+    bad_path.write_bytes(b"bukan pdf")
+    return paths + [str(bad_path)]
+
+
+def collect(pdf_paths, workers, cancel_flag=None):
+    results = []
+    for pdf_path, document, status, info, _ in iter_extracted_info(pdf_paths, max_workers=workers, cancel_flag=cancel_flag):
+        document.close()
+        results.append((pdf_path, status, info))
+    return results
+
+
+def test_parallel_matches_sequential(tmp_path):
+    pdf_paths = make_inputs(tmp_path)
+    parallel = collect(pdf_paths, 2)
+    assert parallel == collect(pdf_paths, 1)
+    assert [status for _, status, _ in parallel] == ["ok"] * 6 + ["invalid"]
+    assert parallel[3][2][2] == "04002500000003"
+
+
+def test_cancel_joins_workers(tmp_path):
+    pdf_paths = make_inputs(tmp_path, 12)
+    cancel_flag = threading.Event()
+    results = []
+    for pdf_path, document, status, info, _ in iter_extracted_info(pdf_paths, max_workers=2, cancel_flag=cancel_flag):
+        document.close()
+        results.append(pdf_path)
+        cancel_flag.set()
+    assert results == pdf_paths[:1]
+    assert multiprocessing.active_children() == []
@@ -0,0 +1,23 @@
+import multiprocessing
+import threading
+
+from pdf_factory import write_faktur
+from src.pdf.pdf_processor import process_pdfs
+
+
+def test_cancel_during_extraction_stops_workers(tmp_path):
+    for index in range(12):
+        write_faktur(tmp_path / "in", f"{index}.pdf", nomor=f"040025000000{index:02d}")
+    cancel_flag = threading.Event()
+
+    def progress_callback(stage, *counts):
+        if stage == "reading":
+            cancel_flag.set()
+
+    settings = {"use_extraction_cache": False, "extraction_workers": 2}
+    total, renamed, merged, errors = process_pdfs(
+        str(tmp_path / "in"), str(tmp_path / "out"), progress_callback, settings=settings, cancel_flag=cancel_flag
+    )
+    assert (merged, errors) == (0, 0)
+    assert multiprocessing.active_children() == []
+    assert list((tmp_path / "out").rglob("*.pdf")) == []
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from pdf_factory import write_faktur
+from src.pdf.pdf_processor_rename import execute_plan, plan_pdfs, process_pdfs
+from src.pdf.processing_plan import ACTION_RENAME, ACTION_SKIP, MODE_RENAME, ProcessingPlan
+
+ID_TKU = "1234567890123456789012"
+SETTINGS = {
+    "use_name": True,
+    "use_faktur": True,
+    "component_order": ["Nama Lawan Transaksi", "Nomor Faktur Pajak"],
+    "use_extraction_cache": False,
+    "extraction_workers": 1,
+}
+
+
+@pytest.fixture
+def input_directory(tmp_path):
+    folder = tmp_path / "in"
+    write_faktur(folder, "a.pdf", nomor="04002500000001")
+    write_faktur(folder, "b.pdf", nomor="04002500000001")
+    write_faktur(folder, "c.pdf", nomor="04002500000002")
+    (folder / "rusak.pdf").write_bytes(b"bukan pdf")
+    return str(folder)
+
+
+def output_files(output_directory):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), output_directory)
+        for root, _, names in os.walk(output_directory) for name in names
+    )
+
+
+@pytest.mark.parametrize("plan_filename", ["plan.json", "plan.csv"])
+def test_plan_round_trip(tmp_path, input_directory, plan_filename):
+    plan = plan_pdfs(input_directory, str(tmp_path / "out"), settings=SETTINGS)
+    plan_path = str(tmp_path / plan_filename)
+    plan.save(plan_path)
+    loaded = ProcessingPlan.load(plan_path)
+
+    assert loaded.mode == MODE_RENAME
+    assert [entry.to_dict() for entry in loaded.entries] == [entry.to_dict() for entry in plan.entries]
+    entries = {os.path.basename(entry.source): entry for entry in loaded.entries}
+    assert {name: entry.action for name, entry in entries.items()} == {
+        "a.pdf": ACTION_RENAME, "b.pdf": ACTION_RENAME, "c.pdf": ACTION_RENAME, "rusak.pdf": ACTION_SKIP,
+    }
+    # Faktur dengan nama sama di rencana mendapat akhiran seperti saat proses sebenarnya
+    collided = [entry for entry in loaded.entries if entry.collision]
+    assert [os.path.basename(entry.destination) for entry in collided] == ["Pt Alpha Satu-04002500000001 (1).pdf"]
+
+
+def test_apply_matches_direct_processing(tmp_path, input_directory):
+    write_faktur(tmp_path / "out" / ID_TKU, "Pt Alpha Satu-04002500000002.pdf", nomor="04002500000009")
+    write_faktur(tmp_path / "direct" / ID_TKU, "Pt Alpha Satu-04002500000002.pdf", nomor="04002500000009")
+    plan_path = str(tmp_path / "plan.csv")
+    plan_pdfs(input_directory, str(tmp_path / "out"), settings=SETTINGS).save(plan_path)
+
+    assert execute_plan(ProcessingPlan.load(plan_path), settings=SETTINGS) == (4, 3, 0, 1)
+    process_pdfs(input_directory, str(tmp_path / "direct"), settings=SETTINGS)
+    # Tujuan yang sudah diberi akhiran di rencana ditulis apa adanya, tanpa akhiran ganda
+    assert output_files(str(tmp_path / "out")) == output_files(str(tmp_path / "direct")) == [
+        os.path.join(ID_TKU, "Pt Alpha Satu-04002500000001 (1).pdf"),
+        os.path.join(ID_TKU, "Pt Alpha Satu-04002500000001.pdf"),
+        os.path.join(ID_TKU, "Pt Alpha Satu-04002500000002 (1).pdf"),
+        os.path.join(ID_TKU, "Pt Alpha Satu-04002500000002.pdf"),
+    ]
+
+
+def test_apply_twice_does_not_duplicate(tmp_path, input_directory):
+    plan = plan_pdfs(input_directory, str(tmp_path / "out"), settings=SETTINGS)
+    execute_plan(plan, settings=SETTINGS)
+    before = output_files(str(tmp_path / "out"))
+
+    # Tujuan sudah ada: file dilewati sebagai error, bukan disalin dengan akhiran baru
+    assert execute_plan(plan, settings=SETTINGS) == (4, 0, 0, 4)
+    assert output_files(str(tmp_path / "out")) == before
+
+
+def test_plan_uses_alt_folder_like_processing(tmp_path, input_directory):
+    for name in ("out", "direct"):
+        os.makedirs(tmp_path / name)
+        (tmp_path / name / ID_TKU).write_text("bukan folder")
+    plan = plan_pdfs(input_directory, str(tmp_path / "out"), settings=SETTINGS)
+    destinations = [entry.destination for entry in plan.entries if entry.action == ACTION_RENAME]
+    assert {os.path.dirname(destination) for destination in destinations} == {str(tmp_path / "out" / f"{ID_TKU}_alt")}
+
+    execute_plan(plan, settings=SETTINGS)
+    process_pdfs(input_directory, str(tmp_path / "direct"), settings=SETTINGS)
+    assert output_files(str(tmp_path / "out")) == output_files(str(tmp_path / "direct"))
+
+
+def test_changed_source_is_skipped(tmp_path, input_directory):
+    plan = plan_pdfs(input_directory, str(tmp_path / "out"), settings=SETTINGS)
+    write_faktur(input_directory, "c.pdf", extra_pages=1, nomor="04002500000002")
+    assert execute_plan(plan, settings=SETTINGS) == (4, 2, 0, 2)
+    assert not os.path.exists(tmp_path / "out" / ID_TKU / "Pt Alpha Satu-04002500000002.pdf")
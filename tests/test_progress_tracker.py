@@ -0,0 +1,103 @@
+import pytest
+
+from src.utils import progress_tracker
+from src.utils.progress_tracker import ProgressTracker, format_progress_detail
+
+
+def percentage(tracker, stage, current, total_files=10, total_to_merge=10, total_to_finalize=10):
+    tracker.update(stage, current, total_files, total_to_merge, total_to_finalize)
+    return tracker.sample().percentage
+
+
+def test_merge_stages_without_preflight():
+    tracker = ProgressTracker()
+    assert percentage(tracker, "reading", 0) == 0
+    assert percentage(tracker, "reading", 10) == 40
+    assert percentage(tracker, "processing", 5) == 60
+    assert percentage(tracker, "finalizing", 5) == 90
+    assert percentage(tracker, "finalizing", 0, total_to_finalize=0) == 100
+
+
+def test_preflight_has_its_own_range():
+    tracker = ProgressTracker()
+    assert percentage(tracker, "preflight", 5) == 15
+    assert percentage(tracker, "preflight", 10) == 30
+    # Tahap membaca setelah preflight melanjutkan progress, tidak kembali ke 0
+    assert percentage(tracker, "reading", 0) == 30
+    assert percentage(tracker, "reading", 10) == 40
+    assert percentage(tracker, "finalizing", 10) == 100
+
+
+def test_reset_forgets_preflight():
+    tracker = ProgressTracker()
+    percentage(tracker, "preflight", 10)
+    tracker.reset()
+    assert tracker.sample() is None
+    assert percentage(tracker, "reading", 5) == 20
+
+
+@pytest.mark.parametrize("stage, label", [
+    ("preflight", "Memeriksa"), ("reading", "Membaca"), ("processing", "Menggabungkan"), ("finalizing", "Finalisasi"),
+])
+def test_stage_labels(stage, label):
+    tracker = ProgressTracker()
+    tracker.update(stage, 3, 10, 10, 10)
+    assert format_progress_detail(tracker.sample()).startswith(f"{label} 3/10")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(progress_tracker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_version_changes_only_on_update():
+    tracker = ProgressTracker()
+    assert tracker.sample() is None
+    version = tracker.version
+    tracker.update("reading", 1, 10, 0, 0)
+    assert tracker.version == version + 1
+    tracker.sample()
+    tracker.sample()
+    # Membaca sample tidak mengubah versi, GUI bisa melewati frame tanpa update
+    assert tracker.version == version + 1
+    tracker.reset()
+    assert tracker.version == version + 2
+
+
+def test_rate_and_eta_per_stage(clock):
+    tracker = ProgressTracker()
+    tracker.update("reading", 0, 100, 20, 5)
+    sample = tracker.sample()
+    assert (sample.rate, sample.eta) == (0.0, None)
+
+    clock[0] += 10
+    tracker.update("reading", 40, 100, 20, 5)
+    sample = tracker.sample()
+    assert sample.rate == pytest.approx(4.0)
+    assert sample.eta == pytest.approx(15.0)
+
+    # Tahap baru mulai menghitung kecepatan dari awal tahap itu sendiri
+    tracker.update("processing", 0, 100, 20, 5)
+    clock[0] += 2
+    tracker.update("processing", 10, 100, 20, 5)
+    sample = tracker.sample()
+    assert (sample.current, sample.total) == (10, 20)
+    assert sample.rate == pytest.approx(5.0)
+    assert sample.eta == pytest.approx(2.0)
+
+    tracker.update("processing", 20, 100, 20, 5)
+    assert tracker.sample().eta is None
+
+
+def test_detail_shows_rate_and_eta(clock):
+    tracker = ProgressTracker()
+    tracker.update("reading", 0, 50000, 0, 0)
+    assert format_progress_detail(tracker.sample()) == "Membaca 0/50000"
+    clock[0] += 4
+    tracker.update("reading", 10, 50000, 0, 0)
+    assert format_progress_detail(tracker.sample()) == "Membaca 10/50000 · 2.5 file/s · ETA 5:33:16"
+    clock[0] += 4
+    tracker.update("reading", 49990, 50000, 0, 0)
+    assert format_progress_detail(tracker.sample()).endswith("· ETA 00:00")
@@ -0,0 +1,86 @@
+import pickle
+
+import pytest
+
+from src.utils.run_config import RunConfig
+
+
+class FakeVar:
+    """Pengganti BooleanVar/StringVar: get() hanya boleh dipanggil saat snapshot dibuat."""
+
+    def __init__(self, value):
+        self.value = value
+        self.reads = 0
+
+    def get(self):
+        self.reads += 1
+        return self.value
+
+
+def test_from_settings_reads_tk_variables_once():
+    use_name = FakeVar(True)
+    separator = FakeVar("_")
+    config = RunConfig.from_settings({
+        "use_name": use_name,
+        "separator": separator,
+        "component_order": ["Nama Lawan Transaksi", "Nomor Faktur Pajak"],
+        "layout": {"margin": FakeVar(3)},
+        "merge_workers": 2,
+    })
+    use_name.value = False
+    separator.value = "-"
+    assert config["use_name"] is True
+    assert config.get("separator") == "_"
+    assert config["component_order"] == ("Nama Lawan Transaksi", "Nomor Faktur Pajak")
+    assert isinstance(config["layout"], RunConfig)
+    assert config["layout"]["margin"] == 3
+    assert (use_name.reads, separator.reads) == (1, 1)
+    assert dict(config)["merge_workers"] == 2
+
+
+def test_from_settings_overrides_and_reuse():
+    config = RunConfig.from_settings({"use_name": FakeVar(False)}, use_name=True, extra=1)
+    assert dict(config) == {"use_name": True, "extra": 1}
+    assert RunConfig.from_settings(config) is config
+    assert RunConfig.from_settings(None) == {}
+
+
+def test_is_immutable():
+    config = RunConfig({"use_name": True})
+    with pytest.raises(AttributeError):
+        config.use_name = False
+    with pytest.raises(TypeError):
+        config["use_name"] = False
+
+
+def test_replace_returns_new_config():
+    config = RunConfig({"use_name": True, "separator": "_"})
+    changed = config.replace(separator="-", component_order=["Tanggal Faktur Pajak"])
+    assert config["separator"] == "_"
+    assert changed["separator"] == "-"
+    assert changed["use_name"] is True
+    assert changed["component_order"] == ("Tanggal Faktur Pajak",)
+
+
+def test_enabled():
+    config = RunConfig({"use_name": True, "use_date": False, "merge_append": 0, "separator": "_"})
+    assert config.enabled("use_name")
+    assert not config.enabled("use_date")
+    assert not config.enabled("merge_append")
+    assert not config.enabled("hilang")
+    assert config.enabled("hilang", default=True)
+
+
+def test_pickle_round_trip():
+    config = RunConfig.from_settings({
+        "use_name": FakeVar(True),
+        "component_order": ["Nama Lawan Transaksi"],
+        "layout": {"margin": 3},
+    })
+    restored = pickle.loads(pickle.dumps(config))
+    assert isinstance(restored, RunConfig)
+    assert restored == config
+    assert isinstance(restored["layout"], RunConfig)
+    assert restored["component_order"] == ("Nama Lawan Transaksi",)
+    with pytest.raises(AttributeError):
+        restored.use_name = False
@@ -0,0 +1,74 @@
+import random
+import re
+import sys
+
+import pytest
+
+from src.pdf.sanitizer import WHITESPACE_CHARS, replace_slashes, sanitize_faktur_number, sanitize_reference
+
+# Oracle: sanitizer versi lama berbasis regex, disalin apa adanya sebagai pembanding tabel translate
+OLD_CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+OLD_NEWLINE_TAB_PATTERN = re.compile(r'[\n\r\t]+')
+OLD_WHITESPACE_PATTERN = re.compile(r'\s+')
+OLD_INVALID_REFERENCE_CHARS_PATTERN = re.compile(r'[<>:"\\|?*()]')
+OLD_TRAILING_BRACKETS_PATTERN = re.compile(r'[)\]\}]+$')
+
+
+def old_sanitize_faktur_number(faktur_number):
+    faktur_number = OLD_CONTROL_CHARS_PATTERN.sub('', faktur_number)
+    faktur_number = OLD_WHITESPACE_PATTERN.sub(' ', faktur_number).strip()
+    if len(faktur_number) > 50:
+        faktur_number = faktur_number[:50].strip()
+    return faktur_number
+
+
+def old_sanitize_reference(reference):
+    reference = OLD_CONTROL_CHARS_PATTERN.sub('', reference)
+    reference = OLD_NEWLINE_TAB_PATTERN.sub(' ', reference)
+    reference = OLD_WHITESPACE_PATTERN.sub(' ', reference).strip()
+    reference = OLD_INVALID_REFERENCE_CHARS_PATTERN.sub(' ', reference)
+    reference = OLD_TRAILING_BRACKETS_PATTERN.sub('', reference).strip()
+    reference = OLD_WHITESPACE_PATTERN.sub(' ', reference).strip()
+    if len(reference) > 200:
+        reference = reference[:200].strip()
+    return reference
+
+
+# Karakter yang relevan untuk aturan sanitasi: huruf biasa, karakter invalid, kurung, kontrol C0/C1,
+# dan whitespace Unicode (termasuk yang juga karakter kontrol seperti \x85)
+ALPHABET = list("abcXYZ019 /.-_<>:\"\\|?*()[]{}") + [
+    "\n", "\r", "\t", "\x00", "\x1f", "\x7f", "\x85", "\x9f", "\xa0", "　", "\x0b", "\x0c", "​", " ", "é",
+]
+
+
+def test_whitespace_chars_match_regex_whitespace():
+    regex_whitespace = {chr(code) for code in range(sys.maxunicode + 1) if re.match(r'\s', chr(code))}
+    assert set(WHITESPACE_CHARS) == regex_whitespace
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_translate_sanitizers_match_old_regex(seed):
+    rng = random.Random(seed)
+    for _ in range(25000):
+        value = "".join(rng.choice(ALPHABET) for _ in range(rng.choice([0, 1, 2, 3, 5, 10, 40, 230])))
+        assert sanitize_reference(value) == old_sanitize_reference(value), repr(value)
+        assert sanitize_faktur_number(value) == old_sanitize_faktur_number(value), repr(value)
+
+
+@pytest.mark.parametrize("value", [
+    "INV/2025/001 )",
+    "PO-77 (urgent)",
+    "SO-1 }\n lanjutan )]}",
+    "A ) :",
+    "A )\x00",
+    "\t\n",
+    "x" * 250,
+])
+def test_known_cases_match_old_regex(value):
+    assert sanitize_reference(value) == old_sanitize_reference(value)
+    assert sanitize_faktur_number(value) == old_sanitize_faktur_number(value)
+
+
+def test_replace_slashes():
+    assert replace_slashes("INV/2025/001", "_") == "INV_2025_001"
+    assert replace_slashes("INV/2025/001", "") == "INV2025001"
@@ -0,0 +1,119 @@
+import errno
+import os
+
+import pytest
+
+from src.pdf import pdf_utils
+from src.pdf.pdf_document import PDFDocument
+from src.pdf.pdf_utils import copy_file_with_unique_name, transfer_file
+
+CONTENT = b"%PDF-1.4 isi faktur"
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "input" / "faktur.pdf"
+    path.parent.mkdir()
+    path.write_bytes(CONTENT)
+    (tmp_path / "output").mkdir()
+    return path
+
+
+def fail_link(error_number):
+    def link(source_path, destination_path):
+        raise OSError(error_number, os.strerror(error_number))
+    return link
+
+
+def test_copy_keeps_source(source, tmp_path):
+    destination = tmp_path / "output" / "faktur.pdf"
+    assert transfer_file(str(source), str(destination)) == "copy"
+    assert destination.read_bytes() == CONTENT
+    assert source.exists()
+    assert os.stat(destination).st_mtime_ns == os.stat(source).st_mtime_ns
+
+
+def test_copy_writes_loaded_document_bytes(source, tmp_path):
+    destination = tmp_path / "output" / "faktur.pdf"
+    # Byte di memori dipakai, isi file sumber tidak dibaca lagi
+    with PDFDocument(str(source), data=b"%PDF-1.4 dari memori") as document:
+        assert transfer_file(str(source), str(destination), "copy", document) == "copy"
+    assert destination.read_bytes() == b"%PDF-1.4 dari memori"
+
+
+def test_move_leaves_no_source(source, tmp_path):
+    destination = tmp_path / "output" / "faktur.pdf"
+    assert transfer_file(str(source), str(destination), "move") == "move"
+    assert destination.read_bytes() == CONTENT
+    assert not source.exists()
+
+
+def test_move_without_hardlink_support_renames(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_utils.os, "link", fail_link(errno.EPERM))
+    destination = tmp_path / "output" / "faktur.pdf"
+    assert transfer_file(str(source), str(destination), "move") == "move"
+    assert destination.read_bytes() == CONTENT
+    assert not source.exists()
+
+
+def test_move_across_devices_falls_back_to_copy(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_utils.os, "link", fail_link(errno.EXDEV))
+    monkeypatch.setattr(pdf_utils.os, "rename", fail_link(errno.EXDEV))
+    destination = tmp_path / "output" / "faktur.pdf"
+    assert transfer_file(str(source), str(destination), "move") == "copy"
+    assert destination.read_bytes() == CONTENT
+    assert source.exists()
+
+
+def test_hardlink_shares_inode(source, tmp_path):
+    destination = tmp_path / "output" / "faktur.pdf"
+    assert transfer_file(str(source), str(destination), "hardlink") == "hardlink"
+    assert os.path.samefile(source, destination)
+
+
+@pytest.mark.parametrize("error_number", [errno.EPERM, errno.EXDEV])
+def test_hardlink_unsupported_falls_back_to_copy(source, tmp_path, monkeypatch, error_number):
+    monkeypatch.setattr(pdf_utils.os, "link", fail_link(error_number))
+    destination = tmp_path / "output" / "faktur.pdf"
+    assert transfer_file(str(source), str(destination), "hardlink") == "copy"
+    assert destination.read_bytes() == CONTENT
+    assert not os.path.samefile(source, destination)
+
+
+def test_reflink_without_ioctl_falls_back_to_copy(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_utils, "fcntl", None)
+    destination = tmp_path / "output" / "faktur.pdf"
+    assert transfer_file(str(source), str(destination), "reflink") == "copy"
+    assert destination.read_bytes() == CONTENT
+
+
+@pytest.mark.parametrize("strategy", ["copy", "move", "hardlink", "reflink"])
+def test_existing_destination_is_never_overwritten(source, tmp_path, strategy):
+    destination = tmp_path / "output" / "faktur.pdf"
+    destination.write_bytes(b"sudah ada")
+    with pytest.raises(FileExistsError):
+        transfer_file(str(source), str(destination), strategy)
+    assert destination.read_bytes() == b"sudah ada"
+    assert source.read_bytes() == CONTENT
+
+
+def test_unique_name_logs_unsupported_strategy(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_utils.os, "link", fail_link(errno.EXDEV))
+    (tmp_path / "output" / "faktur.pdf").write_bytes(b"sudah ada")
+    messages = []
+    result = copy_file_with_unique_name(
+        str(source), str(tmp_path / "output" / "faktur.pdf"), log_callback=messages.append, strategy="hardlink"
+    )
+    assert result == 1
+    assert (tmp_path / "output" / "faktur (1).pdf").read_bytes() == CONTENT
+    assert any("hardlink tidak didukung untuk faktur.pdf" in message for message in messages)
+
+
+def test_unique_name_exact_raises_without_logging(source, tmp_path):
+    destination = tmp_path / "output" / "faktur.pdf"
+    destination.write_bytes(b"sudah ada")
+    messages = []
+    with pytest.raises(FileExistsError):
+        copy_file_with_unique_name(str(source), str(destination), log_callback=messages.append, exact=True)
+    assert messages == []
+    assert not (tmp_path / "output" / "faktur (1).pdf").exists()